@@ -0,0 +1,79 @@
+# Throughput benchmark for the Excel-to-database ingest, on SQLite as a stand-in for SQL Server.
+# Compares the row-at-a-time loop of newexcel2dbusingpy.py with the streaming bulk ingest.
+#
+#   pip install -e .
+#   python benchmarks/ingest_throughput.py [sheets] [defects_per_sheet]
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from openpyxl import Workbook
+
+from fabricopt.ingest import INSERT_DEFECT, create_tables, ingest_workbooks
+
+
+# Function to write a synthetic inspection workbook in the layout of the real exports
+def write_synthetic_workbook(file_path, sheets, defects_per_sheet, seed=0):
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    for sheet in range(sheets):
+        worksheet = workbook.create_sheet(f"ROLL{sheet}")
+        length = round(rng.uniform(60, 120), 1)
+        worksheet.append(['FABRIC INSPECTION REPORT'])
+        worksheet.append(['SORT NO', f'S{sheet}', 'GROSS METER', length])
+        worksheet.append(['FABRIC', 'POPLIN', 'ALLOWANCE', 0.5])
+        worksheet.append(['SHADE', 'WHITE', 'NET METER', length - 0.5])
+        worksheet.append(['ROLL NO', sheet, 'GROSS WEIGHT', 20.0])
+        worksheet.append(['LOT NO', sheet // 10, 'NET WEIGHT', 19.5])
+        worksheet.append(['SHADE GROUP', 'A', 'GRADE', 'A'])
+        for _ in range(4):
+            worksheet.append([])
+        worksheet.append(['FROM MTR', 'TO MTR', 'DEFECT', 'TYPE', 'POINTS'])
+        for position in sorted(rng.uniform(0, length) for _ in range(defects_per_sheet)):
+            position = round(position, 1)
+            worksheet.append([position, position, 'SLUB', rng.choice(['MAJOR', 'MINOR']), rng.choice([1, 2, 3, 4])])
+    workbook.save(file_path)
+
+
+# Function to ingest the way newexcel2dbusingpy.py does: one INSERT per defect row
+def ingest_row_by_row(conn, file_path):
+    create_tables(conn)
+    cursor = conn.cursor()
+    excel_data = pd.ExcelFile(file_path)
+    defects = 0
+    for sheet_name in excel_data.sheet_names:
+        df = excel_data.parse(sheet_name)
+        cursor.execute('INSERT INTO fabric_info (sort_number, gross_meter) VALUES (?, ?)', (df.iloc[0, 1], df.iloc[0, 3]))
+        cursor.execute('SELECT last_insert_rowid()')
+        fabric_id = cursor.fetchone()[0]
+        defect_rows = df.iloc[11:, [0, 1, 2, 3, 4]].dropna()
+        for _, row in defect_rows.iterrows():
+            cursor.execute(INSERT_DEFECT, (fabric_id, row.iloc[0], row.iloc[1], row.iloc[2], row.iloc[3], int(row.iloc[4])))
+            defects += 1
+    conn.commit()
+    return defects
+
+
+def main(sheets=200, defects_per_sheet=100):
+    with tempfile.TemporaryDirectory() as directory:
+        workbook_path = os.path.join(directory, 'inspection.xlsx')
+        write_synthetic_workbook(workbook_path, sheets, defects_per_sheet)
+
+        for label, run in [
+            ('row-by-row', lambda conn: ingest_row_by_row(conn, workbook_path)),
+            ('bulk stream', lambda conn: ingest_workbooks(conn, [workbook_path])[1]),
+        ]:
+            conn = sqlite3.connect(os.path.join(directory, f'{label.replace(" ", "_")}.db'))
+            start = time.perf_counter()
+            defects = run(conn)
+            elapsed = time.perf_counter() - start
+            conn.close()
+            print(f"{label:>12}: {defects} defect rows in {elapsed:.2f} s ({defects / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
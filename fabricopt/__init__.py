@@ -0,0 +1,43 @@
+# Public names are imported on first use, so "import fabricopt" (and the fabric-opt CLI) starts without
+# loading NumPy or any optimizer module that a command does not need.
+_EXPORTS = {
+    'plan_cuts_aco': 'aco',
+    'plan_cuts_bnb': 'branch_bound',
+    'CutState': 'cutting',
+    'remove_sections': 'cutting',
+    'DefectTable': 'defects',
+    'scan_density': 'density',
+    'RollSegments': 'evaluate',
+    'ParameterExplorer': 'explore',
+    'evaluate_plans': 'evaluate',
+    'DefectIntervalIndex': 'intervals',
+    'join_remnants': 'joining',
+    'ScoreCache': 'memo',
+    'CutFrontier': 'planner',
+    'cut_frontier': 'planner',
+    'plan_cuts_dp': 'planner',
+    'SectionScorer': 'scoring',
+    'CutStrategy': 'strategies',
+    'RollIndex': 'strategies',
+    'run_strategy': 'strategies',
+    'calculate_ppms': 'scoring',
+    'calculate_section_ppms': 'scoring',
+    'find_combined_highest_density_sections': 'scoring',
+    'find_highest_density_section': 'scoring',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,172 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .defects import DefectTable
+from .evaluate import RollSegments, evaluate_plans, kept_runs
+from .greedy import maximize_remaining_length_with_cut_penalty
+from .planner import cut_frontier
+
+KEEP = 1
+REMOVE = 0
+
+
+# Function to cut away every kept piece shorter than min_piece_length (the < 20 m remnant rule)
+def drop_short_pieces(keep_masks, segments, min_piece_length):
+    rows, starts, ends = kept_runs(keep_masks)
+    length_prefix = np.concatenate(([0.0], np.cumsum(segments.lengths)))
+    short = length_prefix[ends] - length_prefix[starts] < min_piece_length
+    if not short.any():
+        return keep_masks
+    delta = np.zeros((keep_masks.shape[0], keep_masks.shape[1] + 1), dtype=np.int32)
+    np.add.at(delta, (rows[short], starts[short]), 1)
+    np.add.at(delta, (rows[short], ends[short]), -1)
+    return keep_masks & (np.cumsum(delta[:, :-1], axis=1) == 0)
+
+
+# Ant colony optimizer over the graph of candidate cut boundaries.
+# The roll is split into RollSegments; an ant walks the segments left to right and decides keep/remove
+# for each one. The pheromone matrix tau[segment, previous decision, decision] therefore learns where
+# pieces should start and end, and the heuristic favours removing segments denser than the threshold.
+# All ants of an iteration are built and scored together (evaluate_plans); the iteration-best and
+# best-so-far plans deposit pheromone in proportion to retained length, with min/max pheromone limits.
+class AntColonyOptimizer:
+    def __init__(self, num_ants=64, num_iterations=200, pheromone_evaporation_rate=0.1, pheromone_deposit_rate=1.0,
+                 alpha=1.0, beta=2.0, patience=30, time_limit=None, seed=None):
+        self.num_ants = num_ants
+        self.num_iterations = num_iterations
+        self.pheromone_evaporation_rate = pheromone_evaporation_rate
+        self.pheromone_deposit_rate = pheromone_deposit_rate
+        self.alpha = alpha
+        self.beta = beta
+        self.patience = patience
+        self.time_limit = time_limit
+        self.rng = np.random.default_rng(seed)
+
+    # Quality of each plan: retained share of the roll, scaled down hard when the PPMS is over the threshold
+    def quality(self, scores, segments, threshold_ppms):
+        retained = scores['kept_length'] / segments.length
+        over = np.maximum(scores['ppms'] / threshold_ppms, 1.0)
+        feasible = scores['ppms'] <= threshold_ppms
+        return np.where(feasible, 1.0 + retained, retained / over ** 4)
+
+    def construct(self, pheromone, heuristic, num_segments):
+        masks = np.empty((self.num_ants, num_segments), dtype=bool)
+        previous = np.full(self.num_ants, KEEP)
+        draws = self.rng.random((self.num_ants, num_segments))
+        for k in range(num_segments):
+            weights = pheromone[k, previous] ** self.alpha * heuristic[k] ** self.beta
+            keep_probability = weights[:, KEEP] / weights.sum(axis=1)
+            masks[:, k] = draws[:, k] < keep_probability
+            previous = masks[:, k].astype(np.intp)
+        return masks
+
+    def deposit(self, pheromone, mask, amount):
+        previous = np.concatenate(([KEEP], mask[:-1].astype(np.intp)))
+        pheromone[np.arange(len(mask)), previous, mask.astype(np.intp)] += amount
+
+    def optimize(self, defects, length, width, threshold_ppms, join_penalty=4, min_piece_length=20,
+                 initial_masks=None, segments=None):
+        started = time.perf_counter()
+        segments = segments if segments is not None else RollSegments(defects, length, width)
+        num_segments = len(segments)
+
+        density = (segments.points * 100) / (np.maximum(segments.lengths, 1e-9) * width)
+        heuristic = np.ones((num_segments, 2))
+        heuristic[:, REMOVE] = np.clip(density / threshold_ppms, 0.05, 20)
+        tau_max = 1.0
+        tau_min = tau_max / (2 * max(num_segments, 1))
+        pheromone = np.full((num_segments, 2, 2), tau_max)
+
+        best_mask = np.ones(num_segments, dtype=bool)
+        best_quality = -np.inf
+        if initial_masks is not None:
+            masks = drop_short_pieces(np.atleast_2d(initial_masks), segments, min_piece_length)
+            qualities = self.quality(evaluate_plans(segments, masks, join_penalty), segments, threshold_ppms)
+            best_mask, best_quality = masks[np.argmax(qualities)].copy(), qualities.max()
+
+        stale = 0
+        iterations = 0
+        for iterations in range(1, self.num_iterations + 1):
+            masks = drop_short_pieces(self.construct(pheromone, heuristic, num_segments), segments, min_piece_length)
+            qualities = self.quality(evaluate_plans(segments, masks, join_penalty), segments, threshold_ppms)
+            iteration_best = int(np.argmax(qualities))
+            if qualities[iteration_best] > best_quality + 1e-12:
+                best_quality = qualities[iteration_best]
+                best_mask = masks[iteration_best].copy()
+                stale = 0
+            else:
+                stale += 1
+
+            pheromone *= 1 - self.pheromone_evaporation_rate
+            self.deposit(pheromone, masks[iteration_best], self.pheromone_deposit_rate * qualities[iteration_best] / 2)
+            self.deposit(pheromone, best_mask, self.pheromone_deposit_rate * best_quality / 2)
+            np.clip(pheromone, tau_min, tau_max, out=pheromone)
+
+            # Stop early once the colony has converged or the time budget is spent
+            if stale >= self.patience:
+                break
+            if self.time_limit is not None and time.perf_counter() - started >= self.time_limit:
+                break
+
+        scores = evaluate_plans(segments, best_mask[None, :], join_penalty)
+        removed_sections, kept_sections = segments.sections_from_mask(best_mask)
+        return {
+            'removed_sections': removed_sections,
+            'kept_sections': kept_sections,
+            'kept_length': float(scores['kept_length'][0]),
+            'ppms': float(scores['ppms'][0]),
+            'feasible': bool(scores['ppms'][0] <= threshold_ppms),
+            'iterations': iterations,
+        }
+
+
+# Function to run one independent colony (top level so it can run in a worker process)
+def run_colony(seed, defects, length, width, threshold_ppms, join_penalty, min_piece_length, initial_masks, colony_options,
+               segments=None):
+    colony = AntColonyOptimizer(seed=seed, **colony_options)
+    return colony.optimize(defects, length, width, threshold_ppms, join_penalty, min_piece_length, initial_masks, segments)
+
+
+# Function to plan cuts with independent ant colonies run in parallel processes; the best plan wins.
+# Every colony is seeded with the cut-penalty greedy plan and with the DP frontier's plan for the threshold, and a
+# colony only replaces its best plan with a better one, so the result is never worse than plan_cuts_dp.
+# time_limit is the wall-clock budget for the whole call, building the frontier included (that step cannot be
+# interrupted): the colonies share what is left, running in waves of `workers` processes with an equal share each.
+# A caller that already has the roll's segments, greedy cut ranges and frontier (see strategies.RollIndex) can pass
+# them in.
+def plan_cuts_aco(defects, length, width, threshold_ppms, join_penalty=4, min_piece_length=20, colonies=4,
+                  processes=None, seed=0, time_limit=None, segments=None, cut_ranges=None, frontier=None,
+                  **colony_options):
+    started = time.perf_counter()
+    table = DefectTable.coerce(defects)
+    segments = segments if segments is not None else RollSegments(table, length, width)
+    if cut_ranges is None:
+        cut_positions, ppms, remaining_length, cut_ranges = maximize_remaining_length_with_cut_penalty(
+            table, length, width, threshold_ppms, join_penalty)
+    frontier = frontier if frontier is not None else cut_frontier(table, length, width, join_penalty, min_piece_length)
+    dp_removed_sections = frontier.plan(threshold_ppms)[0]
+    initial_masks = segments.masks_from_sections([[(start - 0.5, end + 0.5) for start, end in cut_ranges],
+                                                  dp_removed_sections])
+
+    serial = processes == 1 or colonies == 1
+    workers = 1 if serial else min(processes or os.cpu_count() or 1, colonies)
+    if time_limit is not None:
+        remaining = max(time_limit - (time.perf_counter() - started), 0.0)
+        colony_options['time_limit'] = remaining / math.ceil(colonies / workers)
+
+    arguments = (table, length, width, threshold_ppms, join_penalty, min_piece_length, initial_masks, colony_options,
+                 segments)
+    seeds = [seed + colony for colony in range(colonies)]
+    if serial:
+        results = [run_colony(colony_seed, *arguments) for colony_seed in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_colony, seeds, *zip(*[arguments] * len(seeds))))
+
+    best = max(results, key=lambda result: (result['feasible'],
+                                            result['kept_length'] if result['feasible'] else -result['ppms']))
+    return best['removed_sections'], best['kept_sections'], best['kept_length'], best['ppms']
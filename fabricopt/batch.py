@@ -0,0 +1,62 @@
+import math
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .rolls import load_rolls_from_workbook
+
+
+# Function to optimize one roll ({'name', 'length', 'defects'[, 'width']}) with a cut strategy
+# (see strategies.STRATEGIES; the exact DP planner by default). Every strategy goes through CutStrategy.run, so
+# results have the same keys and are scored the same way. Rolls in a batch are never seen twice, so each gets
+# its own score cache, freed with the roll, instead of filling the process-wide one.
+def optimize_roll(roll, width=1.5, threshold_ppms=23, join_penalty=4, min_piece_length=20, strategy='dp'):
+    from .memo import ScoreCache
+    from .strategies import RollIndex, get_strategy
+
+    index = RollIndex(roll['defects'], roll['length'], roll.get('width', width), cache=ScoreCache())
+    result = get_strategy(strategy).run(index, threshold_ppms, join_penalty, min_piece_length)
+    return {'name': roll.get('name'), **result, 'error': None}
+
+
+# Function to optimize one roll without letting a bad roll (e.g. zero length) stop the batch
+def optimize_roll_safely(roll, **options):
+    try:
+        return optimize_roll(roll, **options)
+    except Exception as exc:
+        return {
+            'name': roll.get('name') if isinstance(roll, dict) else None,
+            'error': f"{type(exc).__name__}: {exc}",
+            'traceback': traceback.format_exc(),
+        }
+
+
+# Function to optimize many rolls across a process pool.
+# Results come back in the same order as `rolls`; failed rolls carry an 'error' message instead of a plan.
+def optimize_rolls(rolls, max_workers=None, chunksize=None, **options):
+    rolls = list(rolls)
+    if not rolls:
+        return []
+    max_workers = max_workers or os.cpu_count() or 1
+    worker = partial(optimize_roll_safely, **options)
+    if max_workers == 1:
+        return [worker(roll) for roll in rolls]
+
+    # A few chunks per worker keeps the pool busy without paying one round-trip per roll
+    chunksize = chunksize or max(1, math.ceil(len(rolls) / (max_workers * 4)))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(worker, rolls, chunksize=chunksize))
+
+
+# Function to optimize every sheet of a workbook as one roll
+def optimize_workbook(file_path, **options):
+    return optimize_rolls(load_rolls_from_workbook(file_path), **options)
+
+
+if __name__ == "__main__":
+    # python -m fabricopt.batch Combined/combined_file.xlsx, the same as "fabric-opt optimize --no-cache"
+    from .cli import main
+
+    main(['optimize', '--no-cache', sys.argv[1] if len(sys.argv) > 1 else 'Combined/combined_file.xlsx'])
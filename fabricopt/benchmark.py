@@ -0,0 +1,187 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .aco import plan_cuts_aco
+from .branch_bound import plan_cuts_bnb
+from .cutting import remove_sections
+from .evaluate import evaluate_sections
+from .greedy import maximize_remaining_length_with_cut_penalty
+from .planner import plan_cuts_dp
+from .scoring import find_combined_highest_density_sections
+from .strategies import meter_spans
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+
+# Function to generate a seeded synthetic roll.
+# point_weights gives the odds of 1, 2, 3 and 4 point defects; continuous_rate is the share of defects
+# that run over several meters; clustering is the share of defects placed around cluster_count hotspots.
+def generate_roll(seed=0, defect_count=100, length=None, width=1.5, point_weights=(0.4, 0.25, 0.1, 0.25),
+                  continuous_rate=0.05, clustering=0.5, cluster_count=None, cluster_spread=3.0):
+    rng = np.random.default_rng(seed)
+    length = float(length or max(100.0, defect_count * 2.5))
+    cluster_count = cluster_count or max(1, defect_count // 25)
+
+    clustered = rng.random(defect_count) < clustering
+    centers = rng.uniform(0, length, cluster_count)
+    positions = np.where(clustered,
+                         centers[rng.integers(0, cluster_count, defect_count)] + rng.normal(0, cluster_spread, defect_count),
+                         rng.uniform(0, length, defect_count))
+    starts = np.round(np.clip(positions, 0, length), 1)
+    spans = np.where(rng.random(defect_count) < continuous_rate, rng.exponential(2.0, defect_count), 0.0)
+    ends = np.round(np.clip(starts + spans, 0, length), 1)
+    weights = np.asarray(point_weights, dtype=float)
+    points = rng.choice(np.arange(1, len(weights) + 1), size=defect_count, p=weights / weights.sum())
+
+    order = np.argsort(starts, kind='stable')
+    defects = [{'from': float(starts[i]), 'to': float(ends[i]), 'points': int(points[i])} for i in order]
+    return {'name': f'synthetic-{seed}-{defect_count}', 'length': length, 'width': width, 'defects': defects}
+
+
+# Registered algorithms: name -> (function(roll, options) returning removed sections, largest defect count to run).
+# Names are the strategies.STRATEGIES names of the same planners.
+ALGORITHMS = {}
+
+
+def register_algorithm(name, max_defects=None):
+    def decorator(function):
+        ALGORITHMS[name] = (function, max_defects)
+        return function
+    return decorator
+
+
+@register_algorithm('cut-penalty-greedy')
+def run_cut_penalty_greedy(roll, options):
+    cut_positions, ppms, remaining_length, cut_ranges = maximize_remaining_length_with_cut_penalty(
+        roll['defects'], roll['length'], roll['width'], options['threshold_ppms'], options['join_penalty'])
+    return meter_spans(cut_ranges)
+
+
+@register_algorithm('dp')
+def run_dp(roll, options):
+    removed_sections, kept_sections, kept_length, ppms = plan_cuts_dp(
+        roll['defects'], roll['length'], roll['width'], options['threshold_ppms'], options['join_penalty'],
+        options['min_piece_length'])
+    return removed_sections
+
+
+@register_algorithm('ant-colony', max_defects=5000)
+def run_ant_colony(roll, options):
+    removed_sections, kept_sections, kept_length, ppms = plan_cuts_aco(
+        roll['defects'], roll['length'], roll['width'], options['threshold_ppms'], options['join_penalty'],
+        options['min_piece_length'], processes=1, time_limit=options['time_limit'])
+    return removed_sections
+
+
+@register_algorithm('branch-and-bound', max_defects=1000)
+def run_branch_and_bound(roll, options):
+    removed_sections, kept_sections, kept_length, ppms = plan_cuts_bnb(
+        roll['defects'], roll['length'], roll['width'], options['threshold_ppms'], options['join_penalty'],
+        options['min_piece_length'], max_cuts=options['max_cuts'], time_limit=options['time_limit'])
+    return removed_sections
+
+
+@register_algorithm('gap-constrained', max_defects=2000)
+def run_gap_constrained(roll, options):
+    sections = find_combined_highest_density_sections(roll['defects'], roll['width'], options['num_sections'],
+                                                      options['max_gap'])
+    new_defects, new_length, total_cut_length, removed_sections, kept_sections = remove_sections(
+        roll['defects'], roll['length'], roll['width'], sections, options['min_piece_length'])
+    return meter_spans(removed_sections)
+
+
+# Function to time one algorithm on one roll and score its plan the same way for every algorithm
+def run_case(name, roll, options, measure_memory=True):
+    function, max_defects = ALGORITHMS[name]
+    result = {'algorithm': name, 'defects': len(roll['defects']), 'length': roll['length']}
+    if max_defects is not None and len(roll['defects']) > max_defects:
+        result['skipped'] = f'more than {max_defects} defects'
+        return result
+    try:
+        start = time.perf_counter()
+        removed_sections = function(roll, options)
+        result['seconds'] = time.perf_counter() - start
+        if measure_memory:
+            tracemalloc.start()
+            function(roll, options)
+            result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+    except Exception as exc:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        result['error'] = f"{type(exc).__name__}: {exc}"
+        return result
+
+    summary = evaluate_sections(roll['defects'], roll['length'], roll['width'], removed_sections, options['join_penalty'])
+    result.update(
+        kept_length=summary['kept_length'],
+        retained_pct=100 * summary['kept_length'] / roll['length'],
+        ppms=summary['ppms'],
+        meets_threshold=summary['ppms'] <= options['threshold_ppms'],
+        shortest_piece=summary['shortest_piece'],
+        cuts=len(removed_sections),
+    )
+    return result
+
+
+# Function to run every selected algorithm over synthetic rolls of every size
+def run_benchmark(sizes=DEFAULT_SIZES, algorithms=None, seed=0, measure_memory=True, roll_options=None, **options):
+    options = {'threshold_ppms': 23, 'join_penalty': 4, 'min_piece_length': 20, 'num_sections': 3, 'max_gap': 5,
+               'time_limit': 10, 'max_cuts': None, **options}
+    results = []
+    for size in sizes:
+        roll = generate_roll(seed=seed, defect_count=size, **(roll_options or {}))
+        for name in algorithms or list(ALGORITHMS):
+            results.append(run_case(name, roll, options, measure_memory))
+    return results
+
+
+# Function to format benchmark results as a fixed-width table
+def format_table(results):
+    lines = [f"{'algorithm':<18} {'defects':>8} {'length m':>9} {'time s':>9} {'peak MB':>8} "
+             f"{'kept m':>9} {'kept %':>7} {'PPMS':>7} {'ok':>3}"]
+    for result in results:
+        head = f"{result['algorithm']:<18} {result['defects']:>8} {result['length']:>9.1f}"
+        if 'skipped' in result or 'error' in result:
+            lines.append(f"{head}  {result.get('skipped') or result.get('error')}")
+            continue
+        peak = f"{result['peak_mb']:>8.2f}" if 'peak_mb' in result else f"{'-':>8}"
+        ok = 'yes' if result['meets_threshold'] else 'no'
+        lines.append(f"{head} {result['seconds']:>9.4f} {peak} {result['kept_length']:>9.1f} "
+                     f"{result['retained_pct']:>7.1f} {result['ppms']:>7.2f} {ok:>3}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the fabric cut optimizers on synthetic rolls.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='defect counts to test')
+    parser.add_argument('--algorithms', nargs='+', choices=sorted(ALGORITHMS), help='algorithms to run (default: all)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--threshold-ppms', type=float, default=23)
+    parser.add_argument('--continuous-rate', type=float, default=0.05)
+    parser.add_argument('--clustering', type=float, default=0.5)
+    parser.add_argument('--time-limit', type=float, default=10, help='seconds per ant colony or branch-and-bound run')
+    parser.add_argument('--max-cuts', type=int, help='removed sections allowed to branch-and-bound (default: no limit)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak-memory run')
+    parser.add_argument('--json', help='write the results as JSON to this file ("-" for stdout)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.sizes, args.algorithms, args.seed, not args.no_memory,
+                            {'continuous_rate': args.continuous_rate, 'clustering': args.clustering},
+                            threshold_ppms=args.threshold_ppms, time_limit=args.time_limit, max_cuts=args.max_cuts)
+    if args.json == '-':
+        json.dump(results, sys.stdout, indent=2)
+        return
+    print(format_table(results))
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
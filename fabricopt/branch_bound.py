@@ -0,0 +1,289 @@
+import time
+
+import numpy as np
+
+from .defects import DefectTable
+from .evaluate import RollSegments, evaluate_plans
+from .greedy import maximize_remaining_length_with_cut_penalty
+from .planner import cut_frontier
+
+BLOCK_ROWS = 256
+BATCH_SIZE = 1024
+
+
+# Branch-and-bound cut planner over candidate cut intervals of a roll's RollSegments.
+# A plan is built left to right: from the start of the current kept piece, the next cut is an interval [a, b) of
+# segments that starts at a defect segment and ends behind one (or at the roll end); "no more cuts" keeps the rest.
+# Kept pieces shorter than min_piece_length are never formed, every kept piece after the first adds join_penalty
+# points, and max_cuts limits the number of removed sections (2 in code_with_removed_max2cuts.py).
+#
+# Bounds work on each segment's excess, 100 * points - threshold * width * length, which a feasible plan keeps
+# at or below zero in total. A partial plan whose excess cannot be brought back to zero by keeping every
+# non-positive-excess segment still ahead is pruned. Otherwise the retained length is bounded by the length of
+# those segments plus a fractional knapsack of the positive-excess segments over the excess budget left (the
+# knapsack runs over the whole roll, capped by the positive-excess length ahead, so it is one binary search).
+# Children are explored best bound first, a batch at a time; with time_limit or node_limit the search stops early
+# and returns the best plan found so far (`optimal` is then False). time_limit counts from `started` when given,
+# so a caller's own set-up (seeding) comes out of the same budget. The deadline is checked before every node and
+# while a node's children are scored, so it is overrun by at most one block of bounds.
+class BranchAndBound:
+    def __init__(self, max_cuts=None, time_limit=None, node_limit=None):
+        self.max_cuts = max_cuts
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+
+    def optimize(self, defects, length, width, threshold_ppms, join_penalty=4, min_piece_length=20, segments=None,
+                 initial_masks=None, started=None):
+        started = time.perf_counter() if started is None else started
+        segments = segments if segments is not None else RollSegments(defects, length, width)
+        n = len(segments)
+        max_cuts = n if self.max_cuts is None else self.max_cuts
+        scale = threshold_ppms * width
+        length_prefix = np.concatenate(([0.0], np.cumsum(segments.lengths)))
+        excess = segments.points * 100 - scale * segments.lengths
+        excess_prefix = np.concatenate(([0.0], np.cumsum(excess)))
+        join_excess = join_penalty * 100
+        total_length = length_prefix[-1]
+
+        # Suffix sums of the segments that help (excess <= 0) and of those that hurt (excess > 0)
+        helps = excess <= 0
+        slack_ahead = np.concatenate((np.cumsum(np.where(helps, -excess, 0)[::-1])[::-1], [0.0]))
+        free_length_ahead = np.concatenate((np.cumsum(np.where(helps, segments.lengths, 0)[::-1])[::-1], [0.0]))
+        costly_length_ahead = np.concatenate((np.cumsum(np.where(helps, 0, segments.lengths)[::-1])[::-1], [0.0]))
+        costly = np.flatnonzero(~helps)
+        order = costly[np.argsort(-segments.lengths[costly] / excess[costly], kind='stable')]
+        knapsack_excess = np.concatenate(([0.0], np.cumsum(excess[order])))
+        knapsack_length = np.concatenate(([0.0], np.cumsum(segments.lengths[order])))
+        knapsack_rate = np.append(segments.lengths[order] / excess[order], 0.0)
+
+        # Upper bound on the length still to be kept from segment s on, given the excess of the plan so far
+        def length_bound(kept_length, plan_excess, s):
+            budget = slack_ahead[s] - plan_excess
+            spent = np.maximum(budget, 0)
+            k = np.searchsorted(knapsack_excess, spent, side='right') - 1
+            knapsack = knapsack_length[k] + (spent - knapsack_excess[k]) * knapsack_rate[k]
+            bound = kept_length + free_length_ahead[s] + np.minimum(knapsack, costly_length_ahead[s])
+            return np.where(budget >= 0, bound, -np.inf)
+
+        # First segment boundary at least min_piece_length past each boundary
+        forced_end = np.minimum(np.searchsorted(length_prefix, length_prefix + min_piece_length - 1e-9), n)
+        defect_segments = np.flatnonzero(segments.points > 0)
+        cut_starts = defect_segments
+        cut_ends = np.unique(np.append(defect_segments + 1, n))
+
+        best = {'length': -np.inf, 'cuts': None}
+
+        def offer(kept_length, cuts):
+            if kept_length > best['length'] + 1e-9:
+                best['length'], best['cuts'] = kept_length, cuts
+
+        # The whole roll removed is always feasible; a starting plan (e.g. greedy) may do better
+        if max_cuts >= 1:
+            offer(0.0, ((0, n),))
+        # The longest single window within the threshold needs at most two cuts
+        if max_cuts >= 1:
+            running_max = np.maximum.accumulate(excess_prefix)
+            window_starts = np.searchsorted(running_max, excess_prefix - 1e-9, side='left')
+            window_lengths = length_prefix - length_prefix[window_starts]
+            j = int(np.argmax(window_lengths))
+            i = int(window_starts[j])
+            cuts = tuple(cut for cut in ((0, i), (j, n)) if cut[0] < cut[1])
+            if window_lengths[j] >= min_piece_length and len(cuts) <= max_cuts:
+                offer(float(window_lengths[j]), cuts)
+        if initial_masks is not None:
+            scores = evaluate_plans(segments, np.atleast_2d(initial_masks), join_penalty)
+            for mask, kept_length, ppms, shortest in zip(np.atleast_2d(initial_masks), scores['kept_length'],
+                                                         scores['ppms'], scores['shortest_piece']):
+                cuts = _cuts_of(mask)
+                if ppms <= threshold_ppms and len(cuts) <= max_cuts and (shortest >= min_piece_length or not kept_length):
+                    offer(float(kept_length), cuts)
+
+        deadline = None if self.time_limit is None else started + self.time_limit
+
+        def expired():
+            return deadline is not None and time.perf_counter() >= deadline
+
+        # Children are queued in batches: the best BATCH_SIZE in bound order, the rest unordered underneath them
+        # until the search gets back to them
+        def push_children(parent, bounds, rows, columns):
+            if not len(bounds):
+                return
+            if len(bounds) > BATCH_SIZE:
+                split = np.argpartition(-bounds, BATCH_SIZE)
+                rest = split[BATCH_SIZE:]
+                stack.append(('batch', float(bounds[rest].max()), parent, bounds[rest], rows[rest], columns[rest], None))
+                split = split[:BATCH_SIZE]
+                bounds, rows, columns = bounds[split], rows[split], columns[split]
+            order = np.argsort(-bounds, kind='stable')
+            stack.append(('batch', float(bounds[order[0]]), parent, bounds[order], rows[order], columns[order], 0))
+
+        # Search stack of nodes, (bound, first segment of the current piece, kept length, excess, kept pieces, cuts),
+        # and of child batches, (bound, parent, bounds, rows, columns, position of the next child or None if unordered)
+        stack = [('node', np.inf, 0, 0.0, 0.0, 0, ())]
+        nodes = 0
+        stopped = False
+        while stack:
+            if expired() or (self.node_limit is not None and nodes >= self.node_limit):
+                stopped = True
+                break
+            entry = stack.pop()
+            if entry[1] <= best['length'] + 1e-9:
+                continue
+            if entry[0] == 'batch':
+                _, bound, parent, bounds, rows, columns, position = entry
+                if position is None:
+                    better = bounds > best['length'] + 1e-9
+                    push_children(parent, bounds[better], rows[better], columns[better])
+                    continue
+                starts, ends, child_kept, child_excess, child_pieces, cuts = parent
+                row, column = rows[position], columns[position]
+                if position + 1 < len(bounds):
+                    stack.append(('batch', float(bounds[position + 1]), parent, bounds, rows, columns, position + 1))
+                stack.append(('node', float(bounds[position]), int(ends[column]), float(child_kept[row]),
+                              float(child_excess[row]), int(child_pieces[row]),
+                              cuts + ((int(starts[row]), int(ends[column])),)))
+                continue
+
+            _, bound, i, kept_length, plan_excess, pieces, cuts = entry
+            nodes += 1
+
+            # Leaf: keep everything from i to the roll end as the last piece
+            rest = total_length - length_prefix[i]
+            if rest >= min_piece_length or i == 0:
+                final_excess = plan_excess + excess_prefix[n] - excess_prefix[i] + (join_excess if pieces else 0)
+                if final_excess <= 1e-9:
+                    offer(kept_length + rest, cuts)
+            if len(cuts) >= max_cuts:
+                continue
+
+            # Children: keep [i, a) (empty only at the roll start), then cut [a, b)
+            starts = cut_starts[length_prefix[cut_starts] - length_prefix[i] >= min_piece_length]
+            if i == 0 and (not len(starts) or starts[0] != 0):
+                starts = np.concatenate(([0], starts))
+            if not len(starts):
+                continue
+            piece_lengths = length_prefix[starts] - length_prefix[i]
+            child_kept = kept_length + piece_lengths
+            child_excess = (plan_excess + excess_prefix[starts] - excess_prefix[i]
+                            + np.where((starts > i) & (pieces > 0), join_excess, 0))
+            child_pieces = pieces + (starts > i)
+
+            # Cutting through to the roll end closes the plan
+            closes = child_excess <= 1e-9
+            if closes.any():
+                k = int(np.argmax(np.where(closes, child_kept, -np.inf)))
+                offer(float(child_kept[k]), cuts + ((int(starts[k]), n),))
+
+            ends = cut_ends[(cut_ends < n) & (total_length - length_prefix[cut_ends] >= min_piece_length)]
+            if not len(ends):
+                continue
+            # A kept piece starts at every cut end b < n (joined to the pieces before it), and its first
+            # min_piece_length meters are kept for certain. Bounds are computed BLOCK_ROWS cut starts at a time so
+            # the time limit is checked while a large node is expanded.
+            found_bounds, found_rows, found_columns = [], [], []
+            for first in range(0, len(starts), BLOCK_ROWS):
+                if expired():
+                    stopped = True
+                    break
+                block = slice(first, first + BLOCK_ROWS)
+                next_excess = (child_excess[block, None]
+                               + np.where(child_pieces[block] > 0, join_excess, 0)[:, None])
+                if len(cuts) + 1 >= max_cuts:
+                    # Last cut: the rest of the roll is the last piece, so the bound is the plan itself
+                    rest_excess = next_excess + (excess_prefix[n] - excess_prefix[ends])[None, :]
+                    bounds = np.where(rest_excess <= 1e-9,
+                                      child_kept[block, None] + (total_length - length_prefix[ends])[None, :], -np.inf)
+                else:
+                    forced = forced_end[ends]
+                    bounds = length_bound(
+                        child_kept[block, None] + (length_prefix[forced] - length_prefix[ends])[None, :],
+                        next_excess + (excess_prefix[forced] - excess_prefix[ends])[None, :], forced[None, :])
+                bounds[ends[None, :] <= starts[block, None]] = -np.inf
+                rows, columns = np.nonzero(bounds > best['length'] + 1e-9)
+                found_bounds.append(bounds[rows, columns])
+                found_rows.append(rows + first)
+                found_columns.append(columns)
+            if stopped:
+                break
+            push_children((starts, ends, child_kept, child_excess, child_pieces, cuts), np.concatenate(found_bounds),
+                          np.concatenate(found_rows), np.concatenate(found_columns))
+
+        keep_mask = np.ones(n, dtype=bool)
+        for a, b in best['cuts'] or ():
+            keep_mask[a:b] = False
+        scores = evaluate_plans(segments, keep_mask[None, :], join_penalty)
+        removed_sections, kept_sections = segments.sections_from_mask(keep_mask)
+        return {
+            'removed_sections': removed_sections,
+            'kept_sections': kept_sections,
+            'kept_length': float(scores['kept_length'][0]),
+            'ppms': float(scores['ppms'][0]),
+            'feasible': bool(scores['ppms'][0] <= threshold_ppms),
+            'optimal': not stopped,
+            'nodes': nodes,
+            'seconds': time.perf_counter() - started,
+        }
+
+
+# Function to list the removed runs of a keep mask as (first segment, one past the last) pairs
+def _cuts_of(keep_mask):
+    padded = np.concatenate(([True], np.asarray(keep_mask, dtype=bool), [True])).astype(np.int8)
+    steps = np.diff(padded)
+    return tuple(zip(np.flatnonzero(steps == -1).tolist(), np.flatnonzero(steps == 1).tolist()))
+
+
+# Function to bring a plan down to max_cuts removed sections by merging the removed sections around the
+# shortest kept pieces (the merged plan keeps less fabric and may miss the threshold; the search checks it)
+def limit_cuts(kept_sections, length, max_cuts):
+    kept_sections = list(kept_sections)
+    while True:
+        removed = ([start for start, end in kept_sections[:1] if start > 0]
+                   + [end for start, end in kept_sections[-1:] if end < length])
+        if len(kept_sections) + len(removed) - 1 <= max_cuts or not kept_sections:
+            break
+        # Drop the shortest inner piece (or the shortest end piece when there is no inner piece)
+        inner = range(1, len(kept_sections) - 1) if len(kept_sections) > 2 else range(len(kept_sections))
+        shortest = min(inner, key=lambda k: kept_sections[k][1] - kept_sections[k][0])
+        del kept_sections[shortest]
+    removed_sections = []
+    position = 0
+    for start, end in kept_sections:
+        if start > position:
+            removed_sections.append((position, start))
+        position = end
+    if position < length:
+        removed_sections.append((position, length))
+    return removed_sections
+
+
+# Function to plan cuts with the branch-and-bound search.
+# The search starts from the cut-penalty greedy plan and from the DP frontier's plans cut down to max_cuts, so
+# even a short time_limit returns a good plan. max_cuts limits the number of removed sections; time_limit (seconds)
+# makes it return the best plan found by then and covers the seeding too. Building a frontier can take longer than
+# a short time_limit on large rolls, so with a time_limit the DP plans only seed the search when a frontier is
+# passed in (RollIndex.frontier shares one per roll). Without max_cuts the DP frontier's plan is already optimal
+# and is returned without searching. Returns (removed_sections, kept_sections, kept_length, ppms) like plan_cuts_dp.
+def plan_cuts_bnb(defects, length, width, threshold_ppms, join_penalty=4, min_piece_length=20, max_cuts=None,
+                  time_limit=None, node_limit=None, segments=None, cut_ranges=None, frontier=None, seed_plans=64):
+    started = time.perf_counter()
+    table = DefectTable.coerce(defects)
+    if max_cuts is None:
+        frontier = frontier if frontier is not None else cut_frontier(table, length, width, join_penalty, min_piece_length)
+        return frontier.plan(threshold_ppms)
+    segments = segments if segments is not None else RollSegments(table, length, width)
+    if cut_ranges is None:
+        cut_positions, ppms, remaining_length, cut_ranges = maximize_remaining_length_with_cut_penalty(
+            table, length, width, threshold_ppms, join_penalty)
+    plans = [[(start - 0.5, end + 0.5) for start, end in cut_ranges]]
+    if frontier is None and seed_plans and time_limit is None:
+        frontier = cut_frontier(table, length, width, join_penalty, min_piece_length)
+    if frontier is not None and seed_plans:
+        last = frontier.index(threshold_ppms)
+        for k in range(last, max(last - seed_plans, -1), -1):
+            if time_limit is not None and time.perf_counter() - started >= time_limit:
+                break
+            plans.append(limit_cuts(frontier.kept_sections(k), length, max_cuts))
+    initial_masks = segments.masks_from_sections(plans)
+    result = BranchAndBound(max_cuts, time_limit, node_limit).optimize(
+        table, length, width, threshold_ppms, join_penalty, min_piece_length, segments, initial_masks, started)
+    return result['removed_sections'], result['kept_sections'], result['kept_length'], result['ppms']
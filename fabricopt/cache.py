@@ -0,0 +1,149 @@
+import hashlib
+import json
+import numbers
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from .defects import DefectTable
+
+CACHE_VERSION = 1
+COLUMNS = ['starts', 'ends', 'points', 'types']
+
+
+# Function to hash a workbook's bytes without loading it whole
+def file_hash(file_path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Binary roll-data cache between the Excel sources and the optimizers.
+# Each source workbook gets a directory of .npy columns (from/to/points/type for all its rolls, sorted
+# per roll, with an offsets array marking where each roll starts) plus meta.json with the roll header
+# fields (gross_meter, net_meter, grade, ...). Columns are opened with mmap, so loading costs a few
+# file opens regardless of roll count. An entry is rebuilt when the source's content hash changes;
+# mtime and size are checked first so unchanged sources are not even hashed.
+class RollCache:
+    def __init__(self, cache_dir='.fabric_cache'):
+        self.cache_dir = cache_dir
+
+    def entry_dir(self, source_path):
+        key = hashlib.sha256(os.path.abspath(source_path).encode()).hexdigest()[:24]
+        return os.path.join(self.cache_dir, key)
+
+    def _read_meta(self, entry_dir):
+        try:
+            with open(os.path.join(entry_dir, 'meta.json')) as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('version') == CACHE_VERSION else None
+
+    def _write_meta(self, entry_dir, meta):
+        temporary = os.path.join(entry_dir, 'meta.json.tmp')
+        with open(temporary, 'w') as file:
+            json.dump(meta, file, default=str)
+        os.replace(temporary, os.path.join(entry_dir, 'meta.json'))
+
+    # Function to check whether the cache entry still matches the source, refreshing mtime/size if only those moved
+    def is_fresh(self, source_path, meta):
+        if meta is None:
+            return False
+        stat = os.stat(source_path)
+        if meta['mtime'] == stat.st_mtime and meta['size'] == stat.st_size:
+            return True
+        if meta['hash'] != file_hash(source_path):
+            return False
+        meta.update(mtime=stat.st_mtime, size=stat.st_size)
+        self._write_meta(self.entry_dir(source_path), meta)
+        return True
+
+    # Function to return the rolls of a source workbook, rebuilding its cache entry if needed
+    def load(self, source_path):
+        entry_dir = self.entry_dir(source_path)
+        meta = self._read_meta(entry_dir)
+        if not self.is_fresh(source_path, meta):
+            meta = self.build(source_path)
+        return self._open(entry_dir, meta)
+
+    # Function to return the rolls of several sources, in order
+    def load_many(self, source_paths):
+        rolls = []
+        for source_path in source_paths:
+            rolls.extend(self.load(source_path))
+        return rolls
+
+    def _open(self, entry_dir, meta):
+        columns = {name: np.load(os.path.join(entry_dir, f'{name}.npy'), mmap_mode='r') for name in COLUMNS + ['offsets']}
+        offsets = columns['offsets']
+        rolls = []
+        for index, roll in enumerate(meta['rolls']):
+            window = slice(int(offsets[index]), int(offsets[index + 1]))
+            defects = DefectTable(columns['starts'][window], columns['ends'][window], columns['points'][window],
+                                  columns['types'][window], meta['type_names'], presorted=True)
+            rolls.append({'name': roll['name'], 'length': roll['fabric_info']['gross_meter'],
+                          'fabric_info': roll['fabric_info'], 'defects': defects})
+        return rolls
+
+    # Function to parse a source workbook once and write its cache entry
+    def build(self, source_path):
+        from .combine import iter_sheet_rows
+        from .rolls import FABRIC_INFO_FIELDS, read_sheet_values
+
+        stat = os.stat(source_path)
+        content_hash = file_hash(source_path)
+        rolls = []
+        tables = []
+        for sheet, rows in iter_sheet_rows(source_path):
+            fabric_values, defect_rows = read_sheet_values(rows)
+            fabric_info = dict(zip([field for field, row, column in FABRIC_INFO_FIELDS], fabric_values))
+            records = [{'from': row[0], 'to': row[1], 'type': str(row[3]), 'points': row[4]} for row in defect_rows
+                       if isinstance(row[0], numbers.Real) and isinstance(row[1], numbers.Real)]
+            rolls.append({'name': sheet, 'fabric_info': fabric_info})
+            tables.append(DefectTable.from_records(records))
+
+        # One shared type vocabulary for the whole source
+        type_names = ['']
+        for table in tables:
+            type_names.extend(name for name in table.type_names if name not in type_names)
+        remapped_types = [np.array([type_names.index(name) for name in table.type_names], dtype=np.int8)[table.types]
+                          for table in tables]
+        offsets = np.concatenate(([0], np.cumsum([len(table) for table in tables]))).astype(np.int64)
+        columns = {
+            'starts': np.concatenate([table.starts for table in tables]) if tables else np.empty(0),
+            'ends': np.concatenate([table.ends for table in tables]) if tables else np.empty(0),
+            'points': np.concatenate([table.points for table in tables]) if tables else np.empty(0),
+            'types': np.concatenate(remapped_types).astype(np.int8) if tables else np.empty(0, dtype=np.int8),
+            'offsets': offsets,
+        }
+        meta = {'version': CACHE_VERSION, 'source': os.path.abspath(source_path), 'hash': content_hash,
+                'mtime': stat.st_mtime, 'size': stat.st_size, 'type_names': type_names, 'rolls': rolls}
+
+        # Write into a scratch directory and swap it in, so readers never see a half-written entry
+        os.makedirs(self.cache_dir, exist_ok=True)
+        scratch = tempfile.mkdtemp(dir=self.cache_dir)
+        for name, column in columns.items():
+            np.save(os.path.join(scratch, f'{name}.npy'), column)
+        self._write_meta(scratch, meta)
+        entry_dir = self.entry_dir(source_path)
+        if os.path.exists(entry_dir):
+            shutil.rmtree(entry_dir)
+        os.replace(scratch, entry_dir)
+        return json.loads(json.dumps(meta, default=str))
+
+
+# Function to load the rolls of several workbooks through the default cache
+def load_rolls(source_paths, cache_dir='.fabric_cache'):
+    return RollCache(cache_dir).load_many(source_paths)
+
+
+if __name__ == "__main__":
+    # python -m fabricopt.cache Combined/combined_file.xlsx [more.xlsx ...]
+    rolls = load_rolls(sys.argv[1:] or ['Combined/combined_file.xlsx'])
+    print(f"{len(rolls)} rolls, {sum(len(roll['defects']) for roll in rolls)} defects")
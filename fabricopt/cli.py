@@ -0,0 +1,212 @@
+import argparse
+import json
+import logging
+import sys
+
+# Only argparse is imported up front; every command imports the modules it needs when it runs,
+# so "fabric-opt --help" and argument errors never load NumPy, pandas or matplotlib.
+
+DEFAULT_WORKBOOK = 'Combined/combined_file.xlsx'
+# Cut strategies of strategies.STRATEGIES, listed here so building the parser does not import them
+STRATEGY_NAMES = ['dp', 'greedy', 'combined-density', 'gap-constrained', 'cut-penalty-greedy', 'ant-colony',
+                  'branch-and-bound']
+
+
+def load_rolls(args):
+    if args.no_cache:
+        from .rolls import load_rolls_from_workbook
+
+        rolls = []
+        for workbook in args.workbooks:
+            rolls.extend(load_rolls_from_workbook(workbook))
+        return rolls
+    from .cache import load_rolls as load_cached_rolls
+
+    return load_cached_rolls(args.workbooks, args.cache_dir)
+
+
+def plan_options(args):
+    return {'width': args.width, 'threshold_ppms': args.threshold_ppms, 'join_penalty': args.join_penalty,
+            'min_piece_length': args.min_piece_length, 'strategy': args.strategy}
+
+
+def run_optimize(args):
+    from .batch import optimize_rolls
+
+    results = optimize_rolls(load_rolls(args), max_workers=args.workers, **plan_options(args))
+    if args.json:
+        json.dump(results, sys.stdout, indent=2, default=float)
+        return
+    for result in results:
+        if result['error']:
+            print(f"{result['name']}: failed ({result['error']})")
+        else:
+            print(f"{result['name']}: kept {result['kept_length']:.1f} of {result['length']} meters, "
+                  f"PPMS {result['original_ppms']:.2f} -> {result['ppms']:.2f}, removed {result['removed_sections']}")
+
+
+def run_frontier(args):
+    from .planner import cut_frontier
+
+    frontiers = {}
+    for roll in load_rolls(args):
+        width = roll.get('width', args.width)
+        frontiers[roll['name']] = frontier = cut_frontier(roll['defects'], roll['length'], width, args.join_penalty,
+                                                          args.min_piece_length)
+        if args.json:
+            continue
+        print(f"{roll['name']}: {len(frontier)} frontier points, {roll['length']} meters")
+        thresholds = args.thresholds or frontier.ppms
+        for threshold in thresholds:
+            kept_length, ppms = frontier.query(threshold)
+            print(f"  PPMS <= {threshold:6.2f}: keep {kept_length:8.1f} m ({100 * kept_length / roll['length']:5.1f}%), "
+                  f"PPMS {ppms:.2f}")
+    if args.json:
+        json.dump({name: frontier.to_dict() for name, frontier in frontiers.items()}, sys.stdout, default=float)
+
+
+def run_join(args):
+    from .batch import optimize_rolls
+    from .joining import join_remnants, remnants_from_results
+
+    rolls = load_rolls(args)
+    remnants = remnants_from_results(rolls, optimize_rolls(rolls, max_workers=args.workers, **plan_options(args)))
+    pieces, leftovers = join_remnants(remnants, args.width, args.threshold_ppms, args.target_length, args.max_length,
+                                      args.join_penalty)
+    for piece in pieces:
+        sources = ', '.join(f"{remnant['roll']} {remnant['start']:.1f}-{remnant['end']:.1f}" for remnant in piece['remnants'])
+        print(f"Piece: {piece['length']:.1f} m, {piece['joins']} joins, PPMS {piece['ppms']:.2f} <- {sources}")
+    print(f"{len(pieces)} pieces, {sum(piece['length'] for piece in pieces):.1f} m; "
+          f"{len(leftovers)} remnants left ({sum(remnant['length'] for remnant in leftovers):.1f} m)")
+
+
+def run_report(args):
+    from .report import generate_reports
+
+    summary = generate_reports(load_rolls(args), args.output_dir, max_workers=args.workers, dpi=args.dpi,
+                               **plan_options(args))
+    for lot, file_path in summary['files'].items():
+        print(f"Lot {lot}: {file_path}")
+    for lot, failures in summary['failed'].items():
+        for name, error in failures:
+            print(f"Lot {lot}: {name} failed ({error})")
+    print(f"{summary['pages']} pages in {summary['seconds']:.1f} s ({summary['pages_per_second']:.1f} pages/s)")
+
+
+def run_combine(args):
+    from .combine import combine_workbooks, excel_files_in
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    print("Copying sheets from multiple files to one file")
+    sheets = combine_workbooks(excel_files_in(args.folder), args.output, args.columnar)
+    print(f"Done: {sheets} sheets written to {args.output}")
+
+
+def run_ingest(args):
+    import sqlite3
+
+    from .ingest import ingest_workbooks
+
+    conn = sqlite3.connect(args.database)
+    try:
+        rolls, defects = ingest_workbooks(conn, args.workbooks, args.batch_size)
+    finally:
+        conn.close()
+    print(f"Ingested {rolls} rolls and {defects} defects")
+
+
+def run_cache(args):
+    args.no_cache = False
+    rolls = load_rolls(args)
+    print(f"{len(rolls)} rolls, {sum(len(roll['defects']) for roll in rolls)} defects")
+
+
+def run_benchmark(args):
+    from .benchmark import main as benchmark_main
+
+    benchmark_main(args.benchmark_args)
+
+
+def run_gui(args):
+    from .gui import FabricOptimizerApp
+
+    FabricOptimizerApp().mainloop()
+
+
+def add_roll_arguments(parser, with_plan=True):
+    parser.add_argument('workbooks', nargs='*', default=[DEFAULT_WORKBOOK], help='inspection workbooks (one roll per sheet)')
+    parser.add_argument('--cache-dir', default='.fabric_cache', help='binary roll cache folder')
+    parser.add_argument('--no-cache', action='store_true', help='read the workbooks directly instead of through the cache')
+    if with_plan:
+        parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+        parser.add_argument('--width', type=float, default=1.5)
+        parser.add_argument('--threshold-ppms', type=float, default=23)
+        parser.add_argument('--join-penalty', type=float, default=4)
+        parser.add_argument('--min-piece-length', type=float, default=20)
+        parser.add_argument('--strategy', choices=STRATEGY_NAMES, default='dp', help='cut strategy (default: dp)')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='fabric-opt', description='Fabric roll cut optimization tools.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('optimize', help='plan cuts for every roll of the workbooks')
+    add_roll_arguments(command)
+    command.add_argument('--json', action='store_true', help='print the results as JSON')
+    command.set_defaults(handler=run_optimize)
+
+    command = commands.add_parser('frontier', help='retained length versus PPMS for every threshold, per roll')
+    add_roll_arguments(command)
+    command.add_argument('--thresholds', type=float, nargs='+', help='thresholds to list (default: every frontier point)')
+    command.add_argument('--json', action='store_true', help='print the frontiers with their plans as JSON')
+    command.set_defaults(handler=run_frontier)
+
+    command = commands.add_parser('join', help='plan cuts, then join the kept pieces of all rolls into sellable pieces')
+    add_roll_arguments(command)
+    command.add_argument('--target-length', type=float, default=80)
+    command.add_argument('--max-length', type=float)
+    command.set_defaults(handler=run_join)
+
+    command = commands.add_parser('report', help='render PDF reports, one per lot')
+    add_roll_arguments(command)
+    command.add_argument('--output-dir', default='reports')
+    command.add_argument('--dpi', type=int, default=150)
+    command.set_defaults(handler=run_report)
+
+    command = commands.add_parser('combine', help='copy every sheet of a folder of workbooks into one workbook')
+    command.add_argument('folder')
+    command.add_argument('--output', default=DEFAULT_WORKBOOK)
+    command.add_argument('--columnar', help='also write columnar tables (.parquet or .feather)')
+    command.set_defaults(handler=run_combine)
+
+    command = commands.add_parser('ingest', help='load workbooks into a SQLite database incrementally')
+    command.add_argument('database')
+    command.add_argument('workbooks', nargs='+')
+    command.add_argument('--batch-size', type=int, default=5000)
+    command.set_defaults(handler=run_ingest)
+
+    command = commands.add_parser('cache', help='build or refresh the binary roll cache')
+    add_roll_arguments(command, with_plan=False)
+    command.set_defaults(handler=run_cache)
+
+    # Arguments after "benchmark" go to the benchmark's own parser
+    command = commands.add_parser('benchmark', help='benchmark the optimizers on synthetic rolls', add_help=False)
+    command.set_defaults(handler=run_benchmark)
+
+    command = commands.add_parser('gui', help='open the optimizer window')
+    command.set_defaults(handler=run_gui)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == 'benchmark':
+        args.benchmark_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
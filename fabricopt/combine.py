@@ -0,0 +1,159 @@
+import logging
+import os
+import sys
+from collections import deque
+
+import numpy as np
+
+from .defects import DefectTable, points_value
+from .rolls import DEFECT_FIELDS, FABRIC_INFO_FIELDS, read_sheet_values
+
+EXCEL_SHEET_NAME_LIMIT = 31
+
+logger = logging.getLogger(__name__)
+
+
+# Function to yield (sheet name, row tuples) for every sheet of an .xlsx or .xls file.
+# .xlsx rows are streamed from the read-only workbook, so each sheet's rows must be consumed before the next sheet.
+def iter_sheet_rows(file_path):
+    from openpyxl import load_workbook
+
+    if file_path.endswith('.xls'):
+        import pandas as pd
+
+        excel_file = pd.ExcelFile(file_path)
+        for sheet in excel_file.sheet_names:
+            df = excel_file.parse(sheet_name=sheet, header=None)
+            yield sheet, (tuple(None if pd.isna(value) else value for value in row) for row in df.itertuples(index=False))
+        return
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            yield worksheet.title, worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+# Function to pick a sheet name that is unique in the output and fits Excel's 31 character limit
+def unique_sheet_name(name, used_names):
+    name = str(name)[:EXCEL_SHEET_NAME_LIMIT]
+    candidate = name
+    suffix = 1
+    while candidate.lower() in used_names:
+        suffix += 1
+        tag = f" ({suffix})"
+        candidate = name[:EXCEL_SHEET_NAME_LIMIT - len(tag)] + tag
+    used_names.add(candidate.lower())
+    return candidate
+
+
+# Function to write rolls as two columnar tables next to each other: <stem>.rolls.<ext> and <stem>.defects.<ext>.
+# The extension picks the format (.parquet or .feather, both through pyarrow).
+def write_columnar(rolls, columnar_path):
+    import pandas as pd
+
+    stem, extension = os.path.splitext(columnar_path)
+    roll_frame = pd.DataFrame({
+        'roll': [roll['name'] for roll in rolls],
+        **{field: [roll['fabric_info'][field] for roll in rolls] for field, row, column in FABRIC_INFO_FIELDS},
+    })
+    defect_frame = pd.DataFrame([
+        {'roll': index, **dict(zip(DEFECT_FIELDS, defect))}
+        for index, roll in enumerate(rolls) for defect in roll['defects']
+    ], columns=['roll'] + DEFECT_FIELDS)
+    # Non-numeric points ("continuous defect") keep their label in 'type' and count as 0, as in DefectTable
+    labels = [point if isinstance(point, str) else label for point, label in zip(defect_frame['points'], defect_frame['type'])]
+    defect_frame = defect_frame.assign(
+        roll=defect_frame['roll'].astype(np.int32),
+        **{'from': pd.to_numeric(defect_frame['from'], errors='coerce'),
+           'to': pd.to_numeric(defect_frame['to'], errors='coerce'),
+           'points': [float(points_value(point)) for point in defect_frame['points']],
+           'type': pd.Categorical([str(label) for label in labels]),
+           'name': pd.Categorical(defect_frame['name'].astype(str))})
+    for frame in (roll_frame, defect_frame):
+        for column in frame.columns:
+            if frame[column].dtype == object:
+                frame[column] = frame[column].astype(str)
+
+    writer = {'.parquet': 'to_parquet', '.feather': 'to_feather'}[extension]
+    getattr(roll_frame, writer)(f"{stem}.rolls{extension}")
+    getattr(defect_frame, writer)(f"{stem}.defects{extension}")
+    return f"{stem}.rolls{extension}", f"{stem}.defects{extension}"
+
+
+# Function to load a columnar file written by write_columnar as rolls with DefectTable defects
+def load_columnar(columnar_path):
+    import pandas as pd
+
+    stem, extension = os.path.splitext(columnar_path)
+    reader = {'.parquet': pd.read_parquet, '.feather': pd.read_feather}[extension]
+    roll_frame = reader(f"{stem}.rolls{extension}")
+    defect_frame = reader(f"{stem}.defects{extension}")
+
+    roll_index = defect_frame['roll'].to_numpy()
+    bounds = np.searchsorted(roll_index, np.arange(len(roll_frame) + 1))
+    types = defect_frame['type'].astype('category')
+    type_names = list(types.cat.categories)
+    rolls = []
+    for index, info in enumerate(roll_frame.to_dict('records')):
+        lo, hi = bounds[index], bounds[index + 1]
+        defects = DefectTable(defect_frame['from'].to_numpy()[lo:hi], defect_frame['to'].to_numpy()[lo:hi],
+                              defect_frame['points'].to_numpy()[lo:hi], types.cat.codes.to_numpy()[lo:hi],
+                              type_names)
+        rolls.append({'name': info.pop('roll'), 'length': info['gross_meter'], 'fabric_info': info, 'defects': defects})
+    return rolls
+
+
+# Function to append rows to a worksheet as they are read, passing them on
+def _copy_rows(worksheet, rows):
+    for row in rows:
+        worksheet.append(row)
+        yield row
+
+
+# Function to copy every sheet of every source workbook into one output workbook in a single write session.
+# The output is opened once in write-only mode and rows are written as they are read, so the cost is linear
+# in the number of rows and no sheet is held in memory. Progress is logged at INFO level.
+# With columnar_path (e.g. "Combined/combined_file.parquet") the rolls are also written as columnar tables.
+def combine_workbooks(source_paths, output_path='Combined/combined_file.xlsx', columnar_path=None):
+    from openpyxl import Workbook
+
+    output = Workbook(write_only=True)
+    used_names = set()
+    rolls = []
+    for file_path in source_paths:
+        for sheet, rows in iter_sheet_rows(file_path):
+            logger.info("Copying %s: %s", file_path, sheet)
+            worksheet = output.create_sheet(unique_sheet_name(sheet, used_names))
+            rows = _copy_rows(worksheet, rows)
+            if columnar_path is None:
+                deque(rows, maxlen=0)
+            else:
+                fabric_values, defect_rows = read_sheet_values(rows)
+                rolls.append({
+                    'name': worksheet.title,
+                    'fabric_info': dict(zip([field for field, row, column in FABRIC_INFO_FIELDS], fabric_values)),
+                    'defects': defect_rows,
+                })
+    if not used_names:
+        output.create_sheet('Sheet1')
+    output.save(output_path)
+    if columnar_path is not None:
+        write_columnar(rolls, columnar_path)
+    return len(used_names)
+
+
+# Function to list the Excel files of a folder, as combiningexcelsheetstoone.py does
+def excel_files_in(folder):
+    return [os.path.join(folder, file) for file in sorted(os.listdir(folder))
+            if file.endswith('.xls') or file.endswith('.xlsx')]
+
+
+if __name__ == "__main__":
+    # python -m fabricopt.combine C:\\Myfiles [Combined/combined_file.xlsx] [Combined/combined_file.parquet],
+    # the same as "fabric-opt combine"
+    from .cli import main
+
+    main(['combine', sys.argv[1] if len(sys.argv) > 1 else 'C:\\Myfiles',
+          '--output', sys.argv[2] if len(sys.argv) > 2 else 'Combined/combined_file.xlsx']
+         + (['--columnar', sys.argv[3]] if len(sys.argv) > 3 else []))
@@ -0,0 +1,144 @@
+import bisect
+
+import numpy as np
+
+from .defects import DefectTable
+
+
+# Function to remove combined sections from the fabric.
+# Remaining pieces shorter than min_usable_length (20 m on the cutting floor) are cut away as well.
+def remove_sections(defects, length, width, sections, min_usable_length=20):
+    table = DefectTable.coerce(defects)
+    total_cut_length = sum(end - start + 1 for start, end in sections)
+    removed_sections = list(sections)
+    keep = table.outside(sections)
+
+    new_length = length - total_cut_length
+
+    # Check if the remaining parts are less than min_usable_length
+    remaining_starts = [0] + [end + 1 for start, end in sections]
+    remaining_ends = [start - 1 for start, end in sections] + [length - 1]
+    remaining_sections = [(start, end) for start, end in zip(remaining_starts, remaining_ends)
+                          if end - start + 1 >= min_usable_length]
+
+    if remaining_sections:
+        keep &= table.starts_within(remaining_sections)
+        new_length = sum(end - start + 1 for start, end in remaining_sections)
+        removed_sections.extend([(start, end) for start, end in zip(remaining_starts, remaining_ends)
+                                 if end - start + 1 < min_usable_length])
+
+    return table.select(keep), new_length, total_cut_length, removed_sections, remaining_sections
+
+
+# Cut state of one roll that is updated in place as cuts are applied and undone.
+# Kept pieces are (start, end) spans held in sorted lists; a defect belongs to the piece holding its 'from',
+# and piece points come from prefix sums over the sorted defects. A cut [start, end] is inclusive at both ends,
+# so a defect lying exactly on a cut end is cut away with it. Lengths are spans (end - start), not the inclusive
+# meter counts (end - start + 1) of remove_sections; strategies.meter_spans converts those.
+# A cut that lands inside one piece costs a few binary searches plus the list inserts, O(k) for k pieces.
+# Totals over all pieces and over the usable pieces (at least min_usable_length long; shorter remnants are cut
+# away on the floor) are kept as running sums, so PPMS is available at any time.
+class CutState:
+    def __init__(self, defects, length, width, min_usable_length=20, join_penalty=0):
+        table = DefectTable.coerce(defects)
+        self.length = length
+        self.width = width
+        self.min_usable_length = min_usable_length
+        self.join_penalty = join_penalty
+        self.positions = table.starts
+        self.cumulative_points = np.concatenate(([0.0], np.cumsum(table.points)))
+
+        self.starts = []
+        self.ends = []
+        self.points = []
+        self.kept_length = 0.0
+        self.kept_points = 0.0
+        self.usable_pieces = 0
+        self.usable_length = 0.0
+        self.usable_points = 0.0
+        self.history = []
+        self._add_piece(0.0, float(length))
+
+    def __len__(self):
+        return len(self.starts)
+
+    # Points of the piece [start, end]; an end that is not the roll's own end borders a cut and excludes its defects
+    def _points_between(self, start, end):
+        lo = np.searchsorted(self.positions, start, side='left' if start <= 0 else 'right')
+        hi = len(self.positions) if end >= self.length else np.searchsorted(self.positions, end, side='left')
+        return self.cumulative_points[hi] - self.cumulative_points[lo] if hi > lo else 0.0
+
+    def _count(self, start, end, points, sign):
+        self.kept_length += sign * (end - start)
+        self.kept_points += sign * points
+        if end - start >= self.min_usable_length:
+            self.usable_pieces += sign
+            self.usable_length += sign * (end - start)
+            self.usable_points += sign * points
+
+    def _add_piece(self, start, end, points=None):
+        if points is None:
+            points = self._points_between(start, end)
+        index = bisect.bisect_left(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.points.insert(index, points)
+        self._count(start, end, points, 1)
+
+    def _remove_piece(self, index):
+        start, end, points = self.starts.pop(index), self.ends.pop(index), self.points.pop(index)
+        self._count(start, end, points, -1)
+        return start, end, points
+
+    # Function to cut [start, end] out of the roll; returns False (and records nothing) if nothing was kept there
+    def apply_cut(self, start, end):
+        start, end = float(start), float(end)
+        if not 0 <= start < end <= self.length:
+            raise ValueError(f"cut [{start:g}, {end:g}] is not a span inside the {self.length:g} m roll")
+        first = max(bisect.bisect_right(self.starts, start) - 1, 0)
+        removed, added = [], []
+        while first < len(self.starts) and self.starts[first] < end:
+            if self.ends[first] <= start:
+                first += 1
+                continue
+            piece = self._remove_piece(first)
+            removed.append(piece)
+            piece_start, piece_end, piece_points = piece
+            if piece_start < start:
+                added.append((piece_start, start))
+            if piece_end > end:
+                added.append((end, piece_end))
+        if not removed:
+            return False
+        for piece_start, piece_end in added:
+            self._add_piece(piece_start, piece_end)
+        self.history.append((removed, added))
+        return True
+
+    # Function to undo the last applied cut; returns False if there is no cut to undo
+    def undo(self):
+        if not self.history:
+            return False
+        removed, added = self.history.pop()
+        for piece_start, piece_end in added:
+            self._remove_piece(bisect.bisect_left(self.starts, piece_start))
+        for piece in removed:
+            self._add_piece(*piece)
+        return True
+
+    def kept_sections(self):
+        return list(zip(self.starts, self.ends))
+
+    # Pieces the min_usable_length rule keeps, and the short remnants it cuts away
+    def usable_sections(self):
+        return [(start, end) for start, end in zip(self.starts, self.ends) if end - start >= self.min_usable_length]
+
+    def short_remnants(self):
+        return [(start, end) for start, end in zip(self.starts, self.ends) if end - start < self.min_usable_length]
+
+    # PPMS of the usable pieces, with join_penalty points for every join between them
+    def ppms(self):
+        if self.usable_length <= 0:
+            return 0.0
+        points = self.usable_points + self.join_penalty * max(self.usable_pieces - 1, 0)
+        return (points * 100) / (self.usable_length * self.width)
@@ -0,0 +1,153 @@
+import numpy as np
+
+
+# Function to turn a defect's points into a number ("continuous defect" and other labels count as 0)
+def points_value(points):
+    if isinstance(points, (int, float, np.integer, np.floating)) and not isinstance(points, bool):
+        return points
+    return 0
+
+
+# Function to merge overlapping (start, end) sections into sorted start/end arrays
+def merge_sections(sections):
+    if not sections:
+        return np.empty(0), np.empty(0)
+    ordered = sorted((float(start), float(end)) for start, end in sections)
+    merged_starts = [ordered[0][0]]
+    merged_ends = [ordered[0][1]]
+    for start, end in ordered[1:]:
+        if start <= merged_ends[-1]:
+            merged_ends[-1] = max(merged_ends[-1], end)
+        else:
+            merged_starts.append(start)
+            merged_ends.append(end)
+    return np.array(merged_starts), np.array(merged_ends)
+
+
+# Columnar defect store: from/to/points/type as NumPy arrays, kept sorted by 'from'.
+# Defects with non-numeric points (e.g. "continuous defect") get 0 points and keep the label as their type.
+class DefectTable:
+    def __init__(self, starts, ends, points, types=None, type_names=None, presorted=False):
+        starts = np.asarray(starts, dtype=float)
+        ends = np.asarray(ends, dtype=float)
+        points = np.asarray(points, dtype=float)
+        if types is None:
+            types = np.zeros(len(starts), dtype=np.int8)
+            type_names = type_names or ['']
+        types = np.asarray(types, dtype=np.int8)
+
+        if not presorted:
+            order = np.argsort(starts, kind='stable')
+            starts, ends, points, types = starts[order], ends[order], points[order], types[order]
+
+        self.starts = starts
+        self.ends = ends
+        self.points = points
+        self.types = types
+        self.type_names = list(type_names or [''])
+
+    # Build a table from a list of {"from", "to", "points"[, "type"]} dicts
+    @classmethod
+    def from_records(cls, defects):
+        type_names = ['']
+        type_codes = {'': 0}
+        starts, ends, points, types = [], [], [], []
+        for defect in defects:
+            label = defect.get('type', '')
+            if not isinstance(defect['points'], (int, float, np.integer, np.floating)):
+                label = str(defect['points'])
+            if label not in type_codes:
+                type_codes[label] = len(type_names)
+                type_names.append(label)
+            starts.append(defect['from'])
+            ends.append(defect['to'])
+            points.append(points_value(defect['points']))
+            types.append(type_codes[label])
+        return cls(starts, ends, points, types, type_names)
+
+    # Build a table from (from, to, points) tuples as used in newopt4 / newoptmizenewnew7
+    @classmethod
+    def from_tuples(cls, defects):
+        return cls.from_records({'from': d[0], 'to': d[1], 'points': d[2]} for d in defects)
+
+    # Build a table from the parallel lists used in antcolony.py ({'from': [...], 'to': [...], 'points': [...]})
+    @classmethod
+    def from_columns(cls, roll):
+        labels = roll.get('type', [''] * len(roll['from']))
+        type_names = sorted(set(labels) | {''})
+        type_codes = {name: code for code, name in enumerate(type_names)}
+        return cls(roll['from'], roll['to'], [points_value(p) for p in roll['points']],
+                   [type_codes[label] for label in labels], type_names)
+
+    # Accept a DefectTable, a list of dicts or a list of tuples
+    @classmethod
+    def coerce(cls, defects):
+        if isinstance(defects, cls):
+            return defects
+        if isinstance(defects, dict):
+            return cls.from_columns(defects)
+        defects = list(defects)
+        if defects and not isinstance(defects[0], dict):
+            return cls.from_tuples(defects)
+        return cls.from_records(defects)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def nbytes(self):
+        return self.starts.nbytes + self.ends.nbytes + self.points.nbytes + self.types.nbytes
+
+    # Table over the same arrays restricted by a slice (a view) or a mask (a copy)
+    def _subset(self, index):
+        return DefectTable(self.starts[index], self.ends[index], self.points[index],
+                           self.types[index], self.type_names, presorted=True)
+
+    # Defects whose 'from' lies in [start, end], as a view on the sorted arrays
+    def window(self, start, end):
+        lo = np.searchsorted(self.starts, start, side='left')
+        hi = np.searchsorted(self.starts, end, side='right')
+        return self._subset(slice(lo, hi))
+
+    def select(self, mask):
+        return self._subset(np.asarray(mask, dtype=bool))
+
+    # Mask of defects lying fully inside [start, end]
+    def inside(self, start, end):
+        return (self.starts >= start) & (self.ends <= end)
+
+    # Mask of defects that do not touch any of the removed sections
+    def outside(self, sections):
+        section_starts, section_ends = merge_sections(sections)
+        if not len(section_starts):
+            return np.ones(len(self), dtype=bool)
+        index = np.searchsorted(section_starts, self.ends, side='right') - 1
+        overlaps = (index >= 0) & (section_ends[np.maximum(index, 0)] >= self.starts)
+        return ~overlaps
+
+    # Mask of defects whose 'from' falls inside one of the given sections
+    def starts_within(self, sections):
+        section_starts, section_ends = merge_sections(sections)
+        if not len(section_starts):
+            return np.zeros(len(self), dtype=bool)
+        index = np.searchsorted(section_starts, self.starts, side='right') - 1
+        return (index >= 0) & (section_ends[np.maximum(index, 0)] >= self.starts)
+
+    # Mask of major defects (points >= 3 by default)
+    def major(self, min_points=3):
+        return self.points >= min_points
+
+    # Mask of defects carrying the given type label (e.g. "MAJOR" or "continuous defect")
+    def of_type(self, name):
+        if name not in self.type_names:
+            return np.zeros(len(self), dtype=bool)
+        return self.types == self.type_names.index(name)
+
+    def total_points(self, mask=None):
+        if mask is None:
+            return float(self.points.sum())
+        return float(self.points[mask].sum())
+
+    def to_records(self):
+        return [{'from': float(start), 'to': float(end), 'points': float(points), 'type': self.type_names[code]}
+                for start, end, points, code in zip(self.starts, self.ends, self.points, self.types)]
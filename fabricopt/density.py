@@ -0,0 +1,122 @@
+import math
+import sys
+
+import numpy as np
+
+from .defects import DefectTable
+
+DEFAULT_SIZES = (5, 10, 15, 20)
+
+
+# Windowed defect points of one roll for many window sizes at once (the interval loop of newx8.py).
+# Defects are binned by their 'from' on a grid of `step` meters and summed once into a cumulative array;
+# the points of the window [start, start + size) are then C[start + size] - C[start] for every size and start.
+# Rows of `points` are window sizes, columns are window starts on the grid; windows that are not on their
+# size's stride are NaN. As in newx8.py windows start before int(length) meters, a window may run past the end of
+# the roll (counting defects up to its own end) and density is points per meter.
+class DensityScan:
+    def __init__(self, sizes, strides, starts, points, length, width):
+        self.sizes = sizes
+        self.strides = strides
+        self.starts = starts
+        self.points = points
+        self.length = length
+        self.width = width
+
+    @property
+    def densities(self):
+        return self.points / self.sizes[:, None]
+
+    @property
+    def ppms(self):
+        return (self.points * 100) / (np.minimum(self.sizes[:, None], self.length - self.starts[None, :]) * self.width)
+
+    # Function to rank windows by density; with overlapping=False a window is skipped when it overlaps a better one.
+    # Returns dicts with size, start, end, points and density, densest first.
+    def hotspots(self, top=10, overlapping=True, min_points=0):
+        densities = self.densities
+        rows, columns = np.nonzero(np.nan_to_num(self.points, nan=-1.0) >= max(min_points, 0))
+        if not len(rows):
+            return []
+        # Densest first; ties go to the smaller window, then the earlier start
+        order = np.lexsort((self.starts[columns], self.sizes[rows], -densities[rows, columns]))
+        chosen = []
+        taken_starts, taken_ends = [], []
+        for k in order:
+            start = float(self.starts[columns[k]])
+            end = start + float(self.sizes[rows[k]])
+            if not overlapping and any(start < other_end and other_start < end
+                                       for other_start, other_end in zip(taken_starts, taken_ends)):
+                continue
+            chosen.append({'size': float(self.sizes[rows[k]]), 'start': start, 'end': end,
+                           'points': float(self.points[rows[k], columns[k]]),
+                           'density': float(densities[rows[k], columns[k]])})
+            taken_starts.append(start)
+            taken_ends.append(end)
+            if len(chosen) >= top:
+                break
+        return chosen
+
+    # Function to list the windows of one size as (start, end, points, density) rows, like newx8.py's table
+    def table(self, size):
+        row = int(np.flatnonzero(self.sizes == size)[0])
+        valid = ~np.isnan(self.points[row])
+        return [(float(start), float(start + size), float(points), float(points / size))
+                for start, points in zip(self.starts[valid], self.points[row, valid])]
+
+
+def _grid_steps(values, step, what):
+    steps = np.asarray(values, dtype=float) / step
+    if np.any(steps < 1) or not np.allclose(steps, np.round(steps)):
+        raise ValueError(f"{what} must be positive multiples of step={step}")
+    return np.round(steps).astype(np.intp)
+
+
+# Function to scan a roll's defect density for every window size at once.
+# strides defaults to the window size (non-overlapping windows, as in newx8.py); pass step for an overlapping scan.
+# Sizes and strides must be multiples of the grid step.
+def scan_density(defects, length, width=1.5, sizes=DEFAULT_SIZES, strides=None, step=1.0):
+    table = DefectTable.coerce(defects)
+    sizes = np.asarray(sizes, dtype=float)
+    strides = sizes if strides is None else np.broadcast_to(np.asarray(strides, dtype=float), sizes.shape)
+    size_steps = _grid_steps(sizes, step, 'window sizes')
+    stride_steps = _grid_steps(strides, step, 'strides')
+
+    # Window starts are the grid points below int(length), like range(0, int(length), interval) in newx8.py;
+    # the grid runs on to the end of the longest window from the last start
+    start_cells = math.ceil(math.floor(length) / step)
+    cells = start_cells + int(size_steps.max())
+    bins = np.floor(table.starts / step).astype(np.intp)
+    inside = (table.starts >= 0) & (bins < cells)
+    cumulative = np.concatenate(([0.0], np.cumsum(np.bincount(bins[inside], weights=table.points[inside],
+                                                              minlength=cells))))
+
+    columns = np.arange(start_cells)
+    points = cumulative[columns[None, :] + size_steps[:, None]] - cumulative[columns][None, :]
+    points[columns[None, :] % stride_steps[:, None] != 0] = np.nan
+    return DensityScan(sizes, strides, columns * step, points, length, width)
+
+
+if __name__ == "__main__":
+    # python -m fabricopt.density Combined/combined_file.xlsx [top]: hotspots of every roll, then one chart per roll
+    from .cache import load_rolls
+    from .export import safe_name
+    from .plotting import DensityChart
+
+    rolls = load_rolls([sys.argv[1] if len(sys.argv) > 1 else 'Combined/combined_file.xlsx'])
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    scans = []
+    for roll in rolls:
+        scan = scan_density(roll['defects'], roll['length'], roll.get('width', 1.5))
+        hotspots = scan.hotspots(top, overlapping=False)
+        scans.append((roll, scan, hotspots))
+        print(f"{roll['name']}:")
+        for hotspot in hotspots:
+            print(f"  {hotspot['start']:g}-{hotspot['end']:g} m ({hotspot['size']:g} m window): "
+                  f"{hotspot['points']:g} points, density {hotspot['density']:.2f}")
+
+    # Rendering is a separate pass over the finished scans, on one reused chart
+    chart = DensityChart()
+    for roll, scan, hotspots in scans:
+        chart.update(scan, hotspots, title=f"{roll['name']}: Defect Density by Interval")
+        chart.save(f"{safe_name(roll['name'])}_density.png", dpi=100)
@@ -0,0 +1,125 @@
+import numpy as np
+
+from .defects import DefectTable, merge_sections
+from .planner import cut_boundaries
+
+
+# A roll split into elementary segments at every candidate cut boundary (each defect's cut start
+# and the end of the cut behind it). A cut plan is then a keep/remove mask over the segments,
+# and a defect belongs to the segment holding its 'from' position.
+class RollSegments:
+    def __init__(self, defects, length, width, cut_margin=0.5):
+        table = DefectTable.coerce(defects)
+        self.length = length
+        self.width = width
+        cut_starts, piece_starts, can_cut_before, can_start_piece = cut_boundaries(table, length, cut_margin)
+        self.edges = np.unique(np.concatenate(([0.0, length], cut_starts, piece_starts)))
+        self.edges = self.edges[(self.edges >= 0) & (self.edges <= length)]
+        self.lengths = np.diff(self.edges)
+        segment = np.clip(np.searchsorted(self.edges, table.starts, side='right') - 1, 0, len(self.lengths) - 1)
+        self.points = np.bincount(segment, weights=table.points, minlength=len(self.lengths)).astype(float)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    # Function to turn lists of removed (start, end) sections into a keep-mask matrix, one row per plan
+    def masks_from_sections(self, plans):
+        middles = (self.edges[:-1] + self.edges[1:]) / 2
+        masks = np.ones((len(plans), len(self)), dtype=bool)
+        for row, removed_sections in enumerate(plans):
+            section_starts, section_ends = merge_sections(removed_sections)
+            if len(section_starts):
+                index = np.searchsorted(section_starts, middles, side='right') - 1
+                masks[row] = ~((index >= 0) & (section_ends[np.maximum(index, 0)] >= middles))
+        return masks
+
+    # Function to turn a keep mask over the segments back into removed and kept (start, end) sections
+    def sections_from_mask(self, keep_mask):
+        rows, starts, ends = kept_runs(np.atleast_2d(keep_mask))
+        kept_sections = [(float(self.edges[start]), float(self.edges[end])) for start, end in zip(starts, ends)]
+        removed_sections = []
+        position = 0.0
+        for start, end in kept_sections:
+            if start > position:
+                removed_sections.append((position, start))
+            position = end
+        if position < self.length:
+            removed_sections.append((position, float(self.length)))
+        return removed_sections, kept_sections
+
+
+# Function to find the kept runs of many masks as (plan row, first segment, one past the last segment) arrays
+def kept_runs(keep_masks):
+    padded = np.zeros((keep_masks.shape[0], keep_masks.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = keep_masks
+    steps = np.diff(padded, axis=1)
+    rows, columns = np.nonzero(steps)
+    rising = steps[rows, columns] == 1
+    return rows[rising], columns[rising], columns[~rising]
+
+
+# Function to score one plan given as removed (start, end) sections, exactly rather than on segments:
+# kept pieces are the gaps between removed sections, defects touching a removed section are gone,
+# and every kept piece after the first adds join_penalty points
+def evaluate_sections(defects, length, width, removed_sections, join_penalty=4):
+    table = DefectTable.coerce(defects)
+    section_starts, section_ends = merge_sections([(max(start, 0), min(end, length)) for start, end in removed_sections])
+    kept_sections = []
+    position = 0
+    for start, end in zip(section_starts.tolist(), section_ends.tolist()):
+        if start > position:
+            kept_sections.append((position, start))
+        position = max(position, end)
+    if position < length:
+        kept_sections.append((position, length))
+
+    kept_length = sum(end - start for start, end in kept_sections)
+    kept_points = table.total_points(table.outside(removed_sections))
+    penalized_points = kept_points + join_penalty * max(len(kept_sections) - 1, 0)
+    ppms = (penalized_points * 100) / (kept_length * width) if kept_length > 0 else 0.0
+    return {
+        'kept_sections': kept_sections,
+        'kept_length': kept_length,
+        'kept_points': kept_points,
+        'penalized_points': penalized_points,
+        'ppms': ppms,
+        'shortest_piece': min((end - start for start, end in kept_sections), default=0.0),
+    }
+
+
+# Function to score many candidate cut plans at once.
+# keep_masks is a (plans x segments) boolean matrix; every kept run after the first counts as a join
+# and adds join_penalty points. Only the run boundaries are extracted from the matrix; lengths and
+# points of the runs then come from the roll's prefix sums. Returns arrays with one entry per plan.
+def evaluate_plans(segments, keep_masks, join_penalty=4):
+    keep = np.atleast_2d(np.asarray(keep_masks, dtype=bool))
+    plans = keep.shape[0]
+    length_prefix = np.concatenate(([0.0], np.cumsum(segments.lengths)))
+    points_prefix = np.concatenate(([0.0], np.cumsum(segments.points)))
+
+    # Kept runs start where the mask steps 0 -> 1 and end where it steps 1 -> 0
+    run_rows, run_starts, run_ends = kept_runs(keep)
+
+    run_lengths = length_prefix[run_ends] - length_prefix[run_starts]
+    kept_length = np.bincount(run_rows, weights=run_lengths, minlength=plans)
+    kept_points = np.bincount(run_rows, weights=points_prefix[run_ends] - points_prefix[run_starts], minlength=plans)
+    pieces = np.bincount(run_rows, minlength=plans)
+    joins = np.maximum(pieces - 1, 0)
+    penalized_points = kept_points + join_penalty * joins
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ppms = np.where(kept_length > 0, (penalized_points * 100) / (kept_length * segments.width), 0.0)
+
+    # Shortest kept piece per plan, for the minimum-piece (< 20 m) rule
+    shortest_piece = np.full(plans, np.inf)
+    np.minimum.at(shortest_piece, run_rows, run_lengths)
+
+    return {
+        'kept_length': kept_length,
+        'kept_points': kept_points,
+        'pieces': pieces,
+        'joins': joins,
+        'penalized_points': penalized_points,
+        'ppms': ppms,
+        'shortest_piece': shortest_piece,
+    }
@@ -0,0 +1,326 @@
+import io
+import sys
+import threading
+import time
+from collections import Counter
+
+from .cutting import remove_sections
+from .density import scan_density
+from .strategies import RollIndex
+
+# Slider defaults of dataanalysis.py
+DEFAULT_PARAMETERS = {
+    'threshold_ppms': 23,
+    'min_usable_length': 5,
+    'max_gap': 4,
+    'num_sections': 3,
+    'include_point_loss': True,
+    'depth': 6,
+    'section_size': 5,
+}
+PLOTS = ('distribution_plot', 'density_plot', 'sections_plot', 'ppms_plot')
+MAX_SECTION_LABELS = 30
+
+
+def _same(old, new):
+    try:
+        return bool(old == new)
+    except (ValueError, TypeError):
+        return False
+
+
+# Dependency-tracked recompute graph.
+# Inputs are named values set with set(); nodes are functions of inputs and other nodes. Every input and node
+# carries a version that is bumped when its value changes, and a node only reruns when the versions of its own
+# dependencies differ from the ones it last ran with. A node whose rerun gives an equal value keeps its version,
+# so the nodes behind it do not rerun either. `runs` counts how often each node ran.
+class RecomputeGraph:
+    def __init__(self):
+        self.functions = {}
+        self.dependencies = {}
+        self.values = {}
+        self.versions = {}
+        self.seen = {}
+        self.runs = Counter()
+        self.lock = threading.RLock()
+
+    def input(self, name, value):
+        self.values[name] = value
+        self.versions[name] = 0
+
+    def node(self, name, function, *dependencies):
+        self.functions[name] = function
+        self.dependencies[name] = dependencies
+        self.versions[name] = 0
+
+    # Function to change inputs; returns the names whose value actually changed
+    def set(self, **values):
+        with self.lock:
+            changed = []
+            for name, value in values.items():
+                if name in self.functions or name not in self.values:
+                    raise KeyError(f"unknown input {name!r}")
+                if not _same(self.values[name], value):
+                    self.values[name] = value
+                    self.versions[name] += 1
+                    changed.append(name)
+            return changed
+
+    def _refresh(self, name):
+        if name not in self.functions:
+            return
+        for dependency in self.dependencies[name]:
+            self._refresh(dependency)
+        stamp = tuple(self.versions[dependency] for dependency in self.dependencies[name])
+        if self.seen.get(name) == stamp:
+            return
+        value = self.functions[name](*(self.values[dependency] for dependency in self.dependencies[name]))
+        self.runs[name] += 1
+        self.seen[name] = stamp
+        if name not in self.values or not _same(self.values[name], value):
+            self.values[name] = value
+            self.versions[name] += 1
+
+    def get(self, name):
+        with self.lock:
+            self._refresh(name)
+            return self.values[name]
+
+    def version(self, name):
+        with self.lock:
+            self._refresh(name)
+            return self.versions[name]
+
+
+# Function to cut the combined sections out of the roll (cutting.remove_sections) and win back fabric from them:
+# removed sections longer than `depth` are checked in depth-meter blocks, and blocks that meet the threshold
+# and are at least min_usable_length long are kept (the salvage step of dataanalysis.py's remove_sections).
+# Section scores come from the index's score cache, so moving the threshold only re-reads them.
+def remove_and_salvage(index, sections, min_usable_length, threshold_ppms, depth):
+    new_defects, new_length, total_cut_length, removed_sections, kept_sections = remove_sections(
+        index.table, index.length, index.width, sections, min_usable_length)
+    kept_sections = list(kept_sections)
+    salvaged = []
+    for start, end in removed_sections:
+        if end - start + 1 > depth:
+            for block_start in range(int(start), int(end) - depth + 2, depth):
+                block_end = block_start + depth - 1
+                if (block_end - block_start + 1 >= min_usable_length
+                        and index.section_ppms(block_start, block_end) <= threshold_ppms):
+                    salvaged.append((block_start, block_end))
+    salvaged_length = sum(end - start + 1 for start, end in salvaged)
+    kept_sections = sorted(kept_sections + salvaged)
+    return {
+        'removed_sections': removed_sections,
+        'kept_sections': kept_sections,
+        'salvaged_sections': salvaged,
+        'new_length': new_length + salvaged_length,
+        'total_cut_length': total_cut_length - salvaged_length,
+        'kept_points': index.table.total_points(index.table.starts_within(kept_sections)),
+    }
+
+
+# PPMS of the kept fabric; with include_point_loss every join between kept pieces costs 4 points
+def kept_ppms(removal, width, include_point_loss, join_penalty=4):
+    if removal['new_length'] <= 0:
+        return 0.0
+    points = removal['kept_points']
+    if include_point_loss:
+        points += join_penalty * max(len(removal['kept_sections']) - 1, 0)
+    return (points * 100) / (removal['new_length'] * width)
+
+
+# Interactive parameter exploration of one roll (update_plots of dataanalysis.py) on a RecomputeGraph.
+# Stages: density scan, section search, removal, PPMS and the four plots, each rerun only when its inputs change:
+# moving threshold_ppms reruns the removal, the PPMS and the two plots behind them, never the section search.
+# Plots are drawn on reused offscreen charts and kept as PNG bytes.
+class ParameterExplorer:
+    def __init__(self, defects, length, width=1.5, dpi=72, cache=None, **parameters):
+        self.dpi = dpi
+        self.charts = {}
+        self.plot_versions = {}
+        graph = self.graph = RecomputeGraph()
+        for name, value in {**DEFAULT_PARAMETERS, **parameters}.items():
+            graph.input(name, value)
+        graph.input('index', RollIndex(defects, length, width, cache=cache))
+
+        graph.node('original_ppms', lambda index: index.original_ppms, 'index')
+        graph.node('density_scan', lambda index, size: scan_density(index.table, index.length, index.width, [size]),
+                   'index', 'section_size')
+        graph.node('sections', self._sections, 'index', 'num_sections', 'max_gap')
+        graph.node('removal', remove_and_salvage, 'index', 'sections', 'min_usable_length', 'threshold_ppms', 'depth')
+        graph.node('ppms', lambda index, removal, point_loss: kept_ppms(removal, index.width, point_loss),
+                   'index', 'removal', 'include_point_loss')
+        graph.node('distribution_plot', self._distribution_plot, 'index')
+        graph.node('density_plot', self._density_plot, 'density_scan')
+        graph.node('sections_plot', self._sections_plot, 'index', 'removal')
+        graph.node('ppms_plot', self._ppms_plot, 'index', 'original_ppms', 'removal', 'ppms')
+
+    # Combined highest-density section; the index memoizes every densest-section search,
+    # so raising num_sections only searches for the new sections
+    @staticmethod
+    def _sections(index, num_sections, max_gap):
+        sections = []
+        for _ in range(num_sections):
+            section = index.densest_section(sections, max_gap)
+            if section is not None and section != (0, 0):
+                sections.append(section)
+        if not sections:
+            return []
+        return [(min(start for start, end in sections), max(end for start, end in sections))]
+
+    def _chart(self, name, cls):
+        if name not in self.charts:
+            self.charts[name] = cls()
+        return self.charts[name]
+
+    def _png(self, chart):
+        buffer = io.BytesIO()
+        chart.save(buffer, dpi=self.dpi, format='png')
+        return buffer.getvalue()
+
+    def _distribution_plot(self, index):
+        from .plotting import DistributionChart
+
+        chart = self._chart('distribution', DistributionChart)
+        chart.update(index.table.starts, index.length)
+        return self._png(chart)
+
+    def _density_plot(self, scan):
+        from .plotting import DensityChart
+
+        chart = self._chart('density', DensityChart)
+        chart.update(scan, scan.hotspots(3, overlapping=False), title='Defect Density Analysis by Sections')
+        return self._png(chart)
+
+    def _sections_plot(self, index, removal):
+        from .plotting import FabricSectionsChart
+
+        chart = self._chart('sections', FabricSectionsChart)
+        chart.update(index.length, removal['new_length'], removal['removed_sections'], removal['kept_sections'],
+                     index.width, max_labels=MAX_SECTION_LABELS)
+        return self._png(chart)
+
+    def _ppms_plot(self, index, original_ppms, removal, ppms):
+        from .plotting import PPMSChart
+
+        chart = self._chart('ppms', PPMSChart)
+        chart.update(original_ppms, ppms, index.length, removal['new_length'], removal['total_cut_length'])
+        return self._png(chart)
+
+    # Function to apply new parameter values and return the results plus the PNG of every plot that changed
+    # since the last call
+    def update(self, render=True, **parameters):
+        self.graph.set(**parameters)
+        changed = {}
+        if render:
+            for name in PLOTS:
+                version = self.graph.version(name)
+                if self.plot_versions.get(name) != version:
+                    self.plot_versions[name] = version
+                    changed[name] = self.graph.get(name)
+        return {
+            'original_ppms': self.graph.get('original_ppms'),
+            'ppms': self.graph.get('ppms'),
+            'sections': self.graph.get('sections'),
+            'removal': self.graph.get('removal'),
+            'plots': changed,
+        }
+
+
+# Debounced call: calls made within `delay` seconds of each other are merged (later keyword values win)
+# into one call of `function`, which runs on a timer thread. While calls keep coming, e.g. while a slider
+# is dragged, one still goes through at least every `max_wait` seconds so the plots follow the drag.
+class Debouncer:
+    def __init__(self, function, delay=0.1, max_wait=0.3):
+        self.function = function
+        self.delay = delay
+        self.max_wait = max_wait
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.first_call = None
+        self.timer = None
+
+    def __call__(self, **values):
+        with self.lock:
+            self.pending.update(values)
+            now = time.monotonic()
+            if self.first_call is None:
+                self.first_call = now
+            if self.timer is not None:
+                self.timer.cancel()
+            wait = 0 if now - self.first_call >= self.max_wait else self.delay
+            self.timer = threading.Timer(wait, self._fire)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _fire(self):
+        with self.lock:
+            values, self.pending = self.pending, {}
+            self.first_call = None
+            self.timer = None
+        if values:
+            self.function(**values)
+
+    # Function to run a pending call now (for scripts and shutdown)
+    def flush(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+        self._fire()
+
+
+# Function to build the ipywidgets panel of dataanalysis.py around an explorer: the same sliders, with debounced
+# updates that only replace the images of the plots that changed. Display the returned widget in a notebook.
+def explorer_widgets(explorer, delay=0.1, max_wait=0.3):
+    import ipywidgets as widgets
+
+    values = explorer.graph.values
+    controls = {
+        'threshold_ppms': widgets.FloatSlider(value=values['threshold_ppms'], min=0, max=50, step=1,
+                                              description='Threshold PPMS:'),
+        'min_usable_length': widgets.IntSlider(value=values['min_usable_length'], min=1, max=10, step=1,
+                                               description='Min Usable Length:'),
+        'max_gap': widgets.IntSlider(value=values['max_gap'], min=1, max=20, step=1, description='Max Gap:'),
+        'num_sections': widgets.IntSlider(value=values['num_sections'], min=1, max=10, step=1, description='Num Sections:'),
+        'include_point_loss': widgets.Checkbox(value=values['include_point_loss'], description='Include Point Loss'),
+    }
+    images = {name: widgets.Image(format='png') for name in PLOTS}
+    summary = widgets.Label()
+
+    def show(**parameters):
+        result = explorer.update(**parameters)
+        for name, png in result['plots'].items():
+            images[name].value = png
+        summary.value = (f"PPMS {result['original_ppms']:.2f} -> {result['ppms']:.2f}, "
+                         f"kept {result['removal']['new_length']:g} m, sections {result['sections']}")
+
+    debounced = Debouncer(show, delay, max_wait)
+    for name, control in controls.items():
+        control.observe(lambda change, name=name: debounced(**{name: change['new']}), names='value')
+    show()
+    return widgets.VBox([widgets.HBox(list(controls.values())[:3]), widgets.HBox(list(controls.values())[3:]), summary]
+                        + [images[name] for name in PLOTS])
+
+
+if __name__ == "__main__":
+    # python -m fabricopt.explore [defect count]: sweep the threshold on a synthetic roll and time every update
+    from .benchmark import generate_roll
+
+    roll = generate_roll(defect_count=int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
+    explorer = ParameterExplorer(roll['defects'], roll['length'], roll['width'])
+    start = time.perf_counter()
+    explorer.update()
+    print(f"first update: {time.perf_counter() - start:.3f} s")
+
+    timings = []
+    for threshold in range(10, 41):
+        start = time.perf_counter()
+        explorer.update(threshold_ppms=threshold)
+        timings.append(time.perf_counter() - start)
+    print(f"threshold sweep: {len(timings)} updates, mean {1000 * sum(timings) / len(timings):.1f} ms, "
+          f"max {1000 * max(timings):.1f} ms")
+    start = time.perf_counter()
+    explorer.update(num_sections=explorer.graph.values['num_sections'] + 1)
+    print(f"num_sections + 1: {time.perf_counter() - start:.3f} s")
+    print('stage runs:', dict(explorer.graph.runs))
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+from datetime import datetime
+
+# Export modes: file extension and dpi ("preview" is a quick low-resolution PNG)
+EXPORT_MODES = {
+    'png': ('png', 300),
+    'preview': ('png', 72),
+    'svg': ('svg', 72),
+    'pdf': ('pdf', 72),
+}
+INDEX_FILE = 'exported.json'
+
+
+# Function to hash a cut plan together with the export mode, so the same plan is only rendered once per mode
+def plan_hash(original_length, remaining_length, removed_sections, remaining_sections, width, mode):
+    plan = [original_length, remaining_length, [list(section) for section in removed_sections],
+            [list(section) for section in remaining_sections], width, mode]
+    return hashlib.sha256(json.dumps(plan, default=float).encode()).hexdigest()
+
+
+# Function to make a roll name safe to use in a file name
+def safe_name(name):
+    return re.sub(r'[^\w.-]+', '_', str(name)).strip('_') or 'roll'
+
+
+# Background render queue for fabric_sections images.
+# submit() only enqueues the plan; one worker thread renders it on its own Agg chart and writes
+# <output_dir>/<roll>_fabric_sections_<timestamp>_<hash>.<ext>. Plans whose content hash was already exported
+# (recorded in exported.json in the output folder, so this survives restarts) are skipped.
+# Finished exports are collected in `completed` as (roll, file path, error message or None).
+class RenderQueue:
+    def __init__(self, output_dir='.', mode='png'):
+        self.output_dir = output_dir
+        self.mode = mode
+        self.jobs = queue.Queue()
+        self.completed = queue.Queue()
+        self.lock = threading.Lock()
+        self.index = self._read_index()
+        self.queued = set()
+        self.worker = threading.Thread(target=self._work, name='fabric-export', daemon=True)
+        self.worker.start()
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.output_dir, INDEX_FILE)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        temporary = os.path.join(self.output_dir, INDEX_FILE + '.tmp')
+        with open(temporary, 'w') as file:
+            json.dump(self.index, file, indent=1)
+        os.replace(temporary, os.path.join(self.output_dir, INDEX_FILE))
+
+    # Function to queue a plan for export; returns False if the same plan was already exported or queued
+    def submit(self, roll, original_length, remaining_length, removed_sections, remaining_sections, width, mode=None):
+        mode = mode or self.mode
+        key = plan_hash(original_length, remaining_length, removed_sections, remaining_sections, width, mode)
+        with self.lock:
+            if key in self.index or key in self.queued:
+                return False
+            self.queued.add(key)
+        self.jobs.put((key, roll, mode, (original_length, remaining_length, list(removed_sections),
+                                         list(remaining_sections), width)))
+        return True
+
+    def _work(self):
+        from .plotting import FabricSectionsChart
+
+        chart = None
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+            key, roll, mode, plan = job
+            try:
+                chart = chart or FabricSectionsChart()
+                chart.update(*plan)
+                extension, dpi = EXPORT_MODES[mode]
+                timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+                file_path = os.path.join(self.output_dir,
+                                         f'{safe_name(roll)}_fabric_sections_{timestamp}_{key[:8]}.{extension}')
+                os.makedirs(self.output_dir, exist_ok=True)
+                chart.save(file_path, dpi=dpi)
+                with self.lock:
+                    self.index[key] = os.path.basename(file_path)
+                    self.queued.discard(key)
+                    self._write_index()
+                self.completed.put((roll, file_path, None))
+            except Exception as exc:
+                with self.lock:
+                    self.queued.discard(key)
+                self.completed.put((roll, None, f"{type(exc).__name__}: {exc}"))
+            finally:
+                self.jobs.task_done()
+
+    # Function to return the exports finished since the last call, without waiting
+    def drain(self):
+        finished = []
+        while True:
+            try:
+                finished.append(self.completed.get_nowait())
+            except queue.Empty:
+                return finished
+
+    # Function to wait for every queued export (for scripts; the GUI never calls this)
+    def join(self):
+        self.jobs.join()
+
+    def close(self):
+        self.jobs.put(None)
@@ -0,0 +1,57 @@
+import numpy as np
+
+from .defects import DefectTable
+
+
+# Function to find high-density sections: runs of defects that touch or overlap (next 'from' <= end + 1),
+# spanning at least 1 meter. Returns (start, end, points) tuples.
+def find_high_density_sections(table):
+    if not len(table):
+        return []
+    # A new run starts wherever a defect begins more than 1 m after everything before it has ended
+    reach = np.maximum.accumulate(table.ends)
+    breaks = np.flatnonzero(table.starts[1:] > reach[:-1] + 1) + 1
+    run_starts = np.concatenate(([0], breaks))
+    run_ends = np.concatenate((breaks, [len(table)])) - 1
+    starts = table.starts[run_starts]
+    ends = reach[run_ends]
+    points = np.add.reduceat(table.points, run_starts)
+    long_enough = ends - starts >= 1  # Section length should be greater than 1 meter
+    return list(zip(starts[long_enough].tolist(), ends[long_enough].tolist(), points[long_enough].tolist()))
+
+
+# Function to maximize remaining length while keeping points per 100 sqm <= target, paying cut_penalty per cut.
+# Same greedy as newoptmizenewnew7.py / code_with_removed_max2cuts.py, except that the points of the removed
+# defects are taken off the total (the scripts subtracted them from the already-filtered list, i.e. nothing).
+def maximize_remaining_length_with_cut_penalty(defects, length, width, target_points_per_100_sqm, cut_penalty=4,
+                                               min_remaining_length_ratio=0.0):
+    remaining_defects = DefectTable.coerce(defects)
+    total_points = remaining_defects.total_points()
+    remaining_length = length
+
+    points_per_100_sqm = (total_points * 100) / (remaining_length * width)
+    cut_ranges = []
+
+    while (points_per_100_sqm > target_points_per_100_sqm and len(remaining_defects)
+           and remaining_length > min_remaining_length_ratio * length):
+        high_density_sections = find_high_density_sections(remaining_defects)
+        if not high_density_sections:
+            break
+
+        # Remove the section with the highest density (defect points / length)
+        start, end, _ = max(high_density_sections, key=lambda x: x[2] / (x[1] - x[0] + 1))
+        cut_ranges.append((start, end))
+
+        # Remove all defects in the cut range
+        keep = remaining_defects.outside([(start, end)])
+        total_points -= remaining_defects.total_points(~keep)
+        remaining_defects = remaining_defects.select(keep)
+        total_points += cut_penalty  # Add cut penalty
+        remaining_length -= (end - start + 1)
+        if remaining_length <= 0:
+            break
+        points_per_100_sqm = (total_points * 100) / (remaining_length * width)
+
+    cut_positions = [(start + end) / 2 for start, end in cut_ranges]
+
+    return cut_positions, points_per_100_sqm, remaining_length, cut_ranges
@@ -0,0 +1,295 @@
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from tkinter import ttk
+
+from .cutting import remove_sections
+from .export import EXPORT_MODES, RenderQueue
+from .plotting import FabricSectionsChart, PPMSChart
+from .scoring import calculate_ppms, find_combined_highest_density_sections
+
+POLL_INTERVAL_MS = 50
+CLICK_COALESCE_MS = 150
+
+
+# Function to run the optimization of newgui.py's main() as a sequence of stages.
+# Yields (stage, values) as each stage finishes; the section search runs on `pool` and `cancelled`
+# (a threading.Event) is checked while waiting for it and between stages, so a cancelled job stops at the next
+# stage boundary. A search already running in a worker process cannot be stopped: the job stops waiting for it
+# and it finishes in the background with its result discarded.
+def optimization_stages(defects, length, width, threshold_ppms, num_sections, pool, cancelled):
+    original_ppms = calculate_ppms(defects, length, width)
+    yield 'original', {'original_ppms': original_ppms, 'length': length}
+    if original_ppms <= threshold_ppms:
+        yield 'within_limits', {}
+        return
+
+    search = pool.submit(find_combined_highest_density_sections, defects, width, num_sections)
+    while True:
+        if cancelled.wait(POLL_INTERVAL_MS / 1000):
+            # Only drops a search that has not started yet
+            search.cancel()
+            return
+        if search.done():
+            break
+    sections = search.result()
+    yield 'sections', {'sections': sections}
+    if cancelled.is_set():
+        return
+
+    new_defects, new_length, total_cut_length, removed_sections, remaining_sections = remove_sections(
+        defects, length, width, sections)
+    yield 'removed', {
+        'length': length,
+        'width': width,
+        'original_ppms': original_ppms,
+        'sections': sections,
+        'new_ppms': calculate_ppms(new_defects, new_length, width),
+        'new_length': new_length,
+        'total_cut_length': total_cut_length,
+        'removed_sections': removed_sections,
+        'remaining_sections': remaining_sections,
+    }
+
+
+# Background runner for optimization jobs.
+# Jobs run one at a time on a controller thread, with the heavy search on a process pool. Stage results go
+# through a queue that the Tk main loop drains with after(), so widgets are only touched on the main thread.
+# Requesting a job abandons the running one right away: its output is dropped from then on and it stops at its
+# next stage boundary. Clicks that arrive close together are coalesced into one job with the latest inputs.
+class OptimizationRunner:
+    def __init__(self, root, on_stage, on_finished, max_workers=None):
+        self.root = root
+        self.on_stage = on_stage
+        self.on_finished = on_finished
+        self.pool = ProcessPoolExecutor(max_workers=max_workers)
+        self.controller = ThreadPoolExecutor(max_workers=1)
+        self.messages = queue.Queue()
+        self.job_id = 0
+        self.cancelled = threading.Event()
+        self.pending = None
+        self.scheduled = None
+        self.poll()
+
+    # Function to request a job; repeated requests within CLICK_COALESCE_MS become a single job
+    def submit(self, *args):
+        # Output of the running job is stale from now on, even before the new job starts
+        self.cancelled.set()
+        self.job_id += 1
+        self.pending = args
+        if self.scheduled is not None:
+            self.root.after_cancel(self.scheduled)
+        self.scheduled = self.root.after(CLICK_COALESCE_MS, self._start_pending)
+
+    def _start_pending(self):
+        self.scheduled = None
+        args, self.pending = self.pending, None
+        self.cancelled = threading.Event()
+        self.controller.submit(self._run, self.job_id, self.cancelled, args)
+
+    def _run(self, job_id, cancelled, args):
+        try:
+            for stage, values in optimization_stages(*args, self.pool, cancelled):
+                self.messages.put((job_id, stage, values))
+        except CancelledError:
+            pass
+        except Exception as exc:
+            self.messages.put((job_id, 'error', f"{type(exc).__name__}: {exc}"))
+            return
+        self.messages.put((job_id, 'cancelled' if cancelled.is_set() else 'finished', None))
+
+    # Function to cancel the running job and any click still waiting to start
+    def cancel(self):
+        self.cancelled.set()
+        if self.scheduled is not None:
+            self.root.after_cancel(self.scheduled)
+            self.scheduled = None
+            self.pending = None
+            # Ignore whatever the running job still reports
+            self.job_id += 1
+            self.on_finished('cancelled', None)
+
+    def poll(self):
+        while True:
+            try:
+                job_id, stage, values = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            # Drop output of jobs that were cancelled or replaced
+            if job_id != self.job_id:
+                continue
+            if stage in ('finished', 'cancelled', 'error'):
+                self.on_finished(stage, values)
+            else:
+                self.on_stage(stage, values)
+        self.root.after(POLL_INTERVAL_MS, self.poll)
+
+    def shutdown(self):
+        self.cancel()
+        self.controller.shutdown(wait=False, cancel_futures=True)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# GUI Application
+class FabricOptimizerApp(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("Fabric Optimizer")
+
+        # Defects data
+        self.defects = [
+            {"from": 2, "to": 5, "points": 12},
+            {"from": 10, "to": 10, "points": 1},
+            {"from": 22, "to": 22, "points": 4},
+            {"from": 23, "to": 28, "points": 20},
+            {"from": 35, "to": 35, "points": 2},
+            {"from": 39, "to": 39, "points": 4},
+            {"from": 46, "to": 46, "points": 2},
+            {"from": 70, "to": 70, "points": 2}
+        ]
+
+        # Input fields
+        self.length_var = tk.DoubleVar(value=69.6)
+        self.width_var = tk.DoubleVar(value=1.5)
+        self.threshold_ppms_var = tk.DoubleVar(value=23)
+        self.num_sections_var = tk.IntVar(value=2)
+        self.status_var = tk.StringVar(value="Ready")
+        self.export_mode_var = tk.StringVar(value='png')
+        self.export_status_var = tk.StringVar(value="")
+
+        input_frame = tk.Frame(self)
+        input_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+
+        tk.Label(input_frame, text="Fabric Length (meters):").grid(row=0, column=0, padx=5, pady=5)
+        tk.Entry(input_frame, textvariable=self.length_var).grid(row=0, column=1, padx=5, pady=5)
+
+        tk.Label(input_frame, text="Fabric Width (meters):").grid(row=1, column=0, padx=5, pady=5)
+        tk.Entry(input_frame, textvariable=self.width_var).grid(row=1, column=1, padx=5, pady=5)
+
+        tk.Label(input_frame, text="Threshold PPMS:").grid(row=2, column=0, padx=5, pady=5)
+        tk.Entry(input_frame, textvariable=self.threshold_ppms_var).grid(row=2, column=1, padx=5, pady=5)
+
+        tk.Label(input_frame, text="Number of Sections to Remove:").grid(row=3, column=0, padx=5, pady=5)
+        tk.Entry(input_frame, textvariable=self.num_sections_var).grid(row=3, column=1, padx=5, pady=5)
+
+        self.result_text = tk.Text(input_frame, height=10, width=50)
+        self.result_text.grid(row=4, column=0, columnspan=2, padx=5, pady=5)
+
+        self.canvas_frame1 = tk.Frame(self)
+        self.canvas_frame1.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        self.canvas_frame2 = tk.Frame(self)
+        self.canvas_frame2.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        # Charts are created once and updated in place on every run
+        self.ppms_chart = PPMSChart(self.canvas_frame1)
+        self.sections_chart = FabricSectionsChart(self.canvas_frame2)
+
+        self.info_frame = tk.Frame(self)
+        self.info_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+
+        # Info labels are created once as well; show_plots only changes their text
+        self.info_labels = {}
+        for key, bold, pady in [('original', False, 5), ('cut', False, 5), ('remaining', False, 5),
+                                ('removed_title', True, 5), ('removed', False, 2),
+                                ('remaining_title', True, 5), ('remaining_sections', False, 2)]:
+            font = ('Helvetica', 12, 'bold') if bold else ('Helvetica', 12)
+            self.info_labels[key] = ttk.Label(self.info_frame, font=font, justify=tk.CENTER)
+            self.info_labels[key].pack(pady=pady)
+
+        tk.Button(input_frame, text="Optimize Fabric", command=self.optimize_fabric).grid(row=5, column=0, pady=10)
+        self.cancel_button = tk.Button(input_frame, text="Cancel", command=self.cancel_optimization, state=tk.DISABLED)
+        self.cancel_button.grid(row=5, column=1, pady=10)
+        tk.Label(input_frame, textvariable=self.status_var).grid(row=6, column=0, columnspan=2)
+
+        tk.Label(input_frame, text="Export Format:").grid(row=7, column=0, padx=5, pady=5)
+        tk.OptionMenu(input_frame, self.export_mode_var, *EXPORT_MODES).grid(row=7, column=1, padx=5, pady=5)
+        tk.Label(input_frame, textvariable=self.export_status_var).grid(row=8, column=0, columnspan=2)
+
+        # Images are written by a background queue; the window only polls for finished exports
+        self.exports = RenderQueue(output_dir='reports')
+        self.check_exports()
+
+        self.runner = OptimizationRunner(self, self.show_stage, self.finish_optimization)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def optimize_fabric(self):
+        length = self.length_var.get()
+        width = self.width_var.get()
+        threshold_ppms = self.threshold_ppms_var.get()
+        num_sections = self.num_sections_var.get()
+
+        self.result_text.delete("1.0", tk.END)
+        self.status_var.set("Optimizing...")
+        self.cancel_button.config(state=tk.NORMAL)
+        self.runner.submit(self.defects, length, width, threshold_ppms, num_sections)
+
+    def cancel_optimization(self):
+        self.runner.cancel()
+        self.status_var.set("Cancelling...")
+
+    # Function to show each stage's results as soon as the worker reports them
+    def show_stage(self, stage, values):
+        if stage == 'original':
+            self.result_text.insert(tk.END, f"Original PPMS: {values['original_ppms']}\n")
+            self.result_text.insert(tk.END, f"Original Length: {values['length']} meters\n")
+        elif stage == 'within_limits':
+            self.result_text.insert(tk.END, "PPMS is within acceptable limits. No need to cut the fabric.\n")
+        elif stage == 'sections':
+            self.status_var.set("Removing sections...")
+            self.result_text.insert(tk.END, f"Sections found: {values['sections']}\n")
+        elif stage == 'removed':
+            self.result_text.insert(tk.END, f"New PPMS after removing sections {values['sections']}: {values['new_ppms']}\n")
+            self.result_text.insert(tk.END, f"Total Length of cut parts: {values['total_cut_length']} meters\n")
+            self.result_text.insert(tk.END, f"Remaining Length: {values['new_length']} meters\n")
+            self.show_plots(values)
+            if self.exports.submit('roll', values['length'], values['new_length'], values['removed_sections'],
+                                   values['remaining_sections'], values['width'], self.export_mode_var.get()):
+                self.export_status_var.set("Exporting fabric sections...")
+        self.result_text.see(tk.END)
+
+    def show_plots(self, values):
+        length = values['length']
+        self.ppms_chart.update(values['original_ppms'], values['new_ppms'], length, values['new_length'],
+                               values['total_cut_length'])
+        self.sections_chart.update(length, values['new_length'], values['removed_sections'],
+                                   values['remaining_sections'], values['width'])
+
+        # Displaying the lengths and meter counts in info_frame
+        labels = self.info_labels
+        labels['original'].config(text=f"Original Fabric: {length} meters")
+        labels['cut'].config(text=f"Cut Fabric: {values['total_cut_length']} meters")
+        labels['remaining'].config(text=f"Remaining Fabric: {values['new_length']} meters")
+        labels['removed_title'].config(text="Removed Sections (meters):")
+        labels['removed'].config(text="\n".join(f"From {start} to {end} ({end - start + 1} meters)"
+                                                for start, end in values['removed_sections']))
+        labels['remaining_title'].config(text="Remaining Sections (meters):")
+        labels['remaining_sections'].config(text="\n".join(f"From {start} to {end} ({end - start + 1} meters)"
+                                                           for start, end in values['remaining_sections']))
+
+    def finish_optimization(self, outcome, message):
+        self.cancel_button.config(state=tk.DISABLED)
+        if outcome == 'finished':
+            self.status_var.set("Done")
+        elif outcome == 'cancelled':
+            self.result_text.insert(tk.END, "Optimization cancelled.\n")
+            self.status_var.set("Cancelled")
+        else:
+            self.result_text.insert(tk.END, f"Optimization failed: {message}\n")
+            self.status_var.set("Failed")
+
+    def check_exports(self):
+        for roll, file_path, error in self.exports.drain():
+            self.export_status_var.set(f"Saved {file_path}" if error is None else f"Export failed: {error}")
+        self.after(500, self.check_exports)
+
+    def close(self):
+        self.exports.close()
+        self.runner.shutdown()
+        self.destroy()
+
+
+if __name__ == "__main__":
+    app = FabricOptimizerApp()
+    app.mainloop()
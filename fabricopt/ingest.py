@@ -0,0 +1,303 @@
+import hashlib
+import os
+import sqlite3
+import sys
+
+from .cache import file_hash
+from .rolls import FABRIC_INFO_FIELDS, read_sheet_values
+
+FABRIC_INFO_COLUMNS = [field for field, row, column in FABRIC_INFO_FIELDS]
+DEFECT_COLUMNS = ['fabric_id', 'from_mtr', 'to_mtr', 'defect_name', 'defect_type', 'points']
+
+CREATE_FABRIC_INFO = '''
+    CREATE TABLE IF NOT EXISTS fabric_info (
+        id INTEGER PRIMARY KEY,
+        sort_number TEXT,
+        fabric_type TEXT,
+        shade TEXT,
+        roll_number TEXT,
+        lot_number TEXT,
+        shade_group TEXT,
+        gross_meter REAL,
+        allowance REAL,
+        net_meter REAL,
+        gross_weight REAL,
+        net_weight REAL,
+        grade TEXT
+    )
+'''
+
+CREATE_DEFECTS = '''
+    CREATE TABLE IF NOT EXISTS defects (
+        id INTEGER PRIMARY KEY,
+        fabric_id INTEGER,
+        from_mtr REAL,
+        to_mtr REAL,
+        defect_name TEXT,
+        defect_type TEXT,
+        points INTEGER,
+        FOREIGN KEY (fabric_id) REFERENCES fabric_info (id)
+    )
+'''
+
+# One row per ingested sheet, plus one row per fully ingested workbook with an empty sheet_name
+CREATE_INGEST_MANIFEST = '''
+    CREATE TABLE IF NOT EXISTS ingest_manifest (
+        file_path TEXT NOT NULL,
+        sheet_name TEXT NOT NULL,
+        content_hash TEXT,
+        mtime REAL,
+        fabric_id INTEGER,
+        PRIMARY KEY (file_path, sheet_name)
+    )
+'''
+
+# The same tables on SQL Server, where ids are IDENTITY columns filled by the server
+CREATE_SQL_SERVER_TABLES = [
+    '''
+    IF OBJECT_ID('fabric_info') IS NULL CREATE TABLE fabric_info (
+        id INT IDENTITY PRIMARY KEY,
+        sort_number NVARCHAR(255),
+        fabric_type NVARCHAR(255),
+        shade NVARCHAR(255),
+        roll_number NVARCHAR(255),
+        lot_number NVARCHAR(255),
+        shade_group NVARCHAR(255),
+        gross_meter FLOAT,
+        allowance FLOAT,
+        net_meter FLOAT,
+        gross_weight FLOAT,
+        net_weight FLOAT,
+        grade NVARCHAR(255)
+    )
+    ''',
+    '''
+    IF OBJECT_ID('defects') IS NULL CREATE TABLE defects (
+        id INT IDENTITY PRIMARY KEY,
+        fabric_id INT REFERENCES fabric_info (id),
+        from_mtr FLOAT,
+        to_mtr FLOAT,
+        defect_name NVARCHAR(255),
+        defect_type NVARCHAR(255),
+        points INT
+    )
+    ''',
+    '''
+    IF OBJECT_ID('ingest_manifest') IS NULL CREATE TABLE ingest_manifest (
+        file_path NVARCHAR(300) NOT NULL,
+        sheet_name NVARCHAR(128) NOT NULL,
+        content_hash CHAR(64),
+        mtime FLOAT,
+        fabric_id INT,
+        PRIMARY KEY (file_path, sheet_name)
+    )
+    ''',
+]
+
+INSERT_FABRIC_INFO = 'INSERT INTO fabric_info (id, {}) VALUES ({})'.format(
+    ', '.join(FABRIC_INFO_COLUMNS), ', '.join('?' * (len(FABRIC_INFO_COLUMNS) + 1)))
+INSERT_DEFECT = 'INSERT INTO defects ({}) VALUES ({})'.format(
+    ', '.join(DEFECT_COLUMNS), ', '.join('?' * len(DEFECT_COLUMNS)))
+INSERT_MANIFEST = ('INSERT INTO ingest_manifest (file_path, sheet_name, content_hash, mtime, fabric_id) '
+                   'VALUES (?, ?, ?, ?, ?)')
+DELETE_MANIFEST = 'DELETE FROM ingest_manifest WHERE file_path = ? AND sheet_name = ?'
+
+# SQL Server: insert fabric_info rows into its IDENTITY id and get back which id each row received.
+# MERGE can OUTPUT a source column next to INSERTED.id, which INSERT ... OUTPUT cannot.
+MERGE_FABRIC_INFO = '''
+    MERGE INTO fabric_info USING (VALUES {rows}) AS source (row_number, {columns}) ON 1 = 0
+    WHEN NOT MATCHED THEN INSERT ({columns}) VALUES ({values})
+    OUTPUT source.row_number, INSERTED.id;
+'''
+# Rows per MERGE statement, keeping its parameters under SQL Server's limit of 2100
+MERGE_ROWS = 150
+
+
+# Function to create the fabric_info, defects and ingest_manifest tables (SQLite, or SQL Server for other connections)
+def create_tables(conn):
+    cursor = conn.cursor()
+    if isinstance(conn, sqlite3.Connection):
+        statements = [CREATE_FABRIC_INFO, CREATE_DEFECTS, CREATE_INGEST_MANIFEST]
+    else:
+        statements = CREATE_SQL_SERVER_TABLES
+    for statement in statements:
+        cursor.execute(statement)
+    conn.commit()
+
+
+# Function to read the ingest manifest as {(file_path, sheet_name): (content_hash, mtime, fabric_id)}
+def load_manifest(conn):
+    cursor = conn.cursor()
+    cursor.execute('SELECT file_path, sheet_name, content_hash, mtime, fabric_id FROM ingest_manifest')
+    return {(file_path, sheet_name): (content_hash, mtime, fabric_id)
+            for file_path, sheet_name, content_hash, mtime, fabric_id in cursor.fetchall()}
+
+
+# Function to hash the extracted content of one sheet
+def sheet_hash(fabric_values, defect_rows):
+    return hashlib.sha256(repr((fabric_values, defect_rows)).encode()).hexdigest()
+
+
+# Function to stream every sheet of a workbook opened in read-only mode
+def iter_workbook_sheets(file_path):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            fabric_values, defect_rows = read_sheet_values(worksheet.iter_rows(values_only=True))
+            yield worksheet.title, fabric_values, defect_rows
+    finally:
+        workbook.close()
+
+
+# Bulk writer: buffers fabric_info and defect rows and writes them with executemany
+# (fast_executemany on pyodbc), committing every `batch_size` defect rows.
+# Fabric ids are assigned per batch when it is flushed, with no SCOPE_IDENTITY() round-trip per roll:
+# - SQL Server (any connection other than sqlite3): fabric_info.id is an IDENTITY column filled by the server,
+#   and MERGE_FABRIC_INFO returns the ids of a whole batch of rows at once;
+# - SQLite: ids continue from MAX(id), read after BEGIN IMMEDIATE so that no other writer can insert in between.
+#   This is only safe because SQLite has a single writer lock; it is not used on SQL Server, where IDENTITY
+#   rejects explicit ids and MAX(id) races with concurrent writers.
+# Once a batch is written, the ids of its rolls are stored in `manifest`
+# ({(file_path, sheet_name): (content_hash, mtime, fabric_id)}) when one is given.
+class BulkWriter:
+    def __init__(self, conn, batch_size=5000, manifest=None):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.manifest = manifest
+        self.sqlite = isinstance(conn, sqlite3.Connection)
+        self.cursor = conn.cursor()
+        if hasattr(self.cursor, 'fast_executemany'):
+            self.cursor.fast_executemany = True
+        self.fabric_rows = []
+        self.defect_rows = []
+        self.manifest_rows = []
+        self.dropped_manifest_rows = []
+        self.stale_fabric_ids = []
+        self.rolls_written = 0
+        self.defects_written = 0
+
+    # Queue one roll; its fabric id is assigned when the batch is flushed.
+    # `manifest` is the (file_path, sheet_name, content_hash, mtime) entry committed together with the rows,
+    # `replaces` the fabric id of an older copy of the same sheet to delete in the same transaction.
+    def add_roll(self, fabric_values, defect_rows, manifest=None, replaces=None):
+        roll = len(self.fabric_rows)
+        self.fabric_rows.append(tuple(fabric_values))
+        self.defect_rows.extend((roll, *row) for row in defect_rows)
+        if manifest is not None:
+            self.manifest_rows.append((*manifest, roll))
+        if replaces is not None:
+            self.stale_fabric_ids.append((replaces,))
+        if len(self.defect_rows) >= self.batch_size:
+            self.flush()
+
+    # Queue a manifest entry that is not tied to a roll (a fully ingested workbook)
+    def add_manifest(self, file_path, sheet_name, content_hash, mtime):
+        self.manifest_rows.append((file_path, sheet_name, content_hash, mtime, None))
+
+    # Queue the removal of a sheet that is gone from its workbook: its rows and its manifest entry
+    def drop_sheet(self, file_path, sheet_name, fabric_id):
+        self.dropped_manifest_rows.append((file_path, sheet_name))
+        if fabric_id is not None:
+            self.stale_fabric_ids.append((fabric_id,))
+
+    # Function to insert the queued fabric_info rows and return their ids, in queue order
+    def _insert_fabric_rows(self):
+        if self.sqlite:
+            self.cursor.execute('SELECT COALESCE(MAX(id), 0) FROM fabric_info')
+            first_id = self.cursor.fetchone()[0] + 1
+            fabric_ids = list(range(first_id, first_id + len(self.fabric_rows)))
+            self.cursor.executemany(INSERT_FABRIC_INFO, [(fabric_id, *row)
+                                                         for fabric_id, row in zip(fabric_ids, self.fabric_rows)])
+            return fabric_ids
+
+        fabric_ids = [None] * len(self.fabric_rows)
+        columns = ', '.join(FABRIC_INFO_COLUMNS)
+        values = ', '.join(f'source.{column}' for column in FABRIC_INFO_COLUMNS)
+        placeholders = '({})'.format(', '.join('?' * (len(FABRIC_INFO_COLUMNS) + 1)))
+        for first in range(0, len(self.fabric_rows), MERGE_ROWS):
+            rows = self.fabric_rows[first:first + MERGE_ROWS]
+            statement = MERGE_FABRIC_INFO.format(rows=', '.join([placeholders] * len(rows)), columns=columns,
+                                                 values=values)
+            self.cursor.execute(statement, [value for number, row in enumerate(rows, first) for value in (number, *row)])
+            for number, fabric_id in self.cursor.fetchall():
+                fabric_ids[number] = int(fabric_id)
+        return fabric_ids
+
+    def flush(self):
+        if self.sqlite and not self.conn.in_transaction:
+            self.cursor.execute('BEGIN IMMEDIATE')
+        if self.stale_fabric_ids:
+            self.cursor.executemany('DELETE FROM defects WHERE fabric_id = ?', self.stale_fabric_ids)
+            self.cursor.executemany('DELETE FROM fabric_info WHERE id = ?', self.stale_fabric_ids)
+        if self.dropped_manifest_rows:
+            self.cursor.executemany(DELETE_MANIFEST, self.dropped_manifest_rows)
+        fabric_ids = self._insert_fabric_rows() if self.fabric_rows else []
+        manifest_rows = [(*row[:4], None if row[4] is None else fabric_ids[row[4]]) for row in self.manifest_rows]
+        if manifest_rows:
+            self.cursor.executemany(DELETE_MANIFEST, [row[:2] for row in manifest_rows])
+            self.cursor.executemany(INSERT_MANIFEST, manifest_rows)
+        if self.defect_rows:
+            self.cursor.executemany(INSERT_DEFECT, [(fabric_ids[roll], *row) for roll, *row in self.defect_rows])
+        self.conn.commit()
+        if self.manifest is not None:
+            for row in manifest_rows:
+                self.manifest[row[:2]] = row[2:]
+        self.rolls_written += len(self.fabric_rows)
+        self.defects_written += len(self.defect_rows)
+        self.fabric_rows = []
+        self.defect_rows = []
+        self.manifest_rows = []
+        self.dropped_manifest_rows = []
+        self.stale_fabric_ids = []
+
+
+# Function to ingest workbooks into the database, streaming sheets and bulk-inserting defects.
+# The ingest_manifest table makes the job incremental and resumable:
+# - a workbook whose mtime, or else content hash, matches its completed entry is not opened at all;
+# - inside a changed workbook, sheets whose content hash is already recorded are skipped,
+#   changed sheets replace their earlier rows and sheets that are gone from it are deleted;
+# - the manifest is updated as files are read, so a path listed twice is ingested once;
+# - manifest entries are committed in the same transaction as their rows, so an interrupted run
+#   resumes after the last committed sheet without duplicating anything.
+def ingest_workbooks(conn, file_paths, batch_size=5000):
+    create_tables(conn)
+    manifest = load_manifest(conn)
+    writer = BulkWriter(conn, batch_size, manifest)
+    for file_path in file_paths:
+        file_path = os.path.abspath(file_path)
+        mtime = os.path.getmtime(file_path)
+        completed = manifest.get((file_path, ''))
+        if completed is not None and completed[1] == mtime:
+            continue
+        content_hash = file_hash(file_path)
+        if completed is None or completed[0] != content_hash:
+            # A workbook rewritten since it was read earlier in this run: write the queued rows so its rolls have ids
+            if any(row[0] == file_path for row in writer.manifest_rows):
+                writer.flush()
+            sheet_names = set()
+            for sheet_name, fabric_values, defect_rows in iter_workbook_sheets(file_path):
+                sheet_names.add(sheet_name)
+                digest = sheet_hash(fabric_values, defect_rows)
+                previous = manifest.get((file_path, sheet_name))
+                if previous is not None and previous[0] == digest:
+                    continue
+                writer.add_roll(fabric_values, defect_rows, (file_path, sheet_name, digest, mtime),
+                                replaces=previous[2] if previous is not None else None)
+                manifest[(file_path, sheet_name)] = (digest, mtime, None)
+            for path, sheet_name in [key for key in manifest if key[0] == file_path and key[1]]:
+                if sheet_name not in sheet_names:
+                    writer.drop_sheet(file_path, sheet_name, manifest.pop((file_path, sheet_name))[2])
+        writer.add_manifest(file_path, '', content_hash, mtime)
+        manifest[(file_path, '')] = (content_hash, mtime, None)
+    writer.flush()
+    return writer.rolls_written, writer.defects_written
+
+
+if __name__ == "__main__":
+    # Local stand-in for the SQL Server database: python -m fabricopt.ingest fabric.db book1.xlsx book2.xlsx
+    conn = sqlite3.connect(sys.argv[1])
+    rolls, defects = ingest_workbooks(conn, sys.argv[2:])
+    print(f"Ingested {rolls} rolls and {defects} defects")
+    conn.close()
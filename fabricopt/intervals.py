@@ -0,0 +1,219 @@
+import random
+
+from .defects import DefectTable, points_value
+
+
+# Node of a treap keyed by (key, uid), carrying subtree point sums and the largest defect 'to' below it
+class _Node:
+    __slots__ = ('key', 'start', 'end', 'points', 'uid', 'priority', 'left', 'right', 'total', 'max_end')
+
+    def __init__(self, key, start, end, points, uid, priority):
+        self.key = key
+        self.start = start
+        self.end = end
+        self.points = points
+        self.uid = uid
+        self.priority = priority
+        self.left = None
+        self.right = None
+        self.total = points
+        self.max_end = end
+
+
+def _update(node):
+    node.total = node.points
+    node.max_end = node.end
+    for child in (node.left, node.right):
+        if child is not None:
+            node.total += child.total
+            if child.max_end > node.max_end:
+                node.max_end = child.max_end
+
+
+# Function to split a treap into (keys < key, keys >= key)
+def _split(node, key):
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        _update(node)
+        return node, right
+    left, node.left = _split(node.left, key)
+    _update(node)
+    return left, node
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+# Function to build a balanced treap from nodes sorted by key in O(n); the highest priorities go to the top
+def _build(nodes, priorities, lo, hi, depth_rank):
+    if lo >= hi:
+        return None
+    middle = (lo + hi) // 2
+    node = nodes[middle]
+    node.priority = priorities[depth_rank[middle]]
+    node.left = _build(nodes, priorities, lo, middle, depth_rank)
+    node.right = _build(nodes, priorities, middle + 1, hi, depth_rank)
+    _update(node)
+    return node
+
+
+def _depth_order(count):
+    # Rank of each position in a breadth-first walk of the balanced build, so parents outrank children
+    depths = [0] * count
+    stack = [(0, count, 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if lo < hi:
+            middle = (lo + hi) // 2
+            depths[middle] = depth
+            stack.append((lo, middle, depth + 1))
+            stack.append((middle + 1, hi, depth + 1))
+    ranked = sorted(range(count), key=lambda position: depths[position])
+    depth_rank = [0] * count
+    for rank, position in enumerate(ranked):
+        depth_rank[position] = rank
+    return depth_rank
+
+
+# Function to sum the points of all nodes with key < key
+def _prefix_total(node, key):
+    total = 0
+    while node is not None:
+        if node.key < key:
+            total += node.points + (node.left.total if node.left is not None else 0)
+            node = node.right
+        else:
+            node = node.left
+    return total
+
+
+# Function to sum the points of the nodes with start < start_before and end > end_after. Subtrees whose largest
+# 'to' is not past end_after hold none of them, so the walk costs O(log n + k) for k such defects.
+def _spanning_total(node, start_before, end_after):
+    total = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is None or node.max_end <= end_after:
+            continue
+        stack.append(node.left)
+        if node.start < start_before:
+            if node.end > end_after:
+                total += node.points
+            stack.append(node.right)
+    return total
+
+
+# Interval index over a roll's defects, including continuous defects whose 'from' and 'to' differ.
+# Two treaps hold the defects: one ordered by 'from' and augmented with the largest 'to' in each subtree
+# (an interval tree, for reporting overlaps), and one ordered by 'to'. Both carry subtree point sums, so
+# the points of defects overlapping [a, b] are total - points(to < a) - points(from > b), two O(log n)
+# descents. Defects can be inserted and removed, e.g. the synthetic 4-point join defects added at cuts.
+class DefectIntervalIndex:
+    def __init__(self, defects=(), seed=None):
+        self.random = random.Random(seed)
+        self.defects = {}
+        self.next_uid = 0
+        records = defects.to_records() if isinstance(defects, DefectTable) else list(defects)
+
+        by_start, by_end = [], []
+        for defect in records:
+            uid = self._register(defect)
+            start, end, points = self._bounds(defect)
+            by_start.append(_Node((start, uid), start, end, points, uid, 0.0))
+            by_end.append(_Node((end, uid), start, end, points, uid, 0.0))
+        by_start.sort(key=lambda node: node.key)
+        by_end.sort(key=lambda node: node.key)
+        priorities = sorted((self.random.random() for _ in records), reverse=True)
+        depth_rank = _depth_order(len(records))
+        self.by_start = _build(by_start, priorities, 0, len(by_start), depth_rank)
+        self.by_end = _build(by_end, priorities, 0, len(by_end), depth_rank)
+
+    def __len__(self):
+        return len(self.defects)
+
+    def _register(self, defect):
+        uid = self.next_uid
+        self.next_uid += 1
+        self.defects[uid] = defect
+        return uid
+
+    @staticmethod
+    def _bounds(defect):
+        start, end = float(defect['from']), float(defect['to'])
+        return min(start, end), max(start, end), float(points_value(defect['points']))
+
+    # Function to add a defect; returns its id for remove()
+    def insert(self, defect):
+        uid = self._register(defect)
+        start, end, points = self._bounds(defect)
+        priority = self.random.random()
+        for attribute, key in (('by_start', (start, uid)), ('by_end', (end, uid))):
+            left, right = _split(getattr(self, attribute), key)
+            node = _Node(key, start, end, points, uid, priority)
+            setattr(self, attribute, _merge(_merge(left, node), right))
+        return uid
+
+    # Function to add the synthetic defect that stands for a join at `position`
+    def insert_join(self, position, join_penalty=4):
+        return self.insert({'from': position, 'to': position, 'points': join_penalty, 'type': 'join'})
+
+    # Function to remove a defect by the id insert() returned (ids of the initial defects follow their order)
+    def remove(self, uid):
+        defect = self.defects.pop(uid)
+        start, end, points = self._bounds(defect)
+        for attribute, key in (('by_start', (start, uid)), ('by_end', (end, uid))):
+            left, rest = _split(getattr(self, attribute), key)
+            middle, right = _split(rest, (key[0], uid + 1))
+            setattr(self, attribute, _merge(left, right))
+        return defect
+
+    def total_points(self):
+        return self.by_start.total if self.by_start is not None else 0
+
+    # Points of the defects touching [start, end] (to >= start and from <= end), in O(log n)
+    def overlap_points(self, start, end):
+        before = _prefix_total(self.by_end, (start, -1))
+        through_end = _prefix_total(self.by_start, (end, self.next_uid))
+        return through_end - before
+
+    # Points of the defects whose 'from' lies in [start, end], the convention used by the cut planners
+    def start_points(self, start, end):
+        return _prefix_total(self.by_start, (end, self.next_uid)) - _prefix_total(self.by_start, (start, -1))
+
+    # Points of the defects lying wholly inside [start, end] (from >= start and to <= end): every defect minus
+    # those starting before `start` and those ending after `end`, adding back the ones counted twice (defects
+    # spanning past both ends), in O(log n + spanning defects)
+    def contained_points(self, start, end):
+        starts_before = _prefix_total(self.by_start, (start, -1))
+        ends_after = self.total_points() - _prefix_total(self.by_end, (end, self.next_uid))
+        return self.total_points() - starts_before - ends_after + _spanning_total(self.by_start, start, end)
+
+    # Function to list the defects touching [start, end], ordered by 'from', in O(log n + matches)
+    def overlapping(self, start, end):
+        found = []
+        stack = [self.by_start]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end < start:
+                continue
+            if node.start <= end:
+                stack.append(node.right)
+                if node.end >= start:
+                    found.append(node)
+            stack.append(node.left)
+        found.sort(key=lambda node: node.key)
+        return [self.defects[node.uid] for node in found]
@@ -0,0 +1,156 @@
+import math
+import sys
+
+import numpy as np
+
+from .defects import DefectTable
+
+
+# Max segment tree over a fixed array of values, used as the remnant index.
+# Removed entries are set to -inf; queries find the best entry or the first entry above a bound in a range.
+class MaxSegmentTree:
+    def __init__(self, values):
+        self.size = 1
+        while self.size < max(len(values), 1):
+            self.size *= 2
+        self.tree = np.full(2 * self.size, -np.inf)
+        self.tree[self.size:self.size + len(values)] = values
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def __getitem__(self, index):
+        return self.tree[self.size + index]
+
+    def update(self, index, value):
+        node = self.size + index
+        self.tree[node] = value
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+    # Function to find the index of the largest value in [lo, hi), or -1 if the range is empty or all removed
+    def argmax(self, lo, hi):
+        best_node, best_value = -1, -np.inf
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                if self.tree[lo] > best_value:
+                    best_node, best_value = lo, self.tree[lo]
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                if self.tree[hi] > best_value:
+                    best_node, best_value = hi, self.tree[hi]
+            lo //= 2
+            hi //= 2
+        if best_node < 0:
+            return -1
+        return self._descend_to_max(best_node)
+
+    def _descend_to_max(self, node):
+        while node < self.size:
+            node = 2 * node if self.tree[2 * node] >= self.tree[2 * node + 1] else 2 * node + 1
+        return node - self.size
+
+    # Function to find the first index in [lo, hi) whose value is at least `value`, or -1
+    def first_at_least(self, lo, hi, value):
+        return self._first_at_least(1, 0, self.size, lo, hi, value)
+
+    def _first_at_least(self, node, node_lo, node_hi, lo, hi, value):
+        if node_hi <= lo or hi <= node_lo or self.tree[node] < value:
+            return -1
+        if node >= self.size:
+            return node - self.size
+        middle = (node_lo + node_hi) // 2
+        found = self._first_at_least(2 * node, node_lo, middle, lo, hi, value)
+        if found < 0:
+            found = self._first_at_least(2 * node + 1, middle, node_hi, lo, hi, value)
+        return found
+
+
+# Function to turn each roll's kept pieces into remnants ({'roll', 'start', 'end', 'length', 'points'}).
+# `results` are optimize_roll results in the same order as `rolls`; failed rolls are skipped.
+def remnants_from_results(rolls, results):
+    remnants = []
+    for roll, result in zip(rolls, results):
+        if result.get('error'):
+            continue
+        table = DefectTable.coerce(roll['defects'])
+        for start, end in result['kept_sections']:
+            remnants.append({'roll': roll.get('name'), 'start': start, 'end': end, 'length': end - start,
+                             'points': table.window(start, end).total_points()})
+    return remnants
+
+
+# Joining engine: packs remnants from many rolls into output pieces of at least target_length
+# (and at most max_length) whose PPMS, with join_penalty points per join, stays within threshold_ppms.
+#
+# Each remnant has a point "slack": the points it could still carry at the threshold, minus its own points.
+# A joined piece is within the threshold exactly when the slack of its remnants covers join_penalty per join,
+# so packing only has to track one running budget per piece. Remnants are indexed by length in a max tree
+# over their slack, so "shortest remnant that finishes this piece" and "best remnant that still fits" are
+# O(log n) queries. Pieces are opened from the longest remnant down (first-fit decreasing).
+def join_remnants(remnants, width=1.5, threshold_ppms=23, target_length=80, max_length=None, join_penalty=4):
+    max_length = math.inf if max_length is None else max_length
+    order = sorted(range(len(remnants)), key=lambda index: remnants[index]['length'])
+    lengths = np.array([remnants[index]['length'] for index in order], dtype=float)
+    slack = np.array([threshold_ppms * width * remnants[index]['length'] / 100 - remnants[index]['points']
+                      for index in order], dtype=float)
+    index_tree = MaxSegmentTree(slack)
+    used = np.zeros(len(order), dtype=bool)
+
+    pieces = []
+    for opener in range(len(order) - 1, -1, -1):
+        if used[opener] or lengths[opener] > max_length:
+            continue
+        members = [opener]
+        used[opener] = True
+        index_tree.update(opener, -np.inf)
+        piece_length = lengths[opener]
+        budget = slack[opener]
+
+        while not (piece_length >= target_length and budget >= 0):
+            room = np.searchsorted(lengths, max_length - piece_length, side='right')
+            # Shortest remnant that reaches the target and keeps the piece within the threshold
+            need = np.searchsorted(lengths, target_length - piece_length, side='left')
+            candidate = index_tree.first_at_least(need, room, join_penalty - budget)
+            if candidate < 0:
+                # Otherwise grow the piece with the cleanest remnant that fits, if that does not make it worse
+                candidate = index_tree.argmax(0, room)
+                if candidate < 0 or budget + slack[candidate] - join_penalty < min(budget, 0):
+                    break
+            members.append(candidate)
+            used[candidate] = True
+            index_tree.update(candidate, -np.inf)
+            piece_length += lengths[candidate]
+            budget += slack[candidate] - join_penalty
+
+        if piece_length >= target_length and budget >= 0:
+            joins = len(members) - 1
+            points = sum(remnants[order[member]]['points'] for member in members) + join_penalty * joins
+            pieces.append({
+                'remnants': [remnants[order[member]] for member in members],
+                'length': float(piece_length),
+                'points': points,
+                'joins': joins,
+                'ppms': (points * 100) / (piece_length * width),
+            })
+            continue
+
+        # The opener cannot make a piece; release the fillers, keep the opener available only as a filler
+        for member in members:
+            used[member] = False
+            index_tree.update(member, slack[member])
+
+    leftovers = [remnants[order[index]] for index in range(len(order)) if not used[index]]
+    return pieces, leftovers
+
+
+if __name__ == "__main__":
+    # python -m fabricopt.joining Combined/combined_file.xlsx [target_length], the same as "fabric-opt join --no-cache"
+    from .cli import main
+
+    main(['join', '--no-cache', sys.argv[1] if len(sys.argv) > 1 else 'Combined/combined_file.xlsx',
+          '--target-length', sys.argv[2] if len(sys.argv) > 2 else '80'])
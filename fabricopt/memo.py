@@ -0,0 +1,125 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAXSIZE = 200000
+DEFAULT_MAXBYTES = 256 * 2 ** 20
+WHOLE_ROLL = (float('-inf'), float('inf'))
+
+
+# Function to key a roll by its defect content, so equal rolls share entries and an edited roll never hits stale ones
+def roll_key(table, length, width):
+    digest = hashlib.blake2b(digest_size=16)
+    for column in (table.starts, table.ends, table.points):
+        digest.update(column.tobytes())
+    digest.update(repr((float(length), float(width))).encode())
+    return digest.hexdigest()
+
+
+# Function to estimate the memory held by a cached value: array buffers, containers and object attributes are
+# followed, shared objects are counted once
+def _weight(value, seen=None):
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_weight(key, seen) + _weight(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_weight(item, seen) for item in value)
+    elif hasattr(value, '__dict__'):
+        size += _weight(vars(value), seen)
+    return size
+
+
+# Bounded LRU cache of section scores and plan evaluations, keyed by (roll key, kind, *interval or plan).
+# Every entry records the interval its value depends on: a section score depends on the defects lying
+# inside [start, end], a plan evaluation on the whole roll. When a roll's defects change, invalidate() drops only
+# the entries whose interval contains a changed defect and moves the rest over to the roll's new key.
+# The cache holds at most maxsize entries and about maxbytes of values (weighed when stored, so a frontier's
+# plans traced later are not counted); the least recently used entries go first.
+# hits, misses and evictions count cache traffic; the cache is safe to share between threads.
+class ScoreCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, maxbytes=DEFAULT_MAXBYTES):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.weight = 0
+        self.entries = OrderedDict()
+        self.by_roll = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _drop(self, key):
+        self.weight -= self.entries.pop(key)[2]
+        keys = self.by_roll[key[0]]
+        del keys[key]
+        if not keys:
+            del self.by_roll[key[0]]
+
+    def _store(self, key, value, span, weight):
+        if key in self.entries:
+            self._drop(key)
+        self.entries[key] = (value, span, weight)
+        self.weight += weight
+        self.by_roll.setdefault(key[0], {})[key] = span
+        while self.entries and (len(self.entries) > self.maxsize or self.weight > self.maxbytes):
+            self._drop(next(iter(self.entries)))
+            self.evictions += 1
+
+    # Function to return the cached value of key, or compute(), store and return it
+    def get(self, key, compute, span=WHOLE_ROLL):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value = compute()
+        weight = _weight(value)
+        with self.lock:
+            self._store(key, value, span, weight)
+        return value
+
+    # Function to carry a roll's entries over to its new key after its defects changed.
+    # changed_defects are the (from, to) spans of the added and removed defects; entries whose interval
+    # contains one of them are dropped. Returns the number of entries dropped.
+    def invalidate(self, old_key, new_key, changed_defects):
+        with self.lock:
+            dropped = 0
+            for key in list(self.by_roll.get(old_key, {})):
+                value, span, weight = self.entries[key]
+                self._drop(key)
+                if any(span[0] <= start and end <= span[1] for start, end in changed_defects):
+                    dropped += 1
+                elif new_key is not None:
+                    self._store((new_key,) + key[1:], value, span, weight)
+            return dropped
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.by_roll.clear()
+            self.weight = 0
+
+    def info(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self.entries),
+                    'maxsize': self.maxsize, 'bytes': self.weight, 'maxbytes': self.maxbytes,
+                    'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+# Cache shared by every RollIndex that is not given its own
+default_cache = ScoreCache()
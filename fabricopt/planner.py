@@ -0,0 +1,210 @@
+import bisect
+
+import numpy as np
+
+from .defects import DefectTable
+
+
+# Function to keep only the Pareto-optimal states: fewer points or more kept length.
+# A state is a tuple of arrays (points, lengths, *extra columns carried along).
+def _pareto(points, lengths, *extra):
+    if len(points) <= 1:
+        return (points, lengths) + extra
+    order = np.lexsort((-lengths, points))
+    points, lengths = points[order], lengths[order]
+    best_before = np.concatenate(([-np.inf], np.maximum.accumulate(lengths)[:-1]))
+    keep = lengths > best_before
+    return (points[keep], lengths[keep]) + tuple(column[order][keep] for column in extra)
+
+
+# Function to merge several frontiers into one
+def _merge(*frontiers):
+    frontiers = [f for f in frontiers if f is not None and len(f[0])]
+    if not frontiers:
+        return None
+    return _pareto(*(np.concatenate(column) for column in zip(*frontiers)))
+
+
+# Candidate cut boundaries of a roll: a cut in front of defect i starts at starts[i] - cut_margin,
+# a cut behind defects 0..i-1 ends at the running maximum of their 'to' plus cut_margin
+def cut_boundaries(table, length, cut_margin):
+    n = len(table)
+    reach = np.maximum.accumulate(table.ends) if n else np.empty(0)
+    cut_starts = np.clip(table.starts - cut_margin, 0, length)
+    piece_starts = np.concatenate(([0.0], np.clip(reach + cut_margin, 0, length)))
+    # A cut may start in front of defect i only if every earlier defect has ended by then
+    can_cut_before = np.ones(n, dtype=bool)
+    if n > 1:
+        can_cut_before[1:] = reach[:-1] <= cut_starts[1:]
+    # A piece may start behind defect j-1 only if defect j is not inside the cut margin
+    can_start_piece = np.ones(n + 1, dtype=bool)
+    if n:
+        can_start_piece[1:n] = table.starts[1:] >= piece_starts[1:n]
+    return cut_starts, piece_starts, can_cut_before, can_start_piece
+
+
+# Exact dynamic-programming cut planner, solved for every threshold at once.
+# The state space is the defect boundaries rather than every meter of the roll: a plan alternates
+# kept pieces and removed runs of consecutive defects, and each boundary carries a Pareto frontier
+# of (kept points + join penalties, kept length). Runtime scales with the defect count and the
+# number of distinct point totals, and positions may be fractional (e.g. 15.3-18.5).
+# cut_margin is the fabric cut away on each side of a defect (0.5 m gives the repo's "end - start + 1").
+# The threshold only picks a state at the end, so the final frontier holds the best plan for every threshold;
+# it is returned as a CutFrontier.
+def cut_frontier(defects, length, width, join_penalty=4, min_piece_length=20, cut_margin=0.5):
+    table = DefectTable.coerce(defects)
+    n = len(table)
+    cumulative_points = np.concatenate(([0.0], np.cumsum(table.points)))
+    cut_starts, piece_starts, can_cut_before, can_start_piece = cut_boundaries(table, length, cut_margin)
+
+    # Every kept piece of a surviving state is recorded once so the winning plan can be traced back;
+    # each close_pieces call appends one block of (parent ids, piece starts) sharing one piece end
+    trace_offsets = [0]
+    trace_parents = []
+    trace_starts = []
+    trace_ends = []
+    # Close the open pieces in `frontier` at piece_end; the frontier stores points and lengths
+    # relative to each piece's start, so closing is a single shift for every candidate start
+    def close_pieces(frontier, piece_end, points_before_end):
+        points, lengths, parents, starts = _pareto(*frontier)
+        ids = np.arange(trace_offsets[-1], trace_offsets[-1] + len(parents))
+        trace_offsets.append(trace_offsets[-1] + len(parents))
+        trace_parents.append(parents)
+        trace_starts.append(starts)
+        trace_ends.append(float(piece_end))
+        return points + points_before_end + join_penalty, lengths + piece_end, ids
+
+    empty = (np.zeros(1), np.zeros(1), np.full(1, -1))
+    # piece_open[j]: states in which a kept piece starts at piece_starts[j] with defect j as its first defect
+    piece_open = [None] * (n + 1)
+    piece_open[0] = empty
+    # open_pieces: every piece_open[j] long enough to close at the current cut, shifted by -C[j] and -start_j
+    open_pieces = None
+    next_piece = 0
+
+    def open_until(limit, last):
+        nonlocal open_pieces, next_piece
+        while next_piece <= last and piece_starts[next_piece] <= limit:
+            if piece_open[next_piece] is not None:
+                points, lengths, ids = piece_open[next_piece]
+                shifted = (points - cumulative_points[next_piece], lengths - piece_starts[next_piece],
+                           ids, np.full(len(ids), piece_starts[next_piece]))
+                open_pieces = _merge(open_pieces, shifted)
+                piece_open[next_piece] = None
+            next_piece += 1
+
+    # removed_so_far: states in which a removed run has started in front of some defect i <= current one
+    removed_so_far = empty
+    for i in range(n):
+        if can_cut_before[i]:
+            open_until(cut_starts[i] - min_piece_length, i)
+            if open_pieces is not None:
+                cut_open = close_pieces(open_pieces, cut_starts[i], cumulative_points[i])
+                removed_so_far = _merge(removed_so_far, cut_open)
+        if can_start_piece[i + 1]:
+            piece_open[i + 1] = removed_so_far
+
+    # Either a removed run reaches the end of the roll, or the last kept piece does
+    final = removed_so_far
+    open_until(length - min_piece_length, n)
+    if open_pieces is not None:
+        final = _merge(final, close_pieces(open_pieces, length, cumulative_points[n]))
+
+    points, lengths, ids = final
+    kept_points = np.where(lengths > 0, points - join_penalty, 0)
+    trace = (trace_offsets, trace_parents, trace_starts, trace_ends)
+    return CutFrontier(kept_points, lengths, ids, trace, length, width)
+
+
+# Retained length versus achievable PPMS of one roll, from the final states of the DP.
+# States are sorted by PPMS and only those keeping more fabric than every state with a lower PPMS are kept,
+# so both columns increase and the best plan for a threshold is found with one binary search.
+# Plans are traced back from the DP only when asked for, and memoized.
+class CutFrontier:
+    def __init__(self, kept_points, lengths, ids, trace, length, width):
+        self.length = length
+        self.width = width
+        self.trace = trace
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ppms = np.where(lengths > 0, (kept_points * 100) / (lengths * width), 0.0)
+        order = np.lexsort((-lengths, ppms))
+        ppms, lengths, ids = ppms[order], lengths[order], ids[order]
+        best_before = np.concatenate(([-np.inf], np.maximum.accumulate(lengths)[:-1]))
+        keep = lengths > best_before
+        self.ppms = ppms[keep].tolist()
+        self.lengths = lengths[keep].tolist()
+        self.ids = ids[keep].tolist()
+        self.plans = {}
+
+    def __len__(self):
+        return len(self.ppms)
+
+    # (PPMS, kept length) of every frontier point, lowest PPMS first
+    def points(self):
+        return list(zip(self.ppms, self.lengths))
+
+    # Function to find the frontier point of a threshold (the longest plan with PPMS <= threshold); -1 if none
+    def index(self, threshold_ppms):
+        return bisect.bisect_right(self.ppms, threshold_ppms) - 1
+
+    # Function to return (kept length, PPMS) for a threshold without building the plan
+    def query(self, threshold_ppms):
+        k = self.index(threshold_ppms)
+        if k < 0:
+            return 0, 0.0
+        return self.lengths[k], self.ppms[k]
+
+    # Function to trace back the kept (start, end) sections of frontier point k
+    def kept_sections(self, k):
+        if k not in self.plans:
+            trace_offsets, trace_parents, trace_starts, trace_ends = self.trace
+            kept_sections = []
+            node = int(self.ids[k])
+            while node >= 0:
+                block = bisect.bisect_right(trace_offsets, node) - 1
+                position = node - trace_offsets[block]
+                kept_sections.append((float(trace_starts[block][position]), trace_ends[block]))
+                node = int(trace_parents[block][position])
+            kept_sections.reverse()
+            self.plans[k] = kept_sections
+        return self.plans[k]
+
+    # Function to return the plan of a threshold as plan_cuts_dp does: (removed, kept, kept length, PPMS)
+    def plan(self, threshold_ppms):
+        k = self.index(threshold_ppms)
+        if k < 0:
+            return [(0, self.length)], [], 0, 0.0
+        kept_sections = list(self.kept_sections(k))
+        removed_sections = []
+        position = 0
+        for start, end in kept_sections:
+            if start > position:
+                removed_sections.append((position, start))
+            position = end
+        if position < self.length:
+            removed_sections.append((position, self.length))
+        kept_length = float(self.lengths[k])
+        return removed_sections, kept_sections, kept_length, float(self.ppms[k]) if kept_length else 0.0
+
+    # Function to export the frontier with every plan, e.g. to store it as JSON next to the roll
+    def to_dict(self):
+        return {'length': self.length, 'width': self.width, 'ppms': self.ppms, 'lengths': self.lengths,
+                'kept_sections': [self.kept_sections(k) for k in range(len(self))]}
+
+    @classmethod
+    def from_dict(cls, data):
+        frontier = cls.__new__(cls)
+        frontier.length = data['length']
+        frontier.width = data['width']
+        frontier.ppms = list(data['ppms'])
+        frontier.lengths = list(data['lengths'])
+        frontier.ids = list(range(len(frontier.ppms)))
+        frontier.trace = None
+        frontier.plans = {k: [tuple(section) for section in sections] for k, sections in enumerate(data['kept_sections'])}
+        return frontier
+
+
+# Function to plan the cuts that keep the most fabric at PPMS <= threshold_ppms (one query of cut_frontier).
+# Returns (removed_sections, kept_sections, kept_length, ppms).
+def plan_cuts_dp(defects, length, width, threshold_ppms, join_penalty=4, min_piece_length=20, cut_margin=0.5):
+    return cut_frontier(defects, length, width, join_penalty, min_piece_length, cut_margin).plan(threshold_ppms)
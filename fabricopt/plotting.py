@@ -0,0 +1,275 @@
+import matplotlib.patches as patches
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Chart style, set once when the plotting module is first imported rather than on every chart
+sns.set(style="whitegrid")
+
+
+# Base class for charts that are built once and then updated in place.
+# The figure is a plain matplotlib Figure (not registered with pyplot, so nothing piles up in plt's figure list)
+# on a Tk canvas when canvas_frame is given, or on an offscreen Agg canvas otherwise. Artists that change between runs
+# are "animated": a full draw caches the static background, and later updates that keep the axis limits
+# only restore that background and redraw the changed artists (blitting).
+class BlitChart:
+    def __init__(self, figsize, canvas_frame=None):
+        self.figure = Figure(figsize=figsize)
+        if canvas_frame is not None:
+            import tkinter as tk
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas = FigureCanvasTkAgg(self.figure, master=canvas_frame)
+            self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        else:
+            self.canvas = FigureCanvasAgg(self.figure)
+        self.offscreen = canvas_frame is None
+        self.animated = []
+        self.overlays = []
+        self.background = None
+        self.limits = None
+        self.saving = False
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        if self.saving:
+            return
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self.animated + self.overlays:
+            if artist.get_visible():
+                self.figure.draw_artist(artist)
+
+    # Function to mark an artist as changing between runs; overlays (e.g. legends) are drawn over all of them
+    def _animate(self, artist, overlay=False):
+        artist.set_animated(True)
+        (self.overlays if overlay else self.animated).append(artist)
+        return artist
+
+    def current_limits(self):
+        return tuple(tuple(axes.get_xlim() + axes.get_ylim()) for axes in self.figure.axes)
+
+    # Function to show the updated artists: a full draw when the axes changed, otherwise a blit.
+    # Offscreen charts (exports, reports) are only drawn when saved.
+    def refresh(self):
+        if self.offscreen:
+            return
+        limits = self.current_limits()
+        if self.background is None or limits != self.limits:
+            self.limits = limits
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_animated()
+            self.canvas.blit(self.figure.bbox)
+        self.canvas.flush_events()
+
+    # Function to save the chart to a file; animated artists are drawn normally while saving
+    def save(self, file_path, dpi=300, **options):
+        self.saving = True
+        for artist in self.animated + self.overlays:
+            artist.set_animated(False)
+        try:
+            self.figure.savefig(file_path, dpi=dpi, **options)
+        finally:
+            for artist in self.animated + self.overlays:
+                artist.set_animated(True)
+            self.saving = False
+            # Saving redraws the figure at another dpi, so the next refresh has to draw in full
+            self.background = None
+
+
+# PPMS before/after bars with the roll length on a second axis (plot_ppms of the GUI scripts)
+class PPMSChart(BlitChart):
+    def __init__(self, canvas_frame=None):
+        super().__init__((10, 6), canvas_frame)
+        self.ax1 = self.figure.add_subplot()
+        self.ax1.set_xlabel('Fabric Roll', fontsize=14)
+        self.ax1.set_ylabel('PPMS', fontsize=14)
+        self.bars = self.ax1.bar(['Before', 'After'], [0, 0], color=['#4c72b0', '#55a868'], edgecolor='black')
+        for bar in self.bars:
+            self._animate(bar)
+
+        self.ax2 = self.ax1.twinx()
+        self.ax2.set_ylabel('Length (meters)', fontsize=14)
+        self.length_line, = self.ax2.plot(['Before', 'After'], [0, 0], color='#c44e52', marker='o', markersize=8,
+                                          linewidth=2, label='Length')
+        self._animate(self.length_line)
+
+        self.title = self._animate(self.ax1.set_title('Fabric Roll Optimization (Total Cut Length: 0m)', fontsize=16))
+        self.bar_labels = [self._animate(self.ax1.text(bar.get_x() + bar.get_width() / 2, 0, '', ha='center', va='bottom',
+                                                       fontsize=12, color='black'))
+                           for bar in self.bars]
+        self.length_label = self._animate(self.ax2.text(1, 0, '', ha='center', va='bottom', fontsize=12, color='#c44e52'))
+        self.figure.tight_layout()
+
+    def update(self, before_ppms, after_ppms, original_length, new_length, cut_length, title=None):
+        for bar, label, value in zip(self.bars, self.bar_labels, (before_ppms, after_ppms)):
+            bar.set_height(value)
+            label.set_y(value + 1)
+            label.set_text(round(value, 2))
+        self.length_line.set_ydata([original_length, new_length])
+        self.length_label.set_y(new_length)
+        self.length_label.set_text(f'{new_length}m')
+        self.title.set_text(title or f'Fabric Roll Optimization (Total Cut Length: {cut_length}m)')
+
+        # Axis limits only move when the values outgrow them, so repeated runs on similar rolls blit
+        top = max(before_ppms, after_ppms) * 1.15 + 2
+        if not self.ax1.get_ylim()[1] * 0.5 <= top <= self.ax1.get_ylim()[1]:
+            self.ax1.set_ylim(0, top)
+        top = max(original_length, new_length) * 1.15
+        if not self.ax2.get_ylim()[1] * 0.5 <= top <= self.ax2.get_ylim()[1]:
+            self.ax2.set_ylim(0, top)
+        self.refresh()
+
+
+# Original, remaining and removed fabric sections (plot_fabric_sections of the GUI scripts).
+# Rectangles and labels come from pools that grow when a plan has more sections than any before
+# and are hidden when unused, so a run never creates artists it can reuse.
+class FabricSectionsChart(BlitChart):
+    def __init__(self, canvas_frame=None):
+        super().__init__((14, 8), canvas_frame)
+        self.ax = self.figure.add_subplot()
+        self.ax.set_xlabel('Meters', fontsize=14)
+        self.ax.set_yticks([])
+        self.title = self._animate(self.ax.set_title('Fabric Sections Visualization', fontsize=16))
+        self.original = self._animate(self.ax.add_patch(patches.Rectangle((0, 2), 0, 0, edgecolor='black',
+                                                                          facecolor='lightgrey')))
+        self.original_label = self._animate(self.ax.text(0, 2.5, '', horizontalalignment='center',
+                                                         verticalalignment='center', fontsize=12, color='black'))
+        self.pools = {'lightgreen': [], 'red': []}
+        legend_entries = (('lightgrey', 'Original Fabric'), ('lightgreen', 'Remaining Fabric'), ('red', 'Removed Section'))
+        self.legend = self.ax.legend(handles=[patches.Patch(edgecolor='black', facecolor=color, label=label)
+                                              for color, label in legend_entries],
+                                     loc='upper right')
+        self._animate(self.legend, overlay=True)
+
+    def _pieces(self, color, count):
+        pool = self.pools[color]
+        while len(pool) < count:
+            rectangle = self._animate(self.ax.add_patch(patches.Rectangle((0, 0), 0, 0, edgecolor='black', facecolor=color)))
+            label = self._animate(self.ax.text(0, 0, '', horizontalalignment='center', verticalalignment='center',
+                                               fontsize=12, color='black'))
+            pool.append((rectangle, label))
+        for rectangle, label in pool[count:]:
+            rectangle.set_visible(False)
+            label.set_visible(False)
+        return pool[:count]
+
+    def _place(self, piece, start, end, y, width, text, extent, show_label=True):
+        rectangle, label = piece
+        rectangle.set_bounds(start, y, extent, width)
+        label.set_position(((start + end) / 2, y + 0.5))
+        label.set_text(text)
+        rectangle.set_visible(True)
+        label.set_visible(show_label)
+
+    # Sections are inclusive meter ranges ("end - start + 1" meters) as in the GUI scripts; with inclusive=False
+    # they are (start, end) spans as the planners return them. stack_removed=False keeps all removed sections
+    # on one row, for plans with many cuts. With max_labels set, plans with more sections than that are drawn
+    # without section labels (they would overlap, and text is most of the drawing time).
+    def update(self, original_length, remaining_length, removed_sections, remaining_sections, width, inclusive=True,
+               stack_removed=True, title=None, max_labels=None):
+        extra = 1 if inclusive else 0
+        show_labels = max_labels is None or len(removed_sections) + len(remaining_sections) <= max_labels
+        self.title.set_text(title or 'Fabric Sections Visualization')
+        self.original.set_bounds(0, 2, original_length, width)
+        self.original_label.set_position((original_length / 2, 2.5))
+        self.original_label.set_text(f'Original Fabric\n{original_length} meters')
+
+        for piece, (start, end) in zip(self._pieces('lightgreen', len(remaining_sections)), remaining_sections):
+            self._place(piece, start, end, 1, width, f'{start:g}-{end:g} meters', end - start + extra, show_labels)
+
+        y_offset = 0
+        for piece, (start, end) in zip(self._pieces('red', len(removed_sections)), removed_sections):
+            self._place(piece, start, end, y_offset, width, f'Removed: {start:g}-{end:g}\n{end - start + extra:g} meters',
+                        end - start + extra, show_labels)
+            if stack_removed:
+                y_offset -= 1
+
+        self.ax.set_xlim(0, original_length)
+        self.ax.set_ylim(y_offset - 1, 3)
+        self.refresh()
+
+
+# Windowed defect density of a roll, one step line per window size, with the hotspots shaded
+# (the density plot and table of newx8.py, drawn once from a finished density.DensityScan).
+class DensityChart(BlitChart):
+    def __init__(self, canvas_frame=None):
+        super().__init__((14, 6), canvas_frame)
+        self.ax = self.figure.add_subplot()
+        self.ax.set_xlabel('Interval start (meters)', fontsize=14)
+        self.ax.set_ylabel('Defect Density (points per meter)', fontsize=14)
+        self.title = self._animate(self.ax.set_title('Defect Density by Interval', fontsize=16))
+        self.lines = []
+        self.spans = []
+        self.legend = None
+        self.figure.tight_layout()
+
+    def _span(self, index):
+        while len(self.spans) <= index:
+            rectangle = self._animate(self.ax.add_patch(patches.Rectangle((0, 0), 0, 0, facecolor='red', alpha=0.2)))
+            label = self._animate(self.ax.text(0, 0, '', ha='center', va='bottom', fontsize=10, color='#c44e52'))
+            self.spans.append((rectangle, label))
+        return self.spans[index]
+
+    def update(self, scan, hotspots=(), title=None):
+        import numpy as np
+
+        densities = scan.densities
+        while len(self.lines) < len(scan.sizes):
+            self.lines.append(self._animate(self.ax.plot([], [], drawstyle='steps-post', linewidth=1.5)[0]))
+        for line, size, row in zip(self.lines, scan.sizes, densities):
+            valid = ~np.isnan(row)
+            line.set_data(scan.starts[valid], row[valid])
+            line.set_label(f'{size:g} m')
+            line.set_visible(True)
+        for line in self.lines[len(scan.sizes):]:
+            line.set_visible(False)
+            line.set_label('_hidden')
+
+        top = float(np.nanmax(densities)) * 1.2 if np.isfinite(densities).any() else 1.0
+        top = top or 1.0
+        for index, hotspot in enumerate(hotspots):
+            rectangle, label = self._span(index)
+            rectangle.set_bounds(hotspot['start'], 0, hotspot['end'] - hotspot['start'], top)
+            label.set_position(((hotspot['start'] + hotspot['end']) / 2, hotspot['density']))
+            label.set_text(f"{hotspot['start']:g}-{hotspot['end']:g}")
+            rectangle.set_visible(True)
+            label.set_visible(True)
+        for rectangle, label in self.spans[len(hotspots):]:
+            rectangle.set_visible(False)
+            label.set_visible(False)
+
+        if self.legend is not None:
+            self.overlays.remove(self.legend)
+            self.legend.remove()
+        self.legend = self._animate(self.ax.legend(handles=self.lines[:len(scan.sizes)], title='Window', loc='upper right'),
+                                    overlay=True)
+        self.title.set_text(title or 'Defect Density by Interval')
+        self.ax.set_xlim(0, scan.length)
+        self.ax.set_ylim(0, top)
+        self.refresh()
+
+
+# Number of defects per meter along the roll (plot_defect_distribution of dataanalysis.py)
+class DistributionChart(BlitChart):
+    def __init__(self, canvas_frame=None):
+        super().__init__((12, 6), canvas_frame)
+        self.ax = self.figure.add_subplot()
+        self.ax.set_xlabel('Position on Fabric Roll (meters)', fontsize=14)
+        self.ax.set_ylabel('Number of Defects', fontsize=14)
+        self.title = self._animate(self.ax.set_title('Defect Distribution Across Fabric Roll', fontsize=16))
+        self.steps = self._animate(self.ax.stairs([0], [0, 1], fill=True, color='blue', alpha=0.6))
+        self.figure.tight_layout()
+
+    def update(self, positions, length, title=None):
+        import numpy as np
+
+        counts, edges = np.histogram(positions, bins=max(int(np.ceil(length)), 1), range=(0, max(length, 1)))
+        self.steps.set_data(counts, edges)
+        self.title.set_text(title or 'Defect Distribution Across Fabric Roll')
+        self.ax.set_xlim(0, length)
+        self.ax.set_ylim(0, max(int(counts.max(initial=0)), 1) * 1.15)
+        self.refresh()
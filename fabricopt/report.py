@@ -0,0 +1,107 @@
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from .batch import optimize_roll_safely
+from .export import safe_name
+
+# Template charts of this worker process, built on first use and reused for every roll it renders.
+# They draw on their own Agg canvases, so no pyplot backend is selected.
+_templates = {}
+
+
+def _charts():
+    if not _templates:
+        from .plotting import FabricSectionsChart, PPMSChart
+        _templates['sections'] = FabricSectionsChart()
+        _templates['ppms'] = PPMSChart()
+    return _templates['sections'], _templates['ppms']
+
+
+# Function to name a roll's lot; lot 0 is a real lot, only a missing lot number is 'no-lot'
+def lot_of(roll):
+    lot_number = roll.get('fabric_info', {}).get('lot_number')
+    return 'no-lot' if lot_number is None else str(lot_number)
+
+
+# Function to optimize one roll and add its report pages (cut diagram, PPMS before/after) to an open PdfPages.
+# Returns the error message, or None once the two pages are written.
+def render_roll(roll, pdf, dpi=150, options=None):
+    result = optimize_roll_safely(roll, **(options or {}))
+    if result.get('error'):
+        return result['error']
+
+    sections_chart, ppms_chart = _charts()
+    width = roll.get('width', (options or {}).get('width', 1.5))
+    sections_chart.update(result['length'], result['kept_length'], result['removed_sections'], result['kept_sections'],
+                          width, inclusive=False, stack_removed=False,
+                          title=f"{roll.get('name')}: Fabric Sections (lot {lot_of(roll)})")
+    cut_length = result['length'] - result['kept_length']
+    ppms_chart.update(result['original_ppms'], result['ppms'], result['length'], round(result['kept_length'], 1),
+                      round(cut_length, 1), title=f"{roll.get('name')}: PPMS (Total Cut Length: {cut_length:.1f}m)")
+    sections_chart.save(pdf, dpi=dpi, format='pdf')
+    ppms_chart.save(pdf, dpi=dpi, format='pdf')
+    return None
+
+
+# Function to write the PDF of one lot: every roll's pages, drawn as vector graphics straight into the file.
+# Returns (lot, file path or None if no roll rendered, pages, [(roll name, error)]); runs in a worker process.
+def render_lot(lot, rolls, file_path, dpi=150, options=None):
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    pages = 0
+    failed = []
+    with PdfPages(file_path) as pdf:
+        for roll in rolls:
+            error = render_roll(roll, pdf, dpi, options)
+            if error:
+                failed.append((roll.get('name'), error))
+            else:
+                pages += 2
+    if not pages:
+        os.remove(file_path)
+        file_path = None
+    return lot, file_path, pages, failed
+
+
+def _render_job(job):
+    return render_lot(*job)
+
+
+# Function to render the report of every roll and write one multi-page PDF per lot,
+# <output_dir>/lot_<lot>_<date>.pdf. Each lot is one job on a pool of workers that reuse their template charts
+# and write the lot's PDF themselves, so only the summary comes back to the parent.
+# Returns {'files', 'pages', 'failed', 'seconds', 'pages_per_second'}.
+def generate_reports(rolls, output_dir='reports', max_workers=None, chunksize=None, dpi=150, **options):
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    date = datetime.now().strftime("%Y-%m-%d")
+    jobs = [(lot, list(lot_rolls), os.path.join(output_dir, f'lot_{safe_name(lot)}_{date}.pdf'), dpi, options)
+            for lot, lot_rolls in itertools.groupby(sorted(rolls, key=lot_of), key=lot_of)]
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(jobs) <= 1:
+        rendered = list(map(_render_job, jobs))
+    else:
+        chunksize = chunksize or max(1, math.ceil(len(jobs) / (max_workers * 4)))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            rendered = list(executor.map(_render_job, jobs, chunksize=chunksize))
+
+    files = {lot: file_path for lot, file_path, pages, failed in rendered if file_path is not None}
+    failed = {lot: failures for lot, file_path, pages, failures in rendered if failures}
+    pages = sum(pages for lot, file_path, pages, failures in rendered)
+    seconds = time.perf_counter() - started
+    return {'files': files, 'pages': pages, 'failed': failed, 'seconds': seconds,
+            'pages_per_second': pages / seconds if seconds > 0 else 0.0}
+
+
+if __name__ == "__main__":
+    # python -m fabricopt.report Combined/combined_file.xlsx [reports], the same as "fabric-opt report"
+    from .cli import main
+
+    main(['report', sys.argv[1] if len(sys.argv) > 1 else 'Combined/combined_file.xlsx',
+          '--output-dir', sys.argv[2] if len(sys.argv) > 2 else 'reports'])
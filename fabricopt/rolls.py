@@ -0,0 +1,56 @@
+FABRIC_INFO_FIELDS = [
+    ('sort_number', 0, 1), ('fabric_type', 1, 1), ('shade', 2, 1), ('roll_number', 3, 1),
+    ('lot_number', 4, 1), ('shade_group', 5, 1), ('gross_meter', 0, 3), ('allowance', 1, 3),
+    ('net_meter', 2, 3), ('gross_weight', 3, 3), ('net_weight', 4, 3), ('grade', 5, 3),
+]
+DEFECT_FIELDS = ['from', 'to', 'name', 'type', 'points']
+DEFECT_FIRST_ROW = 11
+
+
+# Function to extract the fabric information block at the top of an inspection sheet
+def read_fabric_info(df):
+    return {field: df.iloc[row, column] for field, row, column in FABRIC_INFO_FIELDS}
+
+
+# Function to extract the defect rows (FROM MTR, TO MTR, name, type, POINTS) of an inspection sheet
+def read_defect_rows(df):
+    defect_rows = df.iloc[DEFECT_FIRST_ROW:, [0, 1, 2, 3, 4]].dropna()
+    return [dict(zip(DEFECT_FIELDS, row)) for row in defect_rows.itertuples(index=False)]
+
+
+# Function to extract (fabric info values, defect rows) from the raw rows of a sheet without building a DataFrame.
+# Row numbers follow newexcel2dbusingpy.py, where pandas' header row shifts every index by one.
+def read_sheet_values(rows):
+    fabric_values = [None] * len(FABRIC_INFO_FIELDS)
+    header_rows = {row + 1 for field, row, column in FABRIC_INFO_FIELDS}
+    defect_rows = []
+    for index, row in enumerate(rows):
+        if index in header_rows:
+            for position, (field, field_row, column) in enumerate(FABRIC_INFO_FIELDS):
+                if field_row + 1 == index and column < len(row):
+                    fabric_values[position] = row[column]
+        elif index >= DEFECT_FIRST_ROW + 1:
+            values = tuple(row[:5])
+            # Same as dropna(): skip rows with any of the five defect columns empty
+            if len(values) == 5 and all(value is not None and value != '' for value in values):
+                defect_rows.append(values)
+    return fabric_values, defect_rows
+
+
+# Function to turn one inspection sheet into a roll: name, length (gross meter), fabric info and defects
+def read_roll_sheet(df, name):
+    fabric_info = read_fabric_info(df)
+    return {
+        'name': name,
+        'length': fabric_info['gross_meter'],
+        'fabric_info': fabric_info,
+        'defects': read_defect_rows(df),
+    }
+
+
+# Function to load every sheet of a workbook (e.g. Combined/combined_file.xlsx) as a roll
+def load_rolls_from_workbook(file_path):
+    import pandas as pd
+
+    excel_data = pd.ExcelFile(file_path)
+    return [read_roll_sheet(excel_data.parse(sheet_name), sheet_name) for sheet_name in excel_data.sheet_names]
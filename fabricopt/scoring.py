@@ -0,0 +1,113 @@
+import numpy as np
+
+from .defects import DefectTable
+
+
+# Function to calculate PPMS
+def calculate_ppms(defects, length, width):
+    total_defect_points = DefectTable.coerce(defects).total_points()
+    ppms = (total_defect_points * 100) / (length * width)
+    return ppms
+
+
+# Function to calculate the defect density for a given section
+def calculate_section_ppms(defects, start, end, width):
+    return SectionScorer(defects, width).section_ppms(start, end)
+
+
+# Section scorer built on defects sorted by position and cumulative point sums.
+# Point defects (from == to) are scored from the prefix sums with two binary searches,
+# continuous defects (from != to) are few and are checked against the window directly.
+class SectionScorer:
+    def __init__(self, defects, width):
+        table = DefectTable.coerce(defects)
+        self.width = width
+
+        single = table.starts == table.ends
+        self.positions = table.starts[single]
+        self.cumulative_points = np.concatenate(([0.0], np.cumsum(table.points[single])))
+
+        self.span_starts = table.starts[~single]
+        self.span_ends = table.ends[~single]
+        self.span_points = table.points[~single]
+
+    # Points of defects lying fully inside [start, end]
+    def section_points(self, start, end):
+        lo = np.searchsorted(self.positions, start, side='left')
+        hi = np.searchsorted(self.positions, end, side='right')
+        total = self.cumulative_points[hi] - self.cumulative_points[lo] if hi > lo else 0.0
+        if len(self.span_points):
+            inside = (self.span_starts >= start) & (self.span_ends <= end)
+            total += self.span_points[inside].sum()
+        return total
+
+    def section_ppms(self, start, end):
+        section_length = end - start + 1
+        return (self.section_points(start, end) * 100) / (section_length * self.width)
+
+    # Points inside [start, end] for one start and many ends at once
+    def section_points_many(self, start, ends):
+        ends = np.asarray(ends, dtype=float)
+        lo = np.searchsorted(self.positions, start, side='left')
+        hi = np.searchsorted(self.positions, ends, side='right')
+        totals = np.where(hi > lo, self.cumulative_points[hi] - self.cumulative_points[lo], 0.0)
+        if len(self.span_points):
+            from_start = self.span_starts >= start
+            inside = from_start[None, :] & (self.span_ends[None, :] <= ends[:, None])
+            totals = totals + inside @ self.span_points
+        return totals
+
+
+# Function to find the densest (start, end) window, matching the original pairwise scan:
+# windows run from defect i's 'from' to defect j's 'to' for j >= i in position order,
+# and the first window (in i, j order) with the highest density wins.
+# The original scanned the list in the order given; here defects are first sorted by 'from' (stable),
+# so an unsorted list gives the original's answer for that list sorted by position.
+def find_highest_density_section(defects, width, max_gap=None):
+    table = DefectTable.coerce(defects)
+    if not len(table):
+        return None
+    scorer = SectionScorer(table, width)
+    starts = table.starts
+    ends = table.ends
+
+    max_density = 0
+    best_section = None
+    for i in range(len(table)):
+        start = starts[i]
+        candidate_ends = ends[i:]
+        section_lengths = candidate_ends - start + 1
+        valid = section_lengths > 0
+        if max_gap is not None:
+            valid &= (candidate_ends - start) <= max_gap
+        if not valid.any():
+            continue
+        densities = np.full(len(candidate_ends), -np.inf)
+        points = scorer.section_points_many(start, candidate_ends[valid])
+        densities[valid] = (points * 100) / (section_lengths[valid] * width)
+        j = int(np.argmax(densities))
+        if densities[j] > max_density:
+            max_density = densities[j]
+            best_section = (float(starts[i]), float(ends[i + j]))
+    return best_section
+
+
+# Function to find multiple high-density sections and combine them
+def find_combined_highest_density_sections(defects, width, num_sections, max_gap=None):
+    sections = []
+    remaining_defects = DefectTable.coerce(defects)
+
+    for _ in range(num_sections):
+        best_section = find_highest_density_section(remaining_defects, width, max_gap)
+
+        if best_section is not None and best_section != (0, 0):
+            sections.append(best_section)
+            # Remove the found section from the table of defects
+            remaining_defects = remaining_defects.select(remaining_defects.outside([best_section]))
+
+    if sections:
+        combined_start = min(start for start, end in sections)
+        combined_end = max(end for start, end in sections)
+        return [(combined_start, combined_end)]
+    else:
+        return []
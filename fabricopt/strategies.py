@@ -0,0 +1,291 @@
+from collections import Counter
+from functools import cached_property
+
+from .aco import plan_cuts_aco
+from .branch_bound import plan_cuts_bnb
+from .cutting import remove_sections
+from .defects import DefectTable
+from .evaluate import RollSegments, evaluate_sections
+from .greedy import find_high_density_sections, maximize_remaining_length_with_cut_penalty
+from .memo import WHOLE_ROLL, default_cache, roll_key
+from .planner import cut_frontier
+from .scoring import SectionScorer, calculate_ppms, find_highest_density_section
+
+
+# Function to turn the scripts' inclusive (start, end) meter ranges into spans ("end - start + 1" meters)
+def meter_spans(sections):
+    return [(start - 0.5, end + 0.5) for start, end in sections]
+
+
+def _key(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_key(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((name, _key(item)) for name, item in value.items()))
+    return value
+
+
+# Everything the strategies need to know about one roll, built once and shared by all of them.
+# The defect table is sorted on construction; the scorer, segments and high-density runs are built on first use.
+# Section scores, densest-section searches, plan evaluations and finished plans go through a bounded ScoreCache
+# (memo.default_cache unless one is given) keyed by the roll's content, so a new index over the same roll reuses
+# them too. Running a second strategy (or the same one again) on the roll only pays for what has not been seen before.
+class RollIndex:
+    def __init__(self, defects, length, width, cut_margin=0.5, cache=None):
+        self.length = length
+        self.width = width
+        self.cut_margin = cut_margin
+        self.cache = cache if cache is not None else default_cache
+        self._set_table(DefectTable.coerce(defects))
+
+    @classmethod
+    def from_roll(cls, roll, width=1.5, cache=None):
+        return cls(roll['defects'], roll['length'], roll.get('width', width), cache=cache)
+
+    def _set_table(self, table):
+        self.table = table
+        self.key = roll_key(table, self.length, self.width)
+        for name in ('scorer', 'segments', 'high_density_sections', 'original_ppms'):
+            self.__dict__.pop(name, None)
+
+    # Function to replace the roll's defects. Cached section scores whose interval holds none of the added or
+    # removed defects stay valid and are kept; everything that depends on the whole roll is recomputed.
+    def update_defects(self, defects):
+        table = DefectTable.coerce(defects)
+        old_rows = Counter(zip(self.table.starts.tolist(), self.table.ends.tolist(), self.table.points.tolist()))
+        new_rows = Counter(zip(table.starts.tolist(), table.ends.tolist(), table.points.tolist()))
+        changed = [(start, end) for start, end, points in (old_rows - new_rows) + (new_rows - old_rows)]
+        old_key = self.key
+        self._set_table(table)
+        if old_key != self.key:
+            self.cache.invalidate(old_key, self.key, changed)
+        return len(changed)
+
+    @cached_property
+    def scorer(self):
+        return SectionScorer(self.table, self.width)
+
+    @cached_property
+    def segments(self):
+        return RollSegments(self.table, self.length, self.width, self.cut_margin)
+
+    @cached_property
+    def high_density_sections(self):
+        return find_high_density_sections(self.table)
+
+    @cached_property
+    def original_ppms(self):
+        return calculate_ppms(self.table, self.length, self.width)
+
+    # Function to look up (kind, *key) for this roll in the score cache, computing it on a miss.
+    # span is the interval of the roll the value depends on.
+    def memo(self, kind, key, compute, span=WHOLE_ROLL):
+        return self.cache.get((self.key, kind) + tuple(key), compute, span)
+
+    # Points of defects lying fully inside [start, end]
+    def section_points(self, start, end):
+        return self.memo('points', (start, end), lambda: self.scorer.section_points(start, end), (start, end))
+
+    def section_ppms(self, start, end):
+        return (self.section_points(start, end) * 100) / ((end - start + 1) * self.width)
+
+    # Function to find the densest section among the defects left after cutting out `removed` (inclusive meter ranges)
+    def densest_section(self, removed=(), max_gap=None):
+        def search():
+            table = self.table.select(self.table.outside(list(removed))) if removed else self.table
+            return find_highest_density_section(table, self.width, max_gap)
+
+        return self.memo('densest', (tuple(removed), max_gap), search)
+
+    # Function to return the roll's retained-length versus PPMS frontier (planner.cut_frontier), solved once
+    # per set of planning options; every threshold after that is a binary search
+    def frontier(self, join_penalty=4, min_piece_length=20):
+        return self.memo('frontier', (join_penalty, min_piece_length, self.cut_margin),
+                         lambda: cut_frontier(self.table, self.length, self.width, join_penalty, min_piece_length,
+                                              self.cut_margin))
+
+    # Function to score a plan given as removed (start, end) spans, see evaluate.evaluate_sections
+    def evaluate(self, removed_sections, join_penalty=4):
+        removed_sections = tuple(sorted(removed_sections))
+        return self.memo('evaluation', (removed_sections, join_penalty),
+                         lambda: evaluate_sections(self.table, self.length, self.width, removed_sections, join_penalty))
+
+    # Function to remove inclusive meter sections (and the short remnants they leave) and return the removed spans
+    def remove(self, sections, min_piece_length=20):
+        new_defects, new_length, total_cut_length, removed_sections, kept_sections = remove_sections(
+            self.table, self.length, self.width, sorted(sections), min_piece_length)
+        return meter_spans(removed_sections)
+
+
+# A cut strategy plans the removed (start, end) spans of one roll from a RollIndex.
+# Subclasses set `name` and `defaults` and implement plan(); run() fills in the defaults, memoizes the plan
+# through the index and scores it the same way for every strategy.
+class CutStrategy:
+    name = None
+    defaults = {}
+
+    def plan(self, index, threshold_ppms, join_penalty, min_piece_length, **options):
+        raise NotImplementedError
+
+    def run(self, index, threshold_ppms=23, join_penalty=4, min_piece_length=20, **options):
+        options = {**self.defaults, **options}
+        removed_sections = index.memo('plan', (self.name, threshold_ppms, join_penalty, min_piece_length, _key(options)),
+                                      lambda: self.plan(index, threshold_ppms, join_penalty, min_piece_length, **options))
+        summary = index.evaluate(removed_sections, join_penalty)
+        return {
+            'strategy': self.name,
+            'length': index.length,
+            'original_ppms': index.original_ppms,
+            'removed_sections': list(removed_sections),
+            'kept_sections': list(summary['kept_sections']),
+            'kept_length': summary['kept_length'],
+            'ppms': summary['ppms'],
+            'meets_threshold': summary['ppms'] <= threshold_ppms,
+        }
+
+
+# Registered strategies: name -> CutStrategy instance
+STRATEGIES = {}
+
+
+def register_strategy(cls):
+    STRATEGIES[cls.name] = cls()
+    return cls
+
+
+def get_strategy(name):
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"unknown cut strategy {name!r} (choose from {', '.join(sorted(STRATEGIES))})") from None
+
+
+# Cut the densest remaining section, one at a time, until the roll meets the threshold or max_cuts is reached
+@register_strategy
+class GreedyStrategy(CutStrategy):
+    name = 'greedy'
+    defaults = {'max_cuts': 10, 'max_gap': None}
+
+    def plan(self, index, threshold_ppms, join_penalty, min_piece_length, max_cuts=10, max_gap=None):
+        sections = []
+        removed_sections = []
+        while len(sections) < max_cuts and index.evaluate(removed_sections, join_penalty)['ppms'] > threshold_ppms:
+            section = index.densest_section(sections, max_gap)
+            if section is None or section in sections:
+                break
+            sections.append(section)
+            removed_sections = index.remove(sections, min_piece_length)
+        return removed_sections
+
+
+# Cut one section spanning the num_sections densest sections (find_combined_highest_density_sections)
+@register_strategy
+class CombinedDensityStrategy(CutStrategy):
+    name = 'combined-density'
+    defaults = {'num_sections': 3, 'max_gap': None}
+
+    def plan(self, index, threshold_ppms, join_penalty, min_piece_length, num_sections=3, max_gap=None):
+        if index.original_ppms <= threshold_ppms:
+            return []
+        sections = []
+        for _ in range(num_sections):
+            section = index.densest_section(sections, max_gap)
+            if section is not None and section != (0, 0):
+                sections.append(section)
+        if not sections:
+            return []
+        return index.remove([(min(start for start, end in sections), max(end for start, end in sections))],
+                            min_piece_length)
+
+
+# The combined strategy with every section at most max_gap meters long (the gapconstraint scripts)
+@register_strategy
+class GapConstrainedStrategy(CombinedDensityStrategy):
+    name = 'gap-constrained'
+    defaults = {'num_sections': 3, 'max_gap': 5}
+
+
+# Exact dynamic-programming planner (planner.plan_cuts_dp), answered from the index's memoized frontier
+@register_strategy
+class DPStrategy(CutStrategy):
+    name = 'dp'
+
+    def plan(self, index, threshold_ppms, join_penalty, min_piece_length):
+        frontier = index.frontier(join_penalty, min_piece_length)
+        removed_sections, kept_sections, kept_length, ppms = frontier.plan(threshold_ppms)
+        return removed_sections
+
+
+# Greedy that pays join_penalty points per cut (greedy.maximize_remaining_length_with_cut_penalty)
+@register_strategy
+class CutPenaltyGreedyStrategy(CutStrategy):
+    name = 'cut-penalty-greedy'
+    defaults = {'min_remaining_length_ratio': 0.0}
+
+    @staticmethod
+    def cut_ranges(index, threshold_ppms, join_penalty, min_remaining_length_ratio=0.0):
+        def search():
+            cut_positions, ppms, remaining_length, cut_ranges = maximize_remaining_length_with_cut_penalty(
+                index.table, index.length, index.width, threshold_ppms, join_penalty, min_remaining_length_ratio)
+            return cut_ranges
+
+        return index.memo('cut-penalty-ranges', (threshold_ppms, join_penalty, min_remaining_length_ratio), search)
+
+    def plan(self, index, threshold_ppms, join_penalty, min_piece_length, min_remaining_length_ratio=0.0):
+        return meter_spans(self.cut_ranges(index, threshold_ppms, join_penalty, min_remaining_length_ratio))
+
+
+# Ant colony planner (aco.plan_cuts_aco), reusing the index's segments, its cut-penalty greedy plan and its frontier
+# as the seeds
+@register_strategy
+class AntColonyStrategy(CutStrategy):
+    name = 'ant-colony'
+    defaults = {'colonies': 4, 'processes': None, 'seed': 0, 'time_limit': None}
+
+    def plan(self, index, threshold_ppms, join_penalty, min_piece_length, **options):
+        cut_ranges = CutPenaltyGreedyStrategy.cut_ranges(index, threshold_ppms, join_penalty)
+        removed_sections, kept_sections, kept_length, ppms = plan_cuts_aco(
+            index.table, index.length, index.width, threshold_ppms, join_penalty, min_piece_length,
+            segments=index.segments, cut_ranges=cut_ranges, frontier=index.frontier(join_penalty, min_piece_length),
+            **options)
+        return removed_sections
+
+
+# Branch-and-bound search with an optional cut-count limit (branch_bound.plan_cuts_bnb), seeded from the
+# index's cut-penalty greedy plan and DP frontier
+@register_strategy
+class BranchAndBoundStrategy(CutStrategy):
+    name = 'branch-and-bound'
+    defaults = {'max_cuts': None, 'time_limit': 10, 'node_limit': None}
+
+    def plan(self, index, threshold_ppms, join_penalty, min_piece_length, **options):
+        removed_sections, kept_sections, kept_length, ppms = plan_cuts_bnb(
+            index.table, index.length, index.width, threshold_ppms, join_penalty, min_piece_length,
+            segments=index.segments, cut_ranges=CutPenaltyGreedyStrategy.cut_ranges(index, threshold_ppms, join_penalty),
+            frontier=index.frontier(join_penalty, min_piece_length), **options)
+        return removed_sections
+
+
+# Function to run a named strategy on a roll; pass the same RollIndex to compare strategies without re-indexing
+def run_strategy(name, defects, length, width, threshold_ppms=23, join_penalty=4, min_piece_length=20, index=None,
+                 **options):
+    index = index or RollIndex(defects, length, width)
+    return get_strategy(name).run(index, threshold_ppms, join_penalty, min_piece_length, **options)
+
+
+if __name__ == "__main__":
+    # python -m fabricopt.strategies [defect count]: every strategy on one synthetic roll, sharing one index
+    import sys
+    import time
+
+    from .benchmark import generate_roll
+
+    roll = generate_roll(defect_count=int(sys.argv[1]) if len(sys.argv) > 1 else 200)
+    index = RollIndex.from_roll(roll)
+    for name in STRATEGIES:
+        start = time.perf_counter()
+        options = {'time_limit': 2} if name in ('ant-colony', 'branch-and-bound') else {}
+        result = get_strategy(name).run(index, **options)
+        print(f"{name:<20} {time.perf_counter() - start:8.3f} s  kept {result['kept_length']:8.1f} of "
+              f"{roll['length']} m  PPMS {result['ppms']:6.2f}  {len(result['removed_sections'])} cuts")
+    print(index.cache.info())
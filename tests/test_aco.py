@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+import pytest
+
+from fabricopt.aco import AntColonyOptimizer, plan_cuts_aco
+from fabricopt.benchmark import generate_roll
+from fabricopt.evaluate import RollSegments, evaluate_plans
+from fabricopt.planner import plan_cuts_dp
+
+
+def test_fixed_seed_is_reproducible():
+    roll = generate_roll(seed=2, defect_count=150)
+    runs = [plan_cuts_aco(roll['defects'], roll['length'], roll['width'], 23, processes=1, colonies=2, seed=5,
+                          num_iterations=15) for _ in range(2)]
+    assert runs[0] == runs[1]
+
+
+def test_time_limit_stops_the_colony():
+    roll = generate_roll(seed=4, defect_count=300)
+    colony = AntColonyOptimizer(num_iterations=10 ** 6, patience=10 ** 6, time_limit=0.3, seed=0)
+    started = time.perf_counter()
+    result = colony.optimize(roll['defects'], roll['length'], roll['width'], 23)
+    assert time.perf_counter() - started < 5
+    assert 0 < result['iterations'] < 10 ** 6
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_never_worse_than_the_initial_masks(seed):
+    roll = generate_roll(seed=seed, defect_count=120)
+    segments = RollSegments(roll['defects'], roll['length'], roll['width'])
+    rng = np.random.default_rng(seed)
+    initial_masks = rng.random((8, len(segments))) < 0.8
+    initial_masks[0] = segments.masks_from_sections(
+        [plan_cuts_dp(roll['defects'], roll['length'], roll['width'], 23)[0]])[0]
+    scores = evaluate_plans(segments, initial_masks)
+    best_seed = scores['kept_length'][scores['ppms'] <= 23].max()
+
+    result = AntColonyOptimizer(num_iterations=10, seed=seed).optimize(
+        roll['defects'], roll['length'], roll['width'], 23, initial_masks=initial_masks, segments=segments)
+    assert result['feasible']
+    assert result['kept_length'] >= best_seed - 1e-9
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_never_worse_than_the_dp_planner(seed):
+    roll = generate_roll(seed=seed, defect_count=200)
+    removed_sections, kept_sections, kept_length, ppms = plan_cuts_aco(
+        roll['defects'], roll['length'], roll['width'], 23, processes=1, colonies=2, num_iterations=10)
+    dp_kept_length = plan_cuts_dp(roll['defects'], roll['length'], roll['width'], 23)[2]
+    assert ppms <= 23
+    assert kept_length >= dp_kept_length - 1e-9
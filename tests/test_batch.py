@@ -0,0 +1,26 @@
+import pytest
+
+from fabricopt.batch import optimize_roll, optimize_roll_safely
+from fabricopt.benchmark import generate_roll
+from fabricopt.planner import plan_cuts_dp
+
+
+def test_dp_goes_through_the_strategy_registry():
+    roll = generate_roll(seed=3, defect_count=200)
+    result = optimize_roll(roll)
+    removed_sections, kept_sections, kept_length, ppms = plan_cuts_dp(roll['defects'], roll['length'], roll['width'], 23)
+    assert result['strategy'] == 'dp'
+    assert result['removed_sections'] == removed_sections
+    assert result['kept_length'] == pytest.approx(kept_length)
+    assert result['ppms'] == pytest.approx(ppms)
+
+
+def test_every_strategy_returns_the_same_keys():
+    roll = generate_roll(seed=1, defect_count=100)
+    keys = {strategy: set(optimize_roll(roll, strategy=strategy)) for strategy in ('dp', 'greedy', 'cut-penalty-greedy')}
+    assert keys['dp'] == keys['greedy'] == keys['cut-penalty-greedy']
+
+
+def test_a_bad_roll_reports_an_error():
+    result = optimize_roll_safely({'name': 'empty', 'length': 0, 'defects': []})
+    assert result['name'] == 'empty' and result['error']
@@ -0,0 +1,39 @@
+import pytest
+
+from fabricopt.benchmark import ALGORITHMS, format_table, generate_roll, run_benchmark, run_case
+from fabricopt.evaluate import evaluate_sections
+from fabricopt.strategies import STRATEGIES
+
+OPTIONS = {'threshold_ppms': 23, 'join_penalty': 4, 'min_piece_length': 20, 'num_sections': 3, 'max_gap': 5,
+           'time_limit': 2, 'max_cuts': None}
+
+
+def test_algorithm_names_are_strategy_names():
+    assert set(ALGORITHMS) <= set(STRATEGIES)
+
+
+# Every algorithm's plan is scored by evaluate_sections with the same roll and join penalty
+@pytest.mark.parametrize('name', sorted(ALGORITHMS))
+def test_run_case_scores_every_plan_the_same_way(name):
+    roll = generate_roll(seed=3, defect_count=30)
+    result = run_case(name, roll, OPTIONS, measure_memory=False)
+    assert 'error' not in result and 'skipped' not in result
+
+    function, max_defects = ALGORITHMS[name]
+    removed_sections = function(roll, OPTIONS)
+    summary = evaluate_sections(roll['defects'], roll['length'], roll['width'], removed_sections, OPTIONS['join_penalty'])
+    assert result['cuts'] == len(removed_sections)
+    assert result['kept_length'] == pytest.approx(summary['kept_length'])
+    assert result['ppms'] == pytest.approx(summary['ppms'])
+    assert result['meets_threshold'] == (summary['ppms'] <= OPTIONS['threshold_ppms'])
+
+
+def test_format_table_has_a_row_per_result():
+    results = run_benchmark([10, 1200], sorted(ALGORITHMS), measure_memory=False, time_limit=1)
+    table = format_table(results).splitlines()
+    assert len(table) == len(results) + 1
+    assert any('skipped' in result for result in results)
+    for line, result in zip(table[1:], results):
+        assert line.split()[0] == result['algorithm']
+        if 'skipped' in result:
+            assert result['skipped'] in line
@@ -0,0 +1,72 @@
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+from fabricopt.benchmark import generate_roll
+from fabricopt.branch_bound import BranchAndBound, _cuts_of, plan_cuts_bnb
+from fabricopt.evaluate import RollSegments, evaluate_plans
+from fabricopt.planner import plan_cuts_dp
+
+
+# Longest feasible retained length over every keep mask of the roll's segments
+def brute_force(segments, threshold_ppms, join_penalty, min_piece_length, max_cuts):
+    masks = np.array(list(itertools.product([False, True], repeat=len(segments))))
+    scores = evaluate_plans(segments, masks, join_penalty)
+    best = 0.0
+    for mask, kept_length, ppms, shortest in zip(masks, scores['kept_length'], scores['ppms'], scores['shortest_piece']):
+        if kept_length and (ppms > threshold_ppms + 1e-9 or shortest < min_piece_length or len(_cuts_of(mask)) > max_cuts):
+            continue
+        best = max(best, kept_length)
+    return best
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_matches_brute_force_on_small_rolls(seed):
+    rng = np.random.default_rng(seed)
+    roll = generate_roll(seed=seed, defect_count=int(rng.integers(4, 8)), length=float(rng.integers(50, 100)))
+    segments = RollSegments(roll['defects'], roll['length'], roll['width'])
+    assert len(segments) <= 16
+    threshold_ppms = float(rng.choice([5, 10, 15, 23]))
+    max_cuts = int(rng.choice([1, 2, 3, 99]))
+
+    result = BranchAndBound(max_cuts=max_cuts).optimize(roll['defects'], roll['length'], roll['width'], threshold_ppms,
+                                                        4, 20, segments)
+    assert result['optimal']
+    assert result['kept_length'] == pytest.approx(brute_force(segments, threshold_ppms, 4, 20, max_cuts))
+    assert result['feasible'] or result['kept_length'] == 0
+    assert len(result['removed_sections']) <= max_cuts
+
+
+@pytest.mark.parametrize('max_cuts', [2, 5])
+def test_time_limit_stops_the_search(max_cuts):
+    roll = generate_roll(defect_count=3000)
+    result = BranchAndBound(max_cuts=max_cuts, time_limit=0.5).optimize(roll['defects'], roll['length'], roll['width'], 23)
+    assert not result['optimal']
+    assert result['seconds'] < 5
+    assert len(result['removed_sections']) <= max_cuts
+    assert result['feasible']
+
+
+def test_time_limit_covers_seeding():
+    roll = generate_roll(defect_count=3000)
+    started = time.perf_counter()
+    removed_sections, kept_sections, kept_length, ppms = plan_cuts_bnb(
+        roll['defects'], roll['length'], roll['width'], 23, max_cuts=2, time_limit=0.5)
+    assert time.perf_counter() - started < 5
+    assert len(removed_sections) <= 2
+    assert ppms <= 23
+
+
+def test_node_limit_stops_early():
+    roll = generate_roll(defect_count=300)
+    result = BranchAndBound(max_cuts=3, node_limit=5).optimize(roll['defects'], roll['length'], roll['width'], 23)
+    assert not result['optimal']
+    assert result['nodes'] <= 5
+
+
+def test_without_cut_limit_returns_the_dp_plan():
+    roll = generate_roll(defect_count=200)
+    assert (plan_cuts_bnb(roll['defects'], roll['length'], roll['width'], 23)
+            == plan_cuts_dp(roll['defects'], roll['length'], roll['width'], 23))
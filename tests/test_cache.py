@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+from openpyxl import Workbook
+
+from fabricopt.cache import RollCache
+
+
+# Inspection sheet laid out like the source workbooks: fabric info block on top, defect rows from index 12
+def inspection_rows(roll_number, defects):
+    rows = [('SORT NO', None, 'GROSS MTR', None)]
+    rows += [(None, f'{roll_number}-{row}', None, 100 + row) for row in range(6)]
+    rows += [(None,)] * 5
+    return rows + [(start, start + 1, 'slub', 'weaving', points) for start, points in defects]
+
+
+def write_workbook(path, sheets, mtime):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        worksheet = workbook.create_sheet(name)
+        for row in rows:
+            worksheet.append(row)
+    workbook.save(path)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def points_of(rolls):
+    return {roll['name']: np.asarray(roll['defects'].points).tolist() for roll in rolls}
+
+
+@pytest.fixture
+def source(tmp_path):
+    return write_workbook(tmp_path / 'rolls.xlsx', {'ROLL1': inspection_rows(1, [(5, 1), (9, 4)]),
+                                                    'ROLL2': inspection_rows(2, [(3, 2)])}, 1000)
+
+
+def test_unchanged_source_is_served_from_the_cache(tmp_path, source, monkeypatch):
+    cache = RollCache(str(tmp_path / 'cache'))
+    assert points_of(cache.load(source)) == {'ROLL1': [1, 4], 'ROLL2': [2]}
+
+    monkeypatch.setattr(RollCache, 'build', lambda self, source_path: pytest.fail('cache entry rebuilt'))
+    assert points_of(RollCache(str(tmp_path / 'cache')).load(source)) == {'ROLL1': [1, 4], 'ROLL2': [2]}
+
+
+# A touched but identical source is re-hashed once, and its new mtime recorded so it is not hashed again
+def test_mtime_change_with_the_same_content_refreshes_the_entry(tmp_path, source, monkeypatch):
+    cache = RollCache(str(tmp_path / 'cache'))
+    cache.load(source)
+    os.utime(source, (2000, 2000))
+
+    monkeypatch.setattr(RollCache, 'build', lambda self, source_path: pytest.fail('cache entry rebuilt'))
+    assert points_of(cache.load(source)) == {'ROLL1': [1, 4], 'ROLL2': [2]}
+    assert cache._read_meta(cache.entry_dir(source))['mtime'] == 2000
+
+    monkeypatch.setattr('fabricopt.cache.file_hash', lambda file_path: pytest.fail('source hashed again'))
+    cache.load(source)
+
+
+def test_changed_content_rebuilds_the_entry(tmp_path, source):
+    cache = RollCache(str(tmp_path / 'cache'))
+    cache.load(source)
+    write_workbook(source, {'ROLL1': inspection_rows(1, [(5, 3)])}, 3000)
+    assert points_of(cache.load(source)) == {'ROLL1': [3]}
+
+
+# The entry is written into a scratch directory and swapped in: a build that fails part way leaves the old entry
+def test_failed_rebuild_keeps_the_previous_entry(tmp_path, source, monkeypatch):
+    cache = RollCache(str(tmp_path / 'cache'))
+    cache.load(source)
+    assert os.listdir(cache.cache_dir) == [os.path.basename(cache.entry_dir(source))]
+    write_workbook(source, {'ROLL1': inspection_rows(1, [(5, 3)])}, 3000)
+
+    def failing_save(file_path, column):
+        raise OSError('disk full')
+
+    monkeypatch.setattr('fabricopt.cache.np.save', failing_save)
+    with pytest.raises(OSError):
+        cache.load(source)
+    meta = cache._read_meta(cache.entry_dir(source))
+    assert points_of(cache._open(cache.entry_dir(source), meta)) == {'ROLL1': [1, 4], 'ROLL2': [2]}
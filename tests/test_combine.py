@@ -0,0 +1,62 @@
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from fabricopt.combine import combine_workbooks, load_columnar, write_columnar
+from fabricopt.rolls import FABRIC_INFO_FIELDS
+
+
+def write_workbook(path, sheets):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        worksheet = workbook.create_sheet(name)
+        for row in rows:
+            worksheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+def test_combine_copies_every_row_without_printing(tmp_path, capsys):
+    first = write_workbook(tmp_path / 'a.xlsx', {'ROLL1': [(1, 2), (3, 4)], 'ROLL2': [(5,)]})
+    second = write_workbook(tmp_path / 'b.xlsx', {'ROLL1': [(6, 7, 8)]})
+    output_path = str(tmp_path / 'combined.xlsx')
+
+    assert combine_workbooks([first, second], output_path) == 3
+    assert capsys.readouterr().out == ''
+    workbook = load_workbook(output_path, read_only=True)
+    assert workbook.sheetnames == ['ROLL1', 'ROLL2', 'ROLL1 (2)']
+    assert [list(sheet.iter_rows(values_only=True)) for sheet in workbook.worksheets] == [
+        [(1, 2), (3, 4)], [(5,)], [(6, 7, 8)]]
+    workbook.close()
+
+
+def fabric_info(roll_number, gross_meter):
+    info = {field: f'{field}-{roll_number}' for field, row, column in FABRIC_INFO_FIELDS}
+    info.update(gross_meter=gross_meter, net_meter=gross_meter - 1.0)
+    return info
+
+
+# Defect rows are (from, to, name, type, points); a non-numeric points label becomes the type with 0 points
+@pytest.mark.parametrize('extension', ['.parquet', '.feather'])
+def test_columnar_round_trip(tmp_path, extension):
+    pytest.importorskip('pyarrow')
+    rolls = [
+        {'name': 'ROLL1', 'fabric_info': fabric_info(1, 80.5),
+         'defects': [(12.5, 12.5, 'slub', 'weaving', 4), (3, 5, 'oil', 'finishing', 2),
+                     (40, 44, 'stain', 'dyeing', 'continuous defect')]},
+        {'name': 'ROLL2', 'fabric_info': fabric_info(2, 60.0), 'defects': []},
+        {'name': 'ROLL3', 'fabric_info': fabric_info(3, 95.0), 'defects': [(7, 7, 'hole', 'knitting', 1)]},
+    ]
+    write_columnar(rolls, str(tmp_path / f'combined{extension}'))
+    loaded = load_columnar(str(tmp_path / f'combined{extension}'))
+
+    assert [roll['name'] for roll in loaded] == ['ROLL1', 'ROLL2', 'ROLL3']
+    assert [roll['fabric_info'] for roll in loaded] == [roll['fabric_info'] for roll in rolls]
+    assert [roll['length'] for roll in loaded] == [80.5, 60.0, 95.0]
+    defects = loaded[0]['defects']
+    assert defects.starts.tolist() == [3, 12.5, 40]
+    assert defects.ends.tolist() == [5, 12.5, 44]
+    assert defects.points.tolist() == [2, 4, 0]
+    assert [defects.type_names[code] for code in defects.types] == ['finishing', 'weaving', 'continuous defect']
+    assert len(loaded[1]['defects']) == 0
+    assert loaded[2]['defects'].points.tolist() == [1]
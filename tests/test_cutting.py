@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from fabricopt.cutting import CutState
+
+
+def defects_at(*positions, points=1):
+    return [{'from': position, 'to': position, 'points': points} for position in positions]
+
+
+# Points of every kept piece, counted from scratch: a defect is kept when its 'from' lies in no cut [start, end]
+def expected_points(defects, cuts, pieces):
+    kept = [d for d in defects if not any(start <= d['from'] <= end for start, end in cuts)]
+    return [sum(d['points'] for d in kept if start <= d['from'] <= end) for start, end in pieces]
+
+
+@pytest.mark.parametrize('start, end', [(50, 40), (40, 40), (-1, 10), (90, 101)])
+def test_apply_cut_rejects_bad_spans(start, end):
+    state = CutState(defects_at(10, 60), 100, 1.5)
+    with pytest.raises(ValueError):
+        state.apply_cut(start, end)
+    assert state.kept_sections() == [(0.0, 100.0)]
+    assert state.kept_length == 100
+
+
+def test_defects_on_cut_ends_are_cut_away():
+    state = CutState(defects_at(0, 30, 40, 100), 100, 1.5)
+    assert state.apply_cut(30, 40)
+    assert state.kept_sections() == [(0.0, 30.0), (40.0, 100.0)]
+    assert state.points == [1, 1]
+    assert state.kept_points == 2
+    assert state.kept_length == 90
+
+
+def test_cut_outside_kept_fabric_records_nothing():
+    state = CutState(defects_at(35), 100, 1.5)
+    state.apply_cut(30, 40)
+    assert not state.apply_cut(32, 38)
+    assert len(state.history) == 1
+
+
+def test_random_cuts_and_undo_match_a_recount():
+    rng = np.random.default_rng(0)
+    defects = [{'from': float(p), 'to': float(p), 'points': int(k)}
+               for p, k in zip(rng.integers(0, 201, 80), rng.integers(1, 5, 80))]
+    state = CutState(defects, 200, 1.5, min_usable_length=20, join_penalty=4)
+    cuts = []
+    for step in range(200):
+        if cuts and rng.random() < 0.3:
+            state.undo()
+            cuts.pop()
+        else:
+            start = float(rng.integers(0, 199))
+            end = float(rng.integers(start + 1, 201))
+            if state.apply_cut(start, end):
+                cuts.append((start, end))
+        pieces = state.kept_sections()
+        assert state.points == expected_points(defects, cuts, pieces)
+        assert state.kept_length == pytest.approx(sum(end - start for start, end in pieces))
+        usable = [(start, end) for start, end in pieces if end - start >= 20]
+        assert state.usable_sections() == usable
+        assert state.usable_points == pytest.approx(sum(expected_points(defects, cuts, usable)))
+    while cuts:
+        state.undo()
+        cuts.pop()
+    assert state.kept_sections() == [(0.0, 200.0)]
+    assert state.kept_points == sum(d['points'] for d in defects)
+
+
+def test_undo_without_cuts_returns_false():
+    state = CutState(defects_at(10), 100, 1.5)
+    assert state.undo() is False
+    state.apply_cut(5, 15)
+    assert state.undo() is True
+    assert state.undo() is False
+    assert state.kept_sections() == [(0.0, 100.0)]
@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+import pytest
+
+from fabricopt.density import DEFAULT_SIZES, scan_density
+
+# Roll and defects of newx8.py
+LENGTH = 75.8
+DEFECTS = [{'from': 2, 'to': 2, 'points': 4}, {'from': 5, 'to': 5, 'points': 4}, {'from': 10, 'to': 10, 'points': 1},
+           {'from': 22, 'to': 22, 'points': 4}, {'from': 23, 'to': 23, 'points': 4}, {'from': 28, 'to': 28, 'points': 4},
+           {'from': 35, 'to': 35, 'points': 2}, {'from': 39, 'to': 39, 'points': 4}, {'from': 46, 'to': 46, 'points': 2},
+           {'from': 70, 'to': 70, 'points': 2}]
+
+
+# The interval loop of newx8.py: (start, end, points, density) for every window of one size
+def original_windows(defects, length, interval):
+    windows = []
+    for i in range(0, int(length), interval):
+        points = sum(defect['points'] for defect in defects if i <= defect['from'] < i + interval)
+        windows.append((i, i + interval, points, points / interval))
+    return windows
+
+
+def assert_same_windows(scan, defects, length, size):
+    rows = scan.table(size)
+    expected = original_windows(defects, length, size)
+    assert [(start, end) for start, end, points, density in rows] == [(start, end) for start, end, *_ in expected]
+    np.testing.assert_allclose([row[2:] for row in rows], [row[2:] for row in expected])
+
+
+@pytest.mark.parametrize('size', DEFAULT_SIZES)
+def test_matches_newx8_on_its_roll(size):
+    scan = scan_density(DEFECTS, LENGTH)
+    assert scan.table(size)[-1][0] < int(LENGTH)
+    assert_same_windows(scan, DEFECTS, LENGTH, size)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_newx8_on_random_rolls(seed):
+    rng = random.Random(seed)
+    length = rng.choice([rng.randint(1, 120), round(rng.uniform(1, 120), 1)])
+    defects = [{'from': round(rng.uniform(0, length + 10), rng.choice([0, 1])), 'to': 0, 'points': rng.randint(1, 4)}
+               for _ in range(rng.randint(0, 40))]
+    scan = scan_density(defects, length)
+    for size in DEFAULT_SIZES:
+        assert_same_windows(scan, defects, length, size)
+
+
+def test_sizes_must_be_on_the_grid():
+    with pytest.raises(ValueError):
+        scan_density(DEFECTS, LENGTH, sizes=[2.5])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from fabricopt.benchmark import generate_roll
+from fabricopt.evaluate import RollSegments, evaluate_plans, evaluate_sections
+
+JOIN_PENALTY = 4
+MARGIN = 0.5
+
+
+# Random valid plan: cut a random subset of defects, each cut running MARGIN past its defect, and keep cutting
+# defects that touch a cut until none does (a kept defect touching a cut is not a plan the planners produce)
+def random_plan(defects, length, rng, share):
+    cut = rng.random(len(defects)) < share
+    while True:
+        cuts = [(max(defect['from'] - MARGIN, 0), min(defect['to'] + MARGIN, length))
+                for defect, removed in zip(defects, cut) if removed]
+        touching = np.array([not removed and any(start <= defect['to'] and defect['from'] <= end for start, end in cuts)
+                             for defect, removed in zip(defects, cut)], dtype=bool)
+        if not touching.any():
+            return cuts
+        cut |= touching
+
+
+# Every plan row scored at once must give what evaluate_sections gives for the same removed sections
+@pytest.mark.parametrize('seed', range(10))
+def test_matches_evaluate_sections_plan_by_plan(seed):
+    roll = generate_roll(seed=seed, defect_count=40)
+    segments = RollSegments(roll['defects'], roll['length'], roll['width'], MARGIN)
+    rng = np.random.default_rng(seed)
+    plans = [[], [(0, roll['length'])]] + [random_plan(roll['defects'], roll['length'], rng, share)
+                                          for share in rng.uniform(0.05, 0.7, 48)]
+
+    scores = evaluate_plans(segments, segments.masks_from_sections(plans), JOIN_PENALTY)
+    for row, removed_sections in enumerate(plans):
+        expected = evaluate_sections(roll['defects'], roll['length'], roll['width'], removed_sections, JOIN_PENALTY)
+        assert scores['kept_length'][row] == pytest.approx(expected['kept_length'])
+        assert scores['kept_points'][row] == pytest.approx(expected['kept_points'])
+        assert scores['penalized_points'][row] == pytest.approx(expected['penalized_points'])
+        assert scores['ppms'][row] == pytest.approx(expected['ppms'])
+        assert scores['pieces'][row] == len(expected['kept_sections'])
+        if expected['kept_sections']:
+            assert scores['shortest_piece'][row] == pytest.approx(expected['shortest_piece'])
+        else:
+            assert scores['shortest_piece'][row] == np.inf
+
+
+def test_masks_from_sections_round_trip():
+    roll = generate_roll(seed=4, defect_count=40)
+    segments = RollSegments(roll['defects'], roll['length'], roll['width'])
+    mask = np.random.default_rng(4).random(len(segments)) < 0.7
+    removed_sections, kept_sections = segments.sections_from_mask(mask)
+    assert (segments.masks_from_sections([removed_sections])[0] == mask).all()
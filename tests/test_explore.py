@@ -0,0 +1,56 @@
+import pytest
+
+from fabricopt.explore import RecomputeGraph
+
+
+# a, b -> total = a + b -> doubled = 2 * total; c -> tripled = 3 * c; both = doubled + tripled
+def build_graph():
+    graph = RecomputeGraph()
+    graph.input('a', 1)
+    graph.input('b', 2)
+    graph.input('c', 3)
+    graph.node('total', lambda a, b: a + b, 'a', 'b')
+    graph.node('doubled', lambda total: 2 * total, 'total')
+    graph.node('tripled', lambda c: 3 * c, 'c')
+    graph.node('both', lambda doubled, tripled: doubled + tripled, 'doubled', 'tripled')
+    return graph
+
+
+def test_only_nodes_behind_a_changed_input_rerun():
+    graph = build_graph()
+    assert graph.get('both') == 15
+    assert graph.runs == {'total': 1, 'doubled': 1, 'tripled': 1, 'both': 1}
+
+    assert graph.set(c=4) == ['c']
+    assert graph.get('both') == 18
+    assert graph.runs == {'total': 1, 'doubled': 1, 'tripled': 2, 'both': 2}
+
+    graph.get('both')
+    assert graph.runs == {'total': 1, 'doubled': 1, 'tripled': 2, 'both': 2}
+
+
+def test_setting_an_equal_value_reruns_nothing():
+    graph = build_graph()
+    graph.get('both')
+    assert graph.set(a=1, c=3) == []
+    graph.get('both')
+    assert graph.runs == {'total': 1, 'doubled': 1, 'tripled': 1, 'both': 1}
+
+
+# a and b swap: total reruns but gives the same value, so its version stays and nothing behind it reruns
+def test_an_unchanged_node_value_stops_the_rerun():
+    graph = build_graph()
+    graph.get('both')
+    version = graph.version('total')
+    graph.set(a=2, b=1)
+    assert graph.get('both') == 15
+    assert graph.version('total') == version
+    assert graph.runs == {'total': 2, 'doubled': 1, 'tripled': 1, 'both': 1}
+
+
+def test_nodes_are_not_inputs():
+    graph = build_graph()
+    with pytest.raises(KeyError):
+        graph.set(total=5)
+    with pytest.raises(KeyError):
+        graph.set(missing=5)
@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip('tkinter')
+
+from fabricopt.gui import OptimizationRunner, optimization_stages  # noqa: E402
+
+DEFECTS = [{'from': 2, 'to': 5, 'points': 12}, {'from': 23, 'to': 28, 'points': 20}, {'from': 46, 'to': 46, 'points': 2}]
+
+
+# Stand-in for the Tk root: after() only records callbacks, which the test runs by hand
+class FakeRoot:
+    def __init__(self):
+        self.callbacks = {}
+
+    def after(self, delay, callback):
+        self.callbacks[len(self.callbacks)] = callback
+        return len(self.callbacks) - 1
+
+    def after_cancel(self, callback_id):
+        self.callbacks.pop(callback_id, None)
+
+
+def test_cancelling_after_the_search_skips_the_removal_stage():
+    cancelled = threading.Event()
+    stages = []
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for stage, values in optimization_stages(DEFECTS, 69.6, 1.5, 23, 2, pool, cancelled):
+            stages.append(stage)
+            if stage == 'sections':
+                cancelled.set()
+    assert stages == ['original', 'sections']
+
+
+def test_submit_drops_output_of_the_running_job_at_once():
+    stages, outcomes = [], []
+    runner = OptimizationRunner(FakeRoot(), lambda stage, values: stages.append(stage),
+                                lambda outcome, message: outcomes.append(outcome), max_workers=1)
+    try:
+        running = runner.cancelled
+        runner.submit(DEFECTS, 69.6, 1.5, 23, 2)
+        assert running.is_set()
+        # A message from the job that was running before the click, arriving during the coalesce window
+        runner.messages.put((runner.job_id - 1, 'original', {}))
+        runner.poll()
+        assert stages == [] and outcomes == []
+    finally:
+        runner.shutdown()
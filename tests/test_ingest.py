@@ -0,0 +1,114 @@
+import os
+import sqlite3
+
+from openpyxl import Workbook
+
+from fabricopt.ingest import FABRIC_INFO_COLUMNS, BulkWriter, create_tables, ingest_workbooks
+
+
+# Inspection sheet laid out like the source workbooks: fabric info block on top, defect rows from index 12
+def inspection_rows(roll_number, defects):
+    rows = [('SORT NO', None, 'GROSS MTR', None)]
+    rows += [(None, f'{roll_number}-{row}', None, 100 + row) for row in range(6)]
+    rows += [(None,)] * 5
+    return rows + [(start, start + 1, 'slub', 'weaving', points) for start, points in defects]
+
+
+def write_workbook(path, sheets, mtime):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        worksheet = workbook.create_sheet(name)
+        for row in rows:
+            worksheet.append(row)
+    workbook.save(path)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def counts(conn):
+    return tuple(conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                 for table in ('fabric_info', 'defects', 'ingest_manifest'))
+
+
+def test_sheets_removed_from_a_workbook_are_deleted(tmp_path):
+    conn = sqlite3.connect(':memory:')
+    path = write_workbook(tmp_path / 'rolls.xlsx', {'ROLL1': inspection_rows(1, [(5, 1), (9, 4)]),
+                                                    'ROLL2': inspection_rows(2, [(3, 2)])}, 1000)
+    assert ingest_workbooks(conn, [path]) == (2, 3)
+    assert counts(conn) == (2, 3, 3)
+
+    write_workbook(path, {'ROLL1': inspection_rows(1, [(5, 1), (9, 4)])}, 2000)
+    assert ingest_workbooks(conn, [path]) == (0, 0)
+    assert counts(conn) == (1, 2, 2)
+    assert conn.execute('SELECT sheet_name FROM ingest_manifest WHERE sheet_name != ""').fetchall() == [('ROLL1',)]
+
+
+def test_a_path_listed_twice_is_ingested_once(tmp_path):
+    conn = sqlite3.connect(':memory:')
+    path = write_workbook(tmp_path / 'rolls.xlsx', {'ROLL1': inspection_rows(1, [(5, 1)])}, 1000)
+    assert ingest_workbooks(conn, [path, path, os.path.relpath(path)]) == (1, 1)
+    assert counts(conn) == (1, 1, 2)
+
+
+def fabric_values(roll_number):
+    return tuple(f'{roll_number}-{column}' for column in FABRIC_INFO_COLUMNS)
+
+
+# Two writers on one SQLite file: ids are taken when a batch is flushed, so the second flush does not reuse the first's
+def test_sqlite_writers_do_not_share_fabric_ids(tmp_path):
+    first = sqlite3.connect(tmp_path / 'fabric.db')
+    second = sqlite3.connect(tmp_path / 'fabric.db')
+    create_tables(first)
+    first_writer, second_writer = BulkWriter(first), BulkWriter(second)
+    first_writer.add_roll(fabric_values(1), [(1, 2, 'slub', 'weaving', 1)])
+    second_writer.add_roll(fabric_values(2), [(3, 4, 'hole', 'knitting', 4)])
+    second_writer.flush()
+    first_writer.flush()
+    rows = first.execute('SELECT fabric_info.roll_number, defects.points FROM defects '
+                         'JOIN fabric_info ON fabric_info.id = defects.fabric_id ORDER BY defects.points').fetchall()
+    assert rows == [('1-roll_number', 1), ('2-roll_number', 4)]
+
+
+# Connection standing in for pyodbc on SQL Server: records statements and answers MERGE ... OUTPUT
+# with ids given in a different order than the rows were sent
+class FakeSqlServer:
+    def __init__(self):
+        self.statements = []
+        self.next_id = 100
+        self.output = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, statement, parameters=()):
+        self.statements.append((statement, list(parameters)))
+        if 'MERGE INTO fabric_info' in statement:
+            row_numbers = parameters[::len(FABRIC_INFO_COLUMNS) + 1]
+            self.output = [(number, self.next_id + index) for index, number in enumerate(row_numbers)][::-1]
+            self.next_id += len(row_numbers)
+
+    def executemany(self, statement, rows):
+        self.statements.append((statement, list(rows)))
+
+    def fetchall(self):
+        output, self.output = self.output, []
+        return output
+
+    def commit(self):
+        pass
+
+
+def test_sql_server_ids_come_from_merge_output():
+    conn = FakeSqlServer()
+    manifest = {}
+    writer = BulkWriter(conn, manifest=manifest)
+    for roll in range(200):
+        writer.add_roll(fabric_values(roll), [(roll, roll + 1, 'slub', 'weaving', 1)], ('book.xlsx', f'R{roll}', 'h', 1.0))
+    writer.flush()
+
+    merges = [statement for statement, parameters in conn.statements if 'MERGE INTO fabric_info' in statement]
+    assert len(merges) == 2 and not any('MAX(id)' in statement for statement, parameters in conn.statements)
+    defects = next(rows for statement, rows in conn.statements if statement.startswith('INSERT INTO defects'))
+    assert [row[0] for row in defects] == [100 + roll for roll in range(200)]
+    assert [manifest[('book.xlsx', f'R{roll}')][2] for roll in range(200)] == [100 + roll for roll in range(200)]
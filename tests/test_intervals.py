@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from fabricopt.defects import DefectTable
+from fabricopt.intervals import DefectIntervalIndex
+
+
+def random_defect(rng):
+    start = rng.randint(0, 200) + rng.choice([0, 0.5])
+    return {'from': start, 'to': start + rng.choice([0, 0, 1, 4, 15]), 'points': rng.randint(1, 4)}
+
+
+# Fuzz the two treaps against a plain list: inserts, joins and removals interleaved with every query
+@pytest.mark.parametrize('seed', range(5))
+def test_queries_match_a_linear_scan(seed):
+    rng = random.Random(seed)
+    defects = {uid: defect for uid, defect in enumerate(random_defect(rng) for _ in range(60))}
+    index = DefectIntervalIndex(list(defects.values()), seed=seed)
+    for step in range(300):
+        action = rng.random()
+        if action < 0.3:
+            defect = random_defect(rng)
+            defects[index.insert(defect)] = defect
+        elif action < 0.4:
+            position = rng.randint(0, 200)
+            defects[index.insert_join(position)] = {'from': position, 'to': position, 'points': 4}
+        elif action < 0.6 and defects:
+            uid = rng.choice(list(defects))
+            assert index.remove(uid) is not None
+            del defects[uid]
+
+        start = rng.uniform(-5, 205)
+        end = start + rng.choice([0, 1, 10, 50])
+        touching = [d for d in defects.values() if d['to'] >= start and d['from'] <= end]
+        assert len(index) == len(defects)
+        assert index.total_points() == sum(d['points'] for d in defects.values())
+        assert index.overlap_points(start, end) == sum(d['points'] for d in touching)
+        assert index.start_points(start, end) == sum(d['points'] for d in defects.values() if start <= d['from'] <= end)
+        assert index.contained_points(start, end) == sum(d['points'] for d in defects.values()
+                                                         if start <= d['from'] and d['to'] <= end)
+        found = index.overlapping(start, end)
+        assert sorted((d['from'], d['to'], d['points']) for d in found) == sorted(
+            (d['from'], d['to'], d['points']) for d in touching)
+        assert [d['from'] for d in found] == sorted(d['from'] for d in touching)
+
+
+def test_builds_from_a_defect_table():
+    table = DefectTable([1, 5, 9], [2, 5, 30], [1, 2, 4])
+    index = DefectIntervalIndex(table)
+    assert index.overlap_points(10, 12) == 4
+    assert index.start_points(0, 5) == 3
+    assert index.contained_points(0, 10) == 3
+    assert index.contained_points(9, 30) == 4
+    assert index.contained_points(10, 12) == 0
@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+import pytest
+
+from fabricopt.joining import MaxSegmentTree, join_remnants
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_segment_tree_matches_a_linear_scan(seed):
+    rng = random.Random(seed)
+    values = [rng.uniform(-10, 10) for _ in range(rng.randint(1, 70))]
+    tree = MaxSegmentTree(values)
+    for step in range(300):
+        index = rng.randrange(len(values))
+        values[index] = -np.inf if rng.random() < 0.3 else rng.uniform(-10, 10)
+        tree.update(index, values[index])
+        lo = rng.randrange(len(values) + 1)
+        hi = rng.randrange(lo, len(values) + 1)
+        window = values[lo:hi]
+        best = max(window, default=-np.inf)
+        found = tree.argmax(lo, hi)
+        if best == -np.inf:
+            assert found == -1
+        else:
+            assert values[found] == best and lo <= found < hi
+        bound = rng.uniform(-10, 10)
+        expected = next((k for k in range(lo, hi) if values[k] >= bound), -1)
+        assert tree.first_at_least(lo, hi, bound) == expected
+        assert tree[index] == values[index]
+
+
+def test_joined_pieces_meet_length_and_threshold():
+    rng = random.Random(1)
+    remnants = []
+    for k in range(300):
+        length = rng.uniform(20, 90)
+        remnants.append({'roll': k, 'start': 0.0, 'end': length, 'length': length,
+                         'points': rng.randint(0, int(length * 0.5))})
+    pieces, leftovers = join_remnants(remnants, width=1.5, threshold_ppms=23, target_length=80, max_length=150)
+    assert pieces
+    used = [id(remnant) for piece in pieces for remnant in piece['remnants']]
+    assert len(used) == len(set(used))
+    assert len(used) + len(leftovers) == len(remnants)
+    for piece in pieces:
+        assert 80 <= piece['length'] <= 150
+        assert piece['joins'] == len(piece['remnants']) - 1
+        points = sum(remnant['points'] for remnant in piece['remnants']) + 4 * piece['joins']
+        assert piece['points'] == points
+        assert points * 100 / (piece['length'] * 1.5) <= 23 + 1e-9
@@ -0,0 +1,41 @@
+import numpy as np
+
+from fabricopt.memo import ScoreCache
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = ScoreCache(maxsize=2)
+    cache.get(('roll', 'a'), lambda: 1)
+    cache.get(('roll', 'b'), lambda: 2)
+    cache.get(('roll', 'a'), lambda: None)
+    cache.get(('roll', 'c'), lambda: 3)
+    assert len(cache) == 2
+    assert cache.get(('roll', 'a'), lambda: None) == 1
+    assert cache.get(('roll', 'b'), lambda: 'recomputed') == 'recomputed'
+    assert cache.info()['evictions'] == 2
+
+
+def test_cache_is_bounded_by_weight():
+    cache = ScoreCache(maxbytes=3 * 2 ** 20)
+    for k in range(10):
+        cache.get(('roll', k), lambda: np.zeros(2 ** 17))
+    info = cache.info()
+    assert info['bytes'] <= 3 * 2 ** 20
+    assert info['size'] == 2
+    assert info['evictions'] == 8
+
+    cache.get(('roll', 'huge'), lambda: np.zeros(2 ** 20))
+    assert cache.info()['bytes'] <= 3 * 2 ** 20
+    cache.clear()
+    assert cache.info()['bytes'] == 0
+
+
+def test_invalidate_keeps_entries_away_from_changed_defects():
+    cache = ScoreCache()
+    cache.get(('old', 'points', 0, 10), lambda: 1, (0, 10))
+    cache.get(('old', 'points', 20, 30), lambda: 2, (20, 30))
+    cache.get(('old', 'evaluation'), lambda: 3)
+    assert cache.invalidate('old', 'new', [(25, 25)]) == 2
+    assert cache.get(('new', 'points', 0, 10), lambda: None) == 1
+    assert len(cache) == 1
+    assert cache.info()['bytes'] == sum(weight for value, span, weight in cache.entries.values())
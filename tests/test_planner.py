@@ -0,0 +1,79 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from fabricopt.benchmark import generate_roll
+from fabricopt.evaluate import evaluate_sections
+from fabricopt.planner import CutFrontier, cut_frontier, plan_cuts_dp
+
+WIDTH = 1.5
+MARGIN = 0.5
+
+
+# Longest retained length found by enumerating every plan of a small roll.
+# Each defect is in one of three states: kept, removed in a new cut, or removed in the same cut as the defect
+# before it. A cut runs from its first defect's 'from' to the furthest 'to' of its defects, widened by MARGIN and
+# clipped to the roll; a plan is valid when no kept defect touches a cut and every kept piece holding
+# defects is at least min_piece_length long (short defect-free pieces are cut away with their neighbours).
+def brute_force(defects, length, threshold_ppms, join_penalty, min_piece_length):
+    best = 0.0
+    for states in itertools.product(('keep', 'new', 'same'), repeat=len(defects)):
+        if 'same' in states[:1] or any(state == 'same' and previous == 'keep'
+                                       for previous, state in zip(states, states[1:])):
+            continue
+        cuts = []
+        for defect, state in zip(defects, states):
+            if state == 'new':
+                cuts.append([defect['from'], defect['to']])
+            elif state == 'same':
+                cuts[-1][1] = max(cuts[-1][1], defect['to'])
+        cuts = [(max(start - MARGIN, 0), min(end + MARGIN, length)) for start, end in cuts]
+        kept = [defect for defect, state in zip(defects, states) if state == 'keep']
+        if any(start <= defect['to'] and defect['from'] <= end for defect in kept for start, end in cuts):
+            continue
+        if any(later[0] < earlier[1] for earlier, later in zip(cuts, cuts[1:])):
+            continue
+        edges = [0.0] + [edge for cut in cuts for edge in cut] + [length]
+        pieces = []
+        for start, end in zip(edges[::2], edges[1::2]):
+            inside = [defect for defect in kept if start <= defect['from'] <= end]
+            if end - start >= min_piece_length:
+                pieces.append((end - start, sum(defect['points'] for defect in inside)))
+            elif inside:
+                break
+        else:
+            kept_length = sum(piece_length for piece_length, points in pieces)
+            if not kept_length:
+                continue
+            points = sum(points for piece_length, points in pieces) + join_penalty * (len(pieces) - 1)
+            if points * 100 / (kept_length * WIDTH) <= threshold_ppms + 1e-9:
+                best = max(best, kept_length)
+    return best
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_dp_matches_brute_force_on_small_rolls(seed):
+    rng = np.random.default_rng(seed)
+    roll = generate_roll(seed=seed, defect_count=int(rng.integers(4, 9)), length=float(rng.integers(50, 100)))
+    threshold_ppms = float(rng.choice([5, 10, 15, 23]))
+    removed_sections, kept_sections, kept_length, ppms = plan_cuts_dp(roll['defects'], roll['length'], WIDTH,
+                                                                      threshold_ppms)
+    assert kept_length == pytest.approx(brute_force(roll['defects'], roll['length'], threshold_ppms, 4, 20))
+    if kept_length:
+        summary = evaluate_sections(roll['defects'], roll['length'], WIDTH, removed_sections)
+        assert summary['kept_length'] == pytest.approx(kept_length)
+        assert ppms <= threshold_ppms + 1e-9
+        assert all(end - start >= 20 for start, end in kept_sections)
+
+
+def test_frontier_answers_every_threshold_like_a_fresh_solve():
+    roll = generate_roll(seed=7, defect_count=150)
+    frontier = cut_frontier(roll['defects'], roll['length'], WIDTH)
+    assert frontier.ppms == sorted(frontier.ppms)
+    assert all(a < b for a, b in zip(frontier.lengths, frontier.lengths[1:]))
+    restored = CutFrontier.from_dict(frontier.to_dict())
+    for threshold_ppms in (5, 12, 18, 23, 30, 60):
+        plan = plan_cuts_dp(roll['defects'], roll['length'], WIDTH, threshold_ppms)
+        assert frontier.plan(threshold_ppms) == plan
+        assert restored.plan(threshold_ppms) == plan
@@ -0,0 +1,7 @@
+from fabricopt.report import lot_of
+
+
+def test_lot_zero_is_not_filed_as_no_lot():
+    assert lot_of({'fabric_info': {'lot_number': 0}}) == '0'
+    assert lot_of({'fabric_info': {'lot_number': None}}) == 'no-lot'
+    assert lot_of({}) == 'no-lot'
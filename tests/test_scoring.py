@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from fabricopt.scoring import SectionScorer, find_highest_density_section
+
+WIDTH = 1.5
+
+
+# The original pairwise scan (optimizedmultiplesectionremoval.py), one section, over the list in the order given
+def original_highest_density_section(defects, width):
+    def calculate_section_ppms(defects, start, end, width):
+        section_length = end - start + 1
+        section_points = sum(defect['points'] for defect in defects if defect['from'] >= start and defect['to'] <= end)
+        return (section_points * 100) / (section_length * width)
+
+    max_density = 0
+    best_section = (0, 0)
+    for i in range(len(defects)):
+        for j in range(i, len(defects)):
+            start = defects[i]['from']
+            end = defects[j]['to']
+            density = calculate_section_ppms(defects, start, end, width)
+            if density > max_density:
+                max_density = density
+                best_section = (start, end)
+    return best_section
+
+
+# Integer points keep prefix sums exact, so ties are broken the same way as the original
+def random_defects(rng, count, length=200):
+    defects = []
+    for _ in range(count):
+        start = rng.randint(0, length)
+        end = start if rng.random() < 0.8 else min(length, start + rng.randint(1, 5))
+        defects.append({'from': start, 'to': end, 'points': rng.randint(1, 4)})
+    return defects
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_matches_original_scan_on_sorted_defects(seed):
+    rng = random.Random(seed)
+    defects = sorted(random_defects(rng, rng.randint(1, 25)), key=lambda d: d['from'])
+    assert find_highest_density_section(defects, WIDTH) == original_highest_density_section(defects, WIDTH)
+
+
+# The original scanned in list order; here the scan is over the defects sorted by 'from', whatever the input order
+@pytest.mark.parametrize('seed', range(30))
+def test_unsorted_defects_scan_in_position_order(seed):
+    rng = random.Random(seed)
+    defects = random_defects(rng, rng.randint(1, 25))
+    rng.shuffle(defects)
+    in_position_order = sorted(defects, key=lambda d: d['from'])
+    assert find_highest_density_section(defects, WIDTH) == original_highest_density_section(in_position_order, WIDTH)
+
+
+def test_section_points_match_direct_sum():
+    rng = random.Random(7)
+    defects = random_defects(rng, 60)
+    scorer = SectionScorer(defects, WIDTH)
+    for _ in range(200):
+        start = rng.randint(0, 200)
+        end = rng.randint(start, 200)
+        expected = sum(d['points'] for d in defects if d['from'] >= start and d['to'] <= end)
+        assert scorer.section_points(start, end) == expected
+        assert scorer.section_points_many(start, [end])[0] == expected